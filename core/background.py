@@ -0,0 +1,43 @@
+"""
+Общий пул фоновых потоков для лёгкой работы вне запроса (ресайз картинок и т.п.).
+
+Задачи ставятся после коммита транзакции, а соединения с БД закрываются
+по завершении, чтобы потоки пула не держали устаревшие соединения.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'BACKGROUND_WORKERS', 2),
+                thread_name_prefix='background',
+            )
+        return _executor
+
+
+def _run(func, args):
+    close_old_connections()
+    try:
+        func(*args)
+    except Exception:
+        logger.exception('Background task failed', extra={'task': func.__name__, 'task_args': args})
+    finally:
+        close_old_connections()
+
+
+def submit_after_commit(func, *args):
+    """Выполняет func(*args) в фоновом пуле после коммита текущей транзакции"""
+    transaction.on_commit(lambda: get_executor().submit(_run, func, args))
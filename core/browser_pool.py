@@ -0,0 +1,380 @@
+"""
+Пул заранее запущенных headless Chrome для парсеров.
+
+Команда browser_pool держит BROWSER_POOL_SIZE браузеров с --remote-debugging-port
+и раздаёт их по HTTP на localhost:
+    POST /lease            -> {"id": 1, "debugger_address": "127.0.0.1:9301"}
+    POST /release/<id>     -> {"ok": true}      (?failed=1 - браузер перезапускается)
+    GET  /status           -> состояние браузеров
+
+Парсер получает WebDriver через acquire_driver(): если BROWSER_POOL_URL задан и пул
+отвечает, chromedriver подключается к уже запущенному браузеру (debuggerAddress) -
+это доли секунды вместо запуска Chrome. Иначе запускается свой Chrome, как раньше.
+release_driver() отсоединяет chromedriver и возвращает браузер в пул.
+
+Браузер перезапускается после BROWSER_POOL_MAX_USES выдач, если не отвечает на
+/json/version или если его процессы заняли больше BROWSER_POOL_MAX_RSS_MB.
+"""
+import json
+import logging
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.conf import settings
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+
+logger = logging.getLogger(__name__)
+
+CHROME_BINARY = "/usr/bin/google-chrome"
+CHROMEDRIVER_PATH = "/usr/local/bin/chromedriver"
+CHROME_ARGUMENTS = [
+    "--headless=new",
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-gpu",
+    "--window-size=1920,1080",
+    "--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "--disable-features=VizDisplayCompositor",
+    "--disable-background-timer-throttling",
+    "--disable-backgrounding-occluded-windows",
+    "--disable-renderer-backgrounding",
+    "--disable-ipc-flooding-protection",
+    "--disable-extensions",
+    "--disable-plugins",
+    "--disable-translate",
+    "--disable-default-apps",
+]
+
+# Сколько ждать, пока только что запущенный Chrome откроет порт отладки
+STARTUP_TIMEOUT = 20
+HEALTH_INTERVAL = 30
+LEASE_TIMEOUT = 60
+# Выданный и не возвращённый браузер считаем брошенным через это время
+LEASE_MAX_AGE = 30 * 60
+
+
+def create_local_driver():
+    """Новый headless Chrome, запущенный самим chromedriver (без пула)"""
+    options = Options()
+    for argument in CHROME_ARGUMENTS:
+        options.add_argument(argument)
+    options.binary_location = CHROME_BINARY
+    service = webdriver.ChromeService(executable_path=CHROMEDRIVER_PATH)
+    return webdriver.Chrome(service=service, options=options)
+
+
+def _attach_driver(debugger_address):
+    options = Options()
+    options.debugger_address = debugger_address
+    service = webdriver.ChromeService(executable_path=CHROMEDRIVER_PATH)
+    return webdriver.Chrome(service=service, options=options)
+
+
+def _pool_request(path):
+    url = settings.BROWSER_POOL_URL.rstrip('/') + path
+    request = urllib.request.Request(url, data=b'', method='POST')
+    with urllib.request.urlopen(request, timeout=LEASE_TIMEOUT + 5) as response:
+        return json.loads(response.read())
+
+
+def acquire_driver():
+    """WebDriver из пула (если он настроен и доступен) или свой Chrome"""
+    if getattr(settings, 'BROWSER_POOL_URL', None):
+        try:
+            lease = _pool_request('/lease')
+            driver = _attach_driver(lease['debugger_address'])
+            driver._pool_lease_id = lease['id']
+            return driver
+        except Exception as e:
+            logger.warning('Browser pool unavailable, starting local Chrome: %s', e)
+    return create_local_driver()
+
+
+def release_driver(driver, failed=False):
+    """Возвращает браузер в пул (или закрывает свой). failed=True - браузер в плохом состоянии"""
+    lease_id = getattr(driver, '_pool_lease_id', None)
+    try:
+        # У подключённого по debuggerAddress chromedriver quit() только отсоединяется
+        driver.quit()
+    except Exception:
+        failed = True
+    if lease_id is not None:
+        try:
+            _pool_request(f'/release/{lease_id}' + ('?failed=1' if failed else ''))
+        except Exception as e:
+            logger.warning('Browser pool release failed: %s', e)
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _tree_rss_kb(pid):
+    """RSS процесса и всех потомков по /proc (Linux); None, если посчитать нельзя"""
+    if not os.path.isdir('/proc'):
+        return None
+    children = {}
+    rss = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/status') as status:
+                fields = dict(line.split(':', 1) for line in status if ':' in line)
+        except OSError:
+            continue
+        child = int(entry)
+        children.setdefault(int(fields.get('PPid', '0').strip() or 0), []).append(child)
+        rss[child] = int(fields.get('VmRSS', '0 kB').split()[0])
+    total, stack = 0, [pid]
+    while stack:
+        current = stack.pop()
+        total += rss.get(current, 0)
+        stack.extend(children.get(current, []))
+    return total
+
+
+class BrowserInstance:
+    """Один Chrome с портом отладки и своим профилем"""
+
+    def __init__(self, instance_id):
+        self.id = instance_id
+        self.process = None
+        self.port = None
+        self.profile_dir = None
+        self.uses = 0
+        self.leased_at = None
+        self.started_at = None
+
+    @property
+    def debugger_address(self):
+        return f'127.0.0.1:{self.port}'
+
+    def start(self):
+        self.port = _free_port()
+        self.profile_dir = tempfile.mkdtemp(prefix='browser-pool-')
+        self.process = subprocess.Popen(
+            [CHROME_BINARY, *CHROME_ARGUMENTS,
+             f'--remote-debugging-port={self.port}',
+             f'--user-data-dir={self.profile_dir}',
+             'about:blank'],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        self.uses = 0
+        self.started_at = time.monotonic()
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while time.monotonic() < deadline:
+            if self.healthy():
+                return
+            time.sleep(0.2)
+        raise RuntimeError(f'Chrome on port {self.port} did not start')
+
+    def stop(self):
+        if self.process is not None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+            self.process = None
+        if self.profile_dir:
+            shutil.rmtree(self.profile_dir, ignore_errors=True)
+            self.profile_dir = None
+
+    def restart(self):
+        self.stop()
+        self.start()
+
+    def _devtools(self, path):
+        with urllib.request.urlopen(f'http://{self.debugger_address}{path}', timeout=2) as response:
+            return json.loads(response.read() or b'null')
+
+    def healthy(self):
+        if self.process is None or self.process.poll() is not None:
+            return False
+        try:
+            self._devtools('/json/version')
+            return True
+        except Exception:
+            return False
+
+    def reset_tabs(self):
+        """Оставляет одну пустую вкладку, чтобы следующий клиент не видел чужих страниц"""
+        pages = [target for target in self._devtools('/json/list') if target.get('type') == 'page']
+        request = urllib.request.Request(f'http://{self.debugger_address}/json/new?about:blank', method='PUT')
+        with urllib.request.urlopen(request, timeout=2):
+            pass
+        for target in pages:
+            with urllib.request.urlopen(f'http://{self.debugger_address}/json/close/{target["id"]}', timeout=2):
+                pass
+
+    def rss_mb(self):
+        if self.process is None:
+            return 0
+        rss = _tree_rss_kb(self.process.pid)
+        return None if rss is None else rss // 1024
+
+    def as_dict(self):
+        return {
+            'id': self.id,
+            'address': self.debugger_address,
+            'uses': self.uses,
+            'leased': self.leased_at is not None,
+            'rss_mb': self.rss_mb(),
+        }
+
+
+class BrowserPool:
+    def __init__(self, size, max_uses, max_rss_mb):
+        self.max_uses = max_uses
+        self.max_rss_mb = max_rss_mb
+        self.instances = [BrowserInstance(i) for i in range(1, size + 1)]
+        self.condition = threading.Condition()
+        self._stopped = threading.Event()
+
+    def start(self):
+        for instance in self.instances:
+            instance.start()
+        threading.Thread(target=self._health_loop, name='browser-pool-health', daemon=True).start()
+
+    def stop(self):
+        self._stopped.set()
+        for instance in self.instances:
+            instance.stop()
+
+    def lease(self, timeout=LEASE_TIMEOUT):
+        deadline = time.monotonic() + timeout
+        with self.condition:
+            while True:
+                for instance in self.instances:
+                    if instance.leased_at is None and instance.process is not None:
+                        instance.leased_at = time.monotonic()
+                        instance.uses += 1
+                        return instance
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self.condition.wait(remaining)
+
+    def release(self, instance_id, failed=False):
+        instance = self._get(instance_id)
+        if instance is None or instance.leased_at is None:
+            return False
+        self._recycle_if_needed(instance, failed)
+        with self.condition:
+            instance.leased_at = None
+            self.condition.notify()
+        return True
+
+    def _get(self, instance_id):
+        for instance in self.instances:
+            if instance.id == instance_id:
+                return instance
+        return None
+
+    def _recycle_if_needed(self, instance, failed=False):
+        reason = None
+        if failed:
+            reason = 'failed'
+        elif instance.uses >= self.max_uses:
+            reason = f'{instance.uses} uses'
+        elif not instance.healthy():
+            reason = 'unhealthy'
+        else:
+            rss = instance.rss_mb() if self.max_rss_mb else None
+            if rss is not None and rss > self.max_rss_mb:
+                reason = f'{rss} MB'
+        try:
+            if reason:
+                logger.info('Recycling browser %s (%s)', instance.id, reason)
+                instance.restart()
+            else:
+                instance.reset_tabs()
+        except Exception:
+            logger.exception('Browser %s restart failed', instance.id)
+            instance.stop()
+
+    def _health_loop(self):
+        while not self._stopped.wait(HEALTH_INTERVAL):
+            for instance in self.instances:
+                with self.condition:
+                    if instance.leased_at is not None:
+                        if time.monotonic() - instance.leased_at < LEASE_MAX_AGE:
+                            continue
+                        logger.warning('Browser %s lease expired', instance.id)
+                    # Пока проверяем, браузер не выдаётся
+                    instance.leased_at = time.monotonic()
+                if instance.process is None:
+                    try:
+                        instance.start()
+                    except Exception:
+                        logger.exception('Browser %s start failed', instance.id)
+                        instance.stop()
+                else:
+                    self._recycle_if_needed(instance)
+                with self.condition:
+                    instance.leased_at = None
+                    self.condition.notify()
+
+    def status(self):
+        return [instance.as_dict() for instance in self.instances]
+
+
+class PoolRequestHandler(BaseHTTPRequestHandler):
+    pool = None
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        path, _, query = self.path.partition('?')
+        if path == '/lease':
+            instance = self.pool.lease()
+            if instance is None:
+                return self._send(503, {'error': 'No free browser'})
+            return self._send(200, {'id': instance.id, 'debugger_address': instance.debugger_address})
+        if path.startswith('/release/'):
+            try:
+                instance_id = int(path.rsplit('/', 1)[1])
+            except ValueError:
+                return self._send(400, {'error': 'Bad id'})
+            ok = self.pool.release(instance_id, failed='failed=1' in query)
+            return self._send(200 if ok else 404, {'ok': ok})
+        return self._send(404, {'error': 'Not found'})
+
+    def do_GET(self):
+        if self.path == '/status':
+            return self._send(200, {'browsers': self.pool.status()})
+        return self._send(404, {'error': 'Not found'})
+
+    def log_message(self, format, *args):
+        logger.debug(format, *args)
+
+
+def serve(host, port, size, max_uses, max_rss_mb):
+    """Запускает пул и HTTP сервер выдачи браузеров (блокирует до Ctrl+C)"""
+    pool = BrowserPool(size, max_uses, max_rss_mb)
+    pool.start()
+    handler = type('Handler', (PoolRequestHandler,), {'pool': pool})
+    server = ThreadingHTTPServer((host, port), handler)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        pool.stop()
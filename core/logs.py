@@ -0,0 +1,85 @@
+"""
+Структурированные логи парсеров и импорта.
+
+StructuredFormatter - строка JSON (LOG_FORMAT=json) или "сообщение ключ=значение":
+поля из extra={...} попадают в вывод отдельными ключами, а не склеиваются в текст.
+
+QueueLogHandler не блокирует поток, который пишет лог: запись кладётся в очередь,
+а форматирует и выводит её фоновый QueueListener. Потоки загрузок и браузеров
+не ждут stdout / файл.
+"""
+import atexit
+import copy
+import json
+import logging
+import queue
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+# Атрибуты LogRecord - всё остальное в записи пришло из extra
+RESERVED_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'taskName'}
+
+
+def record_fields(record):
+    """Поля, переданные в extra"""
+    return {key: value for key, value in vars(record).items() if key not in RESERVED_ATTRS}
+
+
+class StructuredFormatter(logging.Formatter):
+
+    def __init__(self, json=False, **kwargs):
+        super().__init__(**kwargs)
+        self.json = json
+
+    def format(self, record):
+        message = record.getMessage()
+        fields = record_fields(record)
+        exc_text = record.exc_text
+        if record.exc_info and not exc_text:
+            exc_text = self.formatException(record.exc_info)
+
+        if self.json:
+            payload = {
+                'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+                'level': record.levelname,
+                'logger': record.name,
+                'thread': record.threadName,
+                'message': message,
+                **fields,
+            }
+            if exc_text:
+                payload['exc'] = exc_text
+            return json.dumps(payload, ensure_ascii=False, default=str)
+
+        line = f"{self.formatTime(record)} {record.levelname} {record.name} {message}"
+        if fields:
+            line += ' ' + ' '.join(f"{key}={value}" for key, value in fields.items())
+        if exc_text:
+            line += '\n' + exc_text
+        return line
+
+
+class QueueLogHandler(QueueHandler):
+    """Неблокирующий обработчик: в очередь, а в поток вывода пишет фоновый QueueListener"""
+
+    def __init__(self, stream=None):
+        log_queue = queue.SimpleQueue()
+        super().__init__(log_queue)
+        self.target = logging.StreamHandler(stream)
+        self.listener = QueueListener(log_queue, self.target)
+        self.listener.start()
+        atexit.register(self.listener.stop)
+
+    def setFormatter(self, fmt):
+        # Форматирует фоновый поток
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        """Копия записи без ссылок на аргументы и traceback - их может поменять вызывающий поток"""
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
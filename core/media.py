@@ -0,0 +1,166 @@
+import mimetypes
+import os
+import posixpath
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import (
+    FileResponse, Http404, HttpResponse, HttpResponseForbidden,
+    HttpResponseNotModified, StreamingHttpResponse,
+)
+from django.utils._os import safe_join
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_http_methods
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def is_public_media(path):
+    """Файл из MEDIA_PUBLIC_PREFIXES; путь нормализуем, чтобы game_icons/../avatars не прошёл"""
+    prefixes = tuple(getattr(settings, 'MEDIA_PUBLIC_PREFIXES', ()))
+    return bool(prefixes) and posixpath.normpath(path).startswith(prefixes)
+
+
+def can_view_media(request, path):
+    """Публичные папки (иконки игр) - всем, остальное (аватары) - только авторизованным"""
+    return is_public_media(path) or request.user.is_authenticated
+
+
+def _file_etag(stat):
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+def _parse_range(header, size):
+    """Разбирает 'bytes=a-b'. Несколько диапазонов не поддерживаем - отдаём файл целиком"""
+    match = RANGE_RE.match(header.strip())
+    if not match or size == 0:
+        return None
+    start, end = match.groups()
+    if not start and not end:
+        return None
+    if not start:
+        # bytes=-500 - последние 500 байт
+        length = min(int(end), size)
+        return (size - length, size - 1) if length else None
+    start = int(start)
+    if start >= size:
+        return None
+    end = min(int(end), size - 1) if end else size - 1
+    if start > end:
+        return None
+    return start, end
+
+
+def _read_range(path, start, length):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(STREAM_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def _offload_response(path, content_type):
+    """
+    Отдаём байты nginx (X-Accel-Redirect) или apache/lighttpd (X-Sendfile).
+    Путь - percent-encoded: имена вроде иконок "{id}_{название}.jpg" бывают
+    не ASCII, а такой заголовок Django кодирует по RFC 2047 и сервер файл не найдёт.
+    """
+    backend = getattr(settings, 'MEDIA_SERVE_BACKEND', 'django')
+    response = HttpResponse(content_type=content_type)
+    if backend == 'nginx':
+        prefix = getattr(settings, 'MEDIA_ACCEL_REDIRECT_PREFIX', '/protected-media/')
+        response['X-Accel-Redirect'] = quote(prefix.rstrip('/') + '/' + path)
+    else:
+        response['X-Sendfile'] = quote(safe_join(settings.MEDIA_ROOT, path))
+    return response
+
+
+@require_http_methods(["GET", "HEAD"])
+def serve_media(request, path):
+    """
+    Отдаёт файлы из MEDIA_ROOT после проверки доступа.
+
+    MEDIA_SERVE_BACKEND:
+        - "nginx": X-Accel-Redirect на internal location
+        - "sendfile": X-Sendfile (apache mod_xsendfile, lighttpd)
+        - "django": сами, с ETag/Last-Modified и Range; полные ответы идут
+          через FileResponse, который WSGI-сервер отдаёт через sendfile()
+    """
+    if not can_view_media(request, path):
+        return HttpResponseForbidden()
+
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404
+
+    try:
+        stat = os.stat(full_path)
+    except OSError:
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+
+    content_type, encoding = mimetypes.guess_type(full_path)
+    content_type = content_type or 'application/octet-stream'
+
+    if getattr(settings, 'MEDIA_SERVE_BACKEND', 'django') in ('nginx', 'sendfile'):
+        return _offload_response(path, content_type)
+
+    etag = _file_etag(stat)
+    last_modified = http_date(stat.st_mtime)
+
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match:
+        if etag in [tag.strip() for tag in if_none_match.split(',')] or if_none_match.strip() == '*':
+            return _not_modified(etag, last_modified)
+    else:
+        if_modified_since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+        if if_modified_since is not None and int(stat.st_mtime) <= if_modified_since:
+            return _not_modified(etag, last_modified)
+
+    byte_range = None
+    range_header = request.headers.get('Range')
+    if range_header:
+        if_range = request.headers.get('If-Range')
+        if not if_range or if_range == etag or if_range == last_modified:
+            byte_range = _parse_range(range_header, stat.st_size)
+            if byte_range is None and RANGE_RE.match(range_header.strip()):
+                response = HttpResponse(status=416)
+                response['Content-Range'] = f'bytes */{stat.st_size}'
+                return response
+
+    if byte_range:
+        start, end = byte_range
+        length = end - start + 1
+        response = StreamingHttpResponse(
+            _read_range(full_path, start, length), status=206, content_type=content_type
+        )
+        response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+        response['Content-Length'] = str(length)
+    else:
+        response = FileResponse(open(full_path, 'rb'), content_type=content_type)
+        response['Content-Length'] = str(stat.st_size)
+
+    if encoding:
+        response['Content-Encoding'] = encoding
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = last_modified
+    # Публичные иконки может кешировать и прокси, аватары - только браузер
+    visibility = 'public' if is_public_media(path) else 'private'
+    response['Cache-Control'] = f'{visibility}, max-age=86400'
+    return response
+
+
+def _not_modified(etag, last_modified):
+    response = HttpResponseNotModified()
+    response['ETag'] = etag
+    response['Last-Modified'] = last_modified
+    return response
@@ -0,0 +1,44 @@
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_cache_control
+
+
+class ThresholdGZipMiddleware(GZipMiddleware):
+    """
+    GZip только для HTML/JSON ответов не меньше COMPRESSION_MIN_SIZE байт.
+    Мелкие ответы и уже сжатые форматы (картинки, архивы) отдаются как есть.
+    """
+    compressible_types = ('text/html', 'application/json', 'application/x-ndjson', 'text/plain')
+
+    def process_response(self, request, response):
+        content_type = response.get('Content-Type', '').split(';')[0].strip()
+        if content_type not in self.compressible_types:
+            return response
+        if not response.streaming:
+            min_size = getattr(settings, 'COMPRESSION_MIN_SIZE', 1024)
+            if len(response.content) < min_size:
+                return response
+        return super().process_response(request, response)
+
+
+class StaticCacheControlMiddleware:
+    """
+    Дальние заголовки кеширования для статики, если её отдаёт сам Django
+    (без nginx). Имена файлов хешируются Manifest-хранилищем, поэтому
+    файл по конкретному URL никогда не меняется.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.static_prefix = '/' + settings.STATIC_URL.lstrip('/')
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.path.startswith(self.static_prefix) and response.status_code == 200:
+            patch_cache_control(
+                response,
+                public=True,
+                max_age=getattr(settings, 'STATIC_CACHE_MAX_AGE', 60 * 60 * 24 * 365),
+                immutable=True,
+            )
+        return response
@@ -34,6 +34,16 @@ STATIC_ROOT = '/opt/task_managet/static/'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Кто отдаёт байты медиа после проверки доступа в core.media.serve_media:
+# "django" - сам Django (FileResponse + Range), "nginx" - X-Accel-Redirect,
+# "sendfile" - X-Sendfile (apache/lighttpd)
+MEDIA_SERVE_BACKEND = os.environ.get('MEDIA_SERVE_BACKEND', 'django')
+# internal location в nginx, указывающий на MEDIA_ROOT:
+#   location /protected-media/ { internal; alias <MEDIA_ROOT>/; }
+MEDIA_ACCEL_REDIRECT_PREFIX = '/protected-media/'
+# Папки медиа, открытые без входа: иконки игр отдаются клиентам API по X-API-Key без сессии
+MEDIA_PUBLIC_PREFIXES = ('game_icons/',)
+
 # Application definition
 AUTH_USER_MODEL = 'tasks.CustomUser'  # Добавь эту строку
 LOGIN_REDIRECT_URL = '/'
@@ -63,6 +73,8 @@ CORS_ALLOW_ALL_ORIGINS = True
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    'core.middleware.StaticCacheControlMiddleware',
+    'core.middleware.ThresholdGZipMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -139,6 +151,85 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Хешированные имена файлов (base.abc123.css) + .gz/.br копии при collectstatic.
+# nginx: gzip_static on; brotli_static on; expires max; для location /static/
+STORAGES = {
+    # Имена медиа-файлов = sha256 содержимого, см. core.storage.ContentAddressedStorage
+    'default': {
+        'BACKEND': 'core.storage.ContentAddressedStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'core.storage.CompressedManifestStaticFilesStorage',
+    },
+}
+STATIC_CACHE_MAX_AGE = 60 * 60 * 24 * 365  # 1 год
+
+# Динамические HTML/JSON ответы меньше этого размера не сжимаем
+COMPRESSION_MIN_SIZE = 1024
+
+# Чем parse_ign_releases забирает страницу IGN по умолчанию: "browser" (Selenium) или "http"
+IGN_FETCHER = os.environ.get('IGN_FETCHER', 'browser')
+# Параллельных загрузок картинок при импорте (и размер пула соединений Session)
+IGN_DOWNLOAD_WORKERS = 8
+# Сколько следующих месяцев календаря IGN обходить и сколькими браузерами параллельно
+IGN_MONTH_HORIZON = 1
+IGN_MONTH_WORKERS = 3
+
+# Пул прогретых браузеров (manage.py browser_pool). Пусто - каждый парсер запускает свой Chrome
+BROWSER_POOL_URL = os.environ.get('BROWSER_POOL_URL', '')
+# Основной браузер IGN + по одному на каждый параллельный месяц, иначе лишние ждут LEASE_TIMEOUT
+BROWSER_POOL_SIZE = 1 + IGN_MONTH_WORKERS
+BROWSER_POOL_MAX_USES = 20
+BROWSER_POOL_MAX_RSS_MB = 1024
+
+# HTTP парсеров: "" - сеть, "record" - сеть + запись ответов, "replay" - только записанное (releases.replay)
+SCRAPER_HTTP_MODE = os.environ.get('SCRAPER_HTTP_MODE', '')
+SCRAPER_FIXTURES_DIR = os.environ.get('SCRAPER_FIXTURES_DIR', str(BASE_DIR / 'scraper_fixtures'))
+
+# check_localizations: параллельных запросов, запросов в секунду к DekuDeals, игр на один bulk_update
+LOCALIZATION_WORKERS = 4
+LOCALIZATION_RATE = 1.0
+LOCALIZATION_BATCH_SIZE = 50
+# Игры, проверенные меньше стольких часов назад, check_localizations пропускает (кроме --refresh)
+LOCALIZATION_RECHECK_HOURS = 24
+# Обработанные ID прерванного прогона - следующий запуск продолжает с места остановки
+LOCALIZATION_CHECKPOINT = BASE_DIR / 'check_localizations.checkpoint.json'
+
+# Источники manage.py ingest_releases (releases.ingestion): пути к классам ReleaseSource
+INGESTION_SOURCES = [
+    'releases.ign_parser.IGNSource',
+    'releases.dekudeals.DekuDealsSource',
+]
+# Сколько релизов из БД с неизвестной локализацией DekuDealsSource проверяет за прогон, кроме найденных в нём
+INGESTION_LOCALIZATION_LIMIT = 200
+
+# Логи парсеров и импорта: json - одна JSON строка на запись, text - "сообщение ключ=значение".
+# Пишутся через очередь (core.logs.QueueLogHandler) и не тормозят потоки загрузок
+LOG_FORMAT = os.environ.get('LOG_FORMAT', 'text')
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'structured': {
+            '()': 'core.logs.StructuredFormatter',
+            'json': LOG_FORMAT == 'json',
+        },
+    },
+    'handlers': {
+        'scrapers': {
+            'class': 'core.logs.QueueLogHandler',
+            'formatter': 'structured',
+        },
+    },
+    'loggers': {
+        'releases': {'handlers': ['scrapers'], 'level': 'INFO', 'propagate': False},
+        'core.browser_pool': {'handlers': ['scrapers'], 'level': 'INFO', 'propagate': False},
+        'core.background': {'handlers': ['scrapers'], 'level': 'INFO', 'propagate': False},
+    },
+}
+# Прогонов на странице истории импорта (releases:ingestion_runs)
+INGESTION_RUNS_PAGE_SIZE = 100
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
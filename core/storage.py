@@ -0,0 +1,187 @@
+import gzip
+import hashlib
+import os
+import re
+import tempfile
+import time
+from collections import Counter
+
+from django.apps import apps
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.db import models
+
+try:
+    import brotli
+except ImportError:  # brotli не установлен - отдаём только gzip
+    brotli = None
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Manifest-хранилище статики, которое при collectstatic дополнительно
+    кладёт рядом с каждым хешированным файлом .gz и .br версии
+    (для nginx gzip_static / brotli_static).
+    """
+    compress_extensions = ('.css', '.js', '.svg', '.json', '.txt', '.html')
+    compress_min_size = 256
+
+    def post_process(self, paths, dry_run=False, **options):
+        for name, hashed_name, processed in super().post_process(paths, dry_run, **options):
+            if not dry_run and hashed_name and not isinstance(processed, Exception):
+                self._compress(hashed_name)
+            yield name, hashed_name, processed
+
+    def _compress(self, name):
+        if not name.endswith(self.compress_extensions):
+            return
+        path = self.path(name)
+        with open(path, 'rb') as f:
+            content = f.read()
+        if len(content) < self.compress_min_size:
+            return
+
+        with open(path + '.gz', 'wb') as f:
+            f.write(gzip.compress(content, compresslevel=9, mtime=0))
+        if brotli is not None:
+            with open(path + '.br', 'wb') as f:
+                f.write(brotli.compress(content, quality=11))
+
+
+CONTENT_NAME_RE = re.compile(r'(^|/)[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}(\.\w+)?$')
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Медиа-хранилище, где имя файла - sha256 содержимого:
+        game_icons/1_Title.jpg -> game_icons/ab/cd/abcd...ef.jpg
+
+    Одинаковые файлы (повторный импорт той же иконки, та же аватарка)
+    хранятся один раз. Файл может быть общим для нескольких записей,
+    поэтому delete() ничего не удаляет - неиспользуемые файлы удаляет
+    collect_garbage() (команда gc_media) по подсчёту ссылок из БД.
+    """
+    hash_chunk_size = 64 * 1024
+
+    def content_name(self, name, content):
+        digest = hashlib.sha256()
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        for chunk in content.chunks(self.hash_chunk_size):
+            digest.update(chunk if isinstance(chunk, bytes) else chunk.encode())
+        if hasattr(content, 'seek'):
+            content.seek(0)
+
+        digest = digest.hexdigest()
+        directory = os.path.dirname(name)
+        ext = os.path.splitext(name)[1].lower()
+        return os.path.join(directory, digest[:2], digest[2:4], digest + ext).replace('\\', '/')
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            from django.core.files import File
+            content = File(content, name)
+
+        name = self.content_name(name, content)
+        if max_length is not None and len(name) > max_length:
+            raise SuspiciousFileOperation(f'Content name "{name}" is longer than {max_length} characters')
+        path = self.path(name)
+        try:
+            # Файл уже есть: обновляем mtime, чтобы collect_garbage не удалил его
+            # в grace-окне, пока запись, которая на него сошлётся, не закоммичена
+            os.utime(path)
+        except FileNotFoundError:
+            self._write_atomic(path, content)
+        return name
+
+    def _write_atomic(self, path, content):
+        """
+        Пишет во временный файл рядом и переименовывает в имя по содержимому.
+        Два параллельных save одного содержимого просто перезапишут одинаковые
+        байты - без суффиксов get_available_name, которые GC не распознал бы.
+        """
+        directory = os.path.dirname(path)
+        os.makedirs(directory, mode=self.directory_permissions_mode or 0o777, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in content.chunks(self.hash_chunk_size):
+                    f.write(chunk if isinstance(chunk, bytes) else chunk.encode())
+            if self.file_permissions_mode is not None:
+                os.chmod(tmp_path, self.file_permissions_mode)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def delete(self, name):
+        # Файл может использоваться другими записями - удаляет только collect_garbage()
+        pass
+
+    def purge(self, name):
+        super().delete(name)
+
+
+def collect_media_references():
+    """
+    Считает ссылки на файлы из БД: все FileField/ImageField всех моделей плюс
+    пути, которые модель отдаёт через get_media_references() (например,
+    производные размеры иконок в JSON). Возвращает Counter имя -> число ссылок.
+    """
+    references = Counter()
+    for model in apps.get_models():
+        file_fields = [
+            field.name for field in model._meta.get_fields()
+            if isinstance(field, models.FileField)
+        ]
+        extra = getattr(model, 'get_media_references', None)
+        if not file_fields and extra is None:
+            continue
+
+        queryset = model._default_manager.all()
+        if extra is None:
+            for row in queryset.values_list(*file_fields).iterator(chunk_size=2000):
+                references.update(name for name in row if name)
+        else:
+            for obj in queryset.iterator(chunk_size=2000):
+                for field_name in file_fields:
+                    name = getattr(obj, field_name).name
+                    if name:
+                        references[name] += 1
+                references.update(name for name in obj.get_media_references() if name)
+    return references
+
+
+def collect_garbage(storage=None, grace_seconds=3600, dry_run=False):
+    """
+    Удаляет content-addressed файлы без ссылок из БД.
+    Файлы моложе grace_seconds не трогаем: их могли только что записать,
+    а запись в БД ещё не закоммичена. Возвращает (удалено, освобождено байт).
+    """
+    storage = storage or default_storage
+    references = collect_media_references()
+    now = time.time()
+    deleted = 0
+    freed = 0
+
+    for root, dirs, files in os.walk(storage.location):
+        for filename in files:
+            path = os.path.join(root, filename)
+            name = os.path.relpath(path, storage.location).replace(os.sep, '/')
+            if not CONTENT_NAME_RE.search(name) or references[name]:
+                continue
+            stat = os.stat(path)
+            if now - stat.st_mtime < grace_seconds:
+                continue
+            if not dry_run:
+                if hasattr(storage, 'purge'):
+                    storage.purge(name)
+                else:
+                    storage.delete(name)
+            deleted += 1
+            freed += stat.st_size
+    return deleted, freed
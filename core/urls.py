@@ -1,8 +1,8 @@
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.contrib.auth import views as auth_views
-from django.conf.urls.static import static
 from django.conf import settings
+from core.media import serve_media
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -10,4 +10,5 @@ urlpatterns = [
     path('releases/', include('releases.urls')),
     path('api/auth/', include('auth_api.urls')),
     path('accounts/login/', auth_views.LoginView.as_view(), name='login'),
-]  + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+    re_path(r'^%s(?P<path>.*)$' % settings.MEDIA_URL.lstrip('/'), serve_media, name='media'),
+]
\ No newline at end of file
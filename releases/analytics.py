@@ -0,0 +1,101 @@
+"""
+Аналитика каталога релизов агрегатами в SQL.
+
+Считаем по нормализованной таблице GameReleaseAttribute, а не перебором
+GameRelease в Python. Результат кешируется до следующего
+изменения каталога (ключ содержит CatalogVersion.version).
+"""
+from django.core.cache import cache
+from django.db.models import Count, F, Q
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from .models import CatalogVersion, GameRelease, GameReleaseAttribute
+
+STATS_CACHE_TIMEOUT = 60 * 60
+
+
+def _marketplace_statuses():
+    """
+    Статус площадки по каждому релизу - тот же смысл, что у GameRelease.get_marketplace_status:
+    опубликованных на площадке платформ столько же, сколько платформ у релиза - полностью,
+    меньше (или больше) - частично, ни одной - не опубликован.
+
+    Один проход по GameReleaseAttribute, сгруппированный по релизу (платформы и
+    публикации "AVITO:PS5" - условными COUNT), и агрегат над этой группировкой.
+    """
+    per_release = {'total': Count('id', filter=Q(kind=GameReleaseAttribute.PLATFORM))}
+    aggregates = {}
+    for code, _ in GameRelease.MARKETPLACE_CHOICES:
+        published = f'published_{code}'
+        per_release[published] = Count('id', filter=Q(
+            kind=GameReleaseAttribute.PUBLICATION, code__startswith=f'{code}:',
+        ))
+        aggregates[f'{code}:full'] = Count('release', filter=Q(**{f'{published}__gt': 0, published: F('total')}))
+        aggregates[f'{code}:partial'] = Count(
+            'release', filter=Q(**{f'{published}__gt': 0}) & ~Q(**{published: F('total')}),
+        )
+    counts = (
+        GameReleaseAttribute.objects
+        .filter(kind__in=[GameReleaseAttribute.PLATFORM, GameReleaseAttribute.PUBLICATION])
+        .values('release').order_by().annotate(**per_release)
+        .aggregate(**aggregates)
+    )
+    return {
+        code: {'fully_published': counts[f'{code}:full'], 'partially_published': counts[f'{code}:partial']}
+        for code, _ in GameRelease.MARKETPLACE_CHOICES
+    }
+
+
+def compute_release_stats():
+    today = timezone.now().date()
+
+    totals = GameRelease.objects.aggregate(
+        total_games=Count('id'),
+        upcoming_games=Count('id', filter=Q(release_date__gte=today)),
+        published_games=Count('id', filter=Q(is_published=True)),
+    )
+
+    by_kind = {}
+    for row in GameReleaseAttribute.objects.exclude(
+        kind=GameReleaseAttribute.PUBLICATION
+    ).values('kind', 'code').annotate(count=Count('id')).order_by('kind', '-count', 'code'):
+        by_kind.setdefault(row['kind'], {})[row['code']] = row['count']
+
+    months = [
+        {'month': row['month'].strftime('%Y-%m'), 'count': row['count']}
+        for row in GameRelease.objects.annotate(month=TruncMonth('release_date'))
+        .values('month').annotate(count=Count('id')).order_by('month')
+    ]
+
+    statuses = _marketplace_statuses()
+    marketplace_status = {}
+    for code, label in GameRelease.MARKETPLACE_CHOICES:
+        status = statuses[code]
+        # Площадка с пустым списком платформ - тоже "не опубликовано": сумма трёх равна total_games
+        marketplace_status[code] = {
+            'name': label,
+            'fully_published': status['fully_published'],
+            'partially_published': status['partially_published'],
+            'not_published': totals['total_games'] - status['fully_published'] - status['partially_published'],
+        }
+
+    return {
+        **totals,
+        'platform_stats': by_kind.get(GameReleaseAttribute.PLATFORM, {}),
+        'marketplace_stats': by_kind.get(GameReleaseAttribute.MARKETPLACE, {}),
+        'language_stats': by_kind.get(GameReleaseAttribute.LANGUAGE, {}),
+        'marketplace_status': marketplace_status,
+        'month_stats': months,
+    }
+
+
+def get_release_stats():
+    """Статистика каталога, закешированная до следующего изменения GameRelease"""
+    version = CatalogVersion.current().version
+    key = f'releases:stats:{version}:{timezone.now().date()}'
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute_release_stats()
+        cache.set(key, stats, STATS_CACHE_TIMEOUT)
+    return stats
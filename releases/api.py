@@ -0,0 +1,318 @@
+"""
+Общая логика JSON API релизов: разбор фильтров, сериализация, кеш ответов.
+
+Кеш ответа ключуется версией каталога (CatalogVersion) и нормализованным
+набором фильтров, поэтому любая запись GameRelease сразу делает старые
+записи кеша недостижимыми - явная инвалидация не нужна.
+"""
+import hashlib
+import json
+from datetime import datetime, timedelta
+
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import (
+    GameRelease, GameReleaseAttribute, GameReleaseTombstone, filter_by_attribute, normalize_choice_codes,
+)
+from .pagination import decode_cursor, encode_cursor
+
+API_FIELDS = (
+    'id', 'title', 'icon', 'release_date', 'platforms', 'marketplaces', 'languages',
+    'marketplace_platforms', 'description', 'price', 'created_at', 'updated_at',
+)
+RESPONSE_CACHE_TIMEOUT = 60 * 10
+
+# format= : json - обычный ответ (кешируется), json-stream / ndjson - потоковая выдача
+RESPONSE_FORMATS = ('json', 'json-stream', 'ndjson')
+STREAM_CHUNK_SIZE = 500  # строк из БД за раз
+STREAM_ROWS_PER_WRITE = 100  # строк в одном куске ответа
+
+CHANGES_DEFAULT_LIMIT = 500
+CHANGES_MAX_LIMIT = 2000
+# Изменения моложе этого не отдаём: updated_at ставится до коммита, и более
+# ранняя по времени, но позже закоммиченная запись иначе проскочила бы курсор
+CHANGES_SETTLE_SECONDS = 5
+
+# Порядок в ленте при равном времени: сначала изменения, потом удаления
+CHANGE_UPSERT = 0
+CHANGE_DELETE = 1
+
+
+class ApiError(Exception):
+    def __init__(self, message, code):
+        super().__init__(message)
+        self.message = message
+        self.code = code
+
+
+def parse_release_date(date_str):
+    """
+    Парсит строку даты в объект date.
+    Поддерживаем форматы:
+    - "2026-03-31"
+    - "2026-03-31 00:00" (время игнорируется, т.к. поле DateField)
+    - "2026-03-31T00:00"
+    """
+    for fmt in ("%Y-%m-%d", "%Y-%m-%d %H:%M", "%Y-%m-%dT%H:%M"):
+        try:
+            dt = datetime.strptime(date_str, fmt)
+            return dt.date()  # возвращаем только дату
+        except ValueError:
+            continue
+    raise ValueError(f"Invalid date format: {date_str}. Use: YYYY-MM-DD")
+
+
+def _single_code(value, choices):
+    codes = normalize_choice_codes([value], choices) if value else []
+    return codes[0] if codes else None
+
+
+def parse_fields(params):
+    if not params.get('fields'):
+        return None
+    requested = [field.strip() for field in params['fields'].split(',') if field.strip()]
+    unknown = [field for field in requested if field not in API_FIELDS]
+    if unknown:
+        raise ApiError(f"Unknown fields: {', '.join(unknown)}", 'INVALID_FIELDS')
+    # канонический порядок, чтобы "title,id" и "id,title" давали один ответ
+    return tuple(field for field in API_FIELDS if field in requested)
+
+
+def parse_filters(params):
+    """Проверяет и нормализует параметры запроса. Бросает ApiError"""
+    date_from = params.get('date_from')
+    date_to = params.get('date_to')
+    if not date_from or not date_to:
+        raise ApiError('Missing required parameters: date_from and date_to', 'MISSING_PARAMETERS')
+    try:
+        dt_from = parse_release_date(date_from)
+        dt_to = parse_release_date(date_to)
+    except ValueError as e:
+        raise ApiError(str(e), 'INVALID_DATE_FORMAT')
+
+    fields = parse_fields(params)
+
+    response_format = params.get('format') or 'json'
+    if response_format not in RESPONSE_FORMATS:
+        raise ApiError(f"Unknown format: {response_format}. Use: {', '.join(RESPONSE_FORMATS)}", 'INVALID_FORMAT')
+
+    search = (params.get('search') or '').strip()
+    return {
+        'date_from': dt_from,
+        'date_to': dt_to,
+        'platform': _single_code(params.get('platform'), GameRelease.PLATFORM_CHOICES),
+        'marketplace': _single_code(params.get('marketplace'), GameRelease.MARKETPLACE_CHOICES),
+        'language': _single_code(params.get('language'), GameRelease.LANGUAGE_CHOICES),
+        'search': search or None,
+        'fields': fields,
+        'format': response_format,
+    }
+
+
+def filter_releases(filters):
+    queryset = GameRelease.objects.filter(
+        is_published=True,
+        release_date__gte=filters['date_from'],
+        release_date__lte=filters['date_to'],
+    )
+    if filters['platform']:
+        queryset = filter_by_attribute(queryset, GameReleaseAttribute.PLATFORM, filters['platform'])
+    if filters['marketplace']:
+        queryset = filter_by_attribute(queryset, GameReleaseAttribute.MARKETPLACE, filters['marketplace'])
+    if filters['language']:
+        queryset = filter_by_attribute(queryset, GameReleaseAttribute.LANGUAGE, filters['language'])
+    if filters['search']:
+        queryset = queryset.filter(title__icontains=filters['search'])
+    return queryset.order_by('release_date', 'id')
+
+
+def filters_summary(filters):
+    return {
+        'date_from': filters['date_from'].strftime("%Y-%m-%d"),
+        'date_to': filters['date_to'].strftime("%Y-%m-%d"),
+        'platform': filters['platform'],
+        'marketplace': filters['marketplace'],
+        'language': filters['language'],
+        'search': filters['search'],
+    }
+
+
+def release_rows(queryset, fields=None):
+    """
+    Строки релизов словарями из values() без создания моделей.
+    Для больших выборок - потоково, кусками по STREAM_CHUNK_SIZE.
+    """
+    columns = [field for field in (fields or API_FIELDS)]
+    if 'id' not in columns:
+        columns.append('id')
+    return queryset.values(*columns).iterator(chunk_size=STREAM_CHUNK_SIZE)
+
+
+def serialize_row(row, request, fields=None):
+    data = {}
+    for field in fields or API_FIELDS:
+        value = row[field]
+        if field == 'icon':
+            value = request.build_absolute_uri(default_storage.url(value)) if value else None
+        elif field == 'release_date':
+            value = value.strftime("%Y-%m-%d")
+        elif field in ('created_at', 'updated_at'):
+            value = value.strftime("%Y-%m-%d %H:%M:%S")
+        elif field == 'price':
+            value = str(value)  # Decimal → str для JSON
+        data[field] = value
+    return data
+
+
+def render_json_body(queryset, request, filters):
+    releases = [serialize_row(row, request, filters['fields']) for row in release_rows(queryset, filters['fields'])]
+    return json.dumps({
+        'success': True,
+        'count': len(releases),
+        'filters': filters_summary(filters),
+        'data': releases
+    }, ensure_ascii=False).encode()
+
+
+def stream_body(queryset, request, filters):
+    """
+    Генератор кусков ответа для StreamingHttpResponse. Память не зависит
+    от размера выборки: в каждый момент в памяти не больше STREAM_CHUNK_SIZE строк.
+    - ndjson: первая строка - метаданные, дальше по строке на релиз
+    - json-stream: тот же JSON, что и обычный ответ, но count - в конце
+    """
+    fields = filters['fields']
+    ndjson = filters['format'] == 'ndjson'
+
+    if ndjson:
+        yield (json.dumps({'success': True, 'filters': filters_summary(filters)}, ensure_ascii=False) + '\n').encode()
+    else:
+        head = json.dumps({'success': True, 'filters': filters_summary(filters)}, ensure_ascii=False)
+        yield (head[:-1] + ', "data": [').encode()
+
+    count = 0
+    buffer = []
+    for row in release_rows(queryset, fields):
+        item = json.dumps(serialize_row(row, request, fields), ensure_ascii=False)
+        if ndjson:
+            buffer.append(item + '\n')
+        else:
+            buffer.append(item if count == 0 else ', ' + item)
+        count += 1
+        if len(buffer) >= STREAM_ROWS_PER_WRITE:
+            yield ''.join(buffer).encode()
+            buffer = []
+    if buffer:
+        yield ''.join(buffer).encode()
+
+    if not ndjson:
+        yield f'], "count": {count}}}'.encode()
+
+
+def response_cache_key(version, filters, request, *extra):
+    """Ключ кеша и сильный ETag: тело ответа однозначно определяется этими данными"""
+    parts = [str(version), request.get_host()]
+    parts += [f"{key}={value}" for key, value in sorted(filters.items())]
+    parts += [str(part) for part in extra]
+    digest = hashlib.sha256('|'.join(parts).encode()).hexdigest()
+    return f"releases:api:{digest}", f'"{digest[:32]}"'
+
+
+def get_cached_body(key):
+    return cache.get(key)
+
+
+def set_cached_body(key, body):
+    cache.set(key, body, RESPONSE_CACHE_TIMEOUT)
+
+
+def parse_changes_params(params):
+    """cursor (непрозрачная строка из next_cursor), limit, fields"""
+    cursor = None
+    if params.get('cursor'):
+        values = decode_cursor(params['cursor'], 3)
+        try:
+            cursor = (datetime.fromisoformat(values[0]), int(values[1]), int(values[2]))
+        except (TypeError, ValueError):
+            raise ApiError('Invalid cursor', 'INVALID_CURSOR')
+
+    try:
+        limit = int(params.get('limit') or CHANGES_DEFAULT_LIMIT)
+    except ValueError:
+        raise ApiError('limit must be an integer', 'INVALID_LIMIT')
+    limit = max(1, min(limit, CHANGES_MAX_LIMIT))
+    return {'cursor': cursor, 'limit': limit, 'fields': parse_fields(params)}
+
+
+def _after_cursor(time_field, rank, cursor):
+    """(time, rank, id) > cursor для одной из таблиц с фиксированным rank"""
+    if cursor is None:
+        return Q()
+    ts, cursor_rank, cursor_id = cursor
+    same_time = Q(**{time_field: ts})
+    if rank > cursor_rank:
+        return Q(**{f'{time_field}__gt': ts}) | same_time
+    if rank < cursor_rank:
+        return Q(**{f'{time_field}__gt': ts})
+    return Q(**{f'{time_field}__gt': ts}) | (same_time & Q(id__gt=cursor_id))
+
+
+def get_changes(params, request):
+    """
+    Лента изменений: релизы с (updated_at, id) после курсора и удалённые
+    релизы с (deleted_at, id) после курсора, одним упорядоченным списком.
+    Оба запроса идут по индексам и ограничены limit - стоимость O(изменений).
+    """
+    cursor, limit, fields = params['cursor'], params['limit'], params['fields']
+    settled = timezone.now() - timedelta(seconds=CHANGES_SETTLE_SECONDS)
+
+    columns = list(fields or API_FIELDS)
+    for column in ('id', 'updated_at'):
+        if column not in columns:
+            columns.append(column)
+    upserts = GameRelease.objects.filter(
+        _after_cursor('updated_at', CHANGE_UPSERT, cursor), updated_at__lte=settled
+    ).order_by('updated_at', 'id').values(*columns, 'is_published')[:limit + 1]
+    deletes = GameReleaseTombstone.objects.filter(
+        _after_cursor('deleted_at', CHANGE_DELETE, cursor), deleted_at__lte=settled
+    ).order_by('deleted_at', 'id').values('id', 'release_id', 'deleted_at')[:limit + 1]
+
+    merged = [(row['updated_at'], CHANGE_UPSERT, row['id'], row) for row in upserts]
+    merged += [(row['deleted_at'], CHANGE_DELETE, row['id'], row) for row in deletes]
+    merged.sort(key=lambda item: item[:3])
+    has_more = len(merged) > limit
+    merged = merged[:limit]
+
+    changes = []
+    for ts, rank, _, row in merged:
+        if rank == CHANGE_UPSERT:
+            changes.append({
+                'op': 'upsert',
+                'id': row['id'],
+                'is_published': row['is_published'],
+                'changed_at': ts.isoformat(),
+                'data': serialize_row(row, request, fields),
+            })
+        else:
+            changes.append({
+                'op': 'delete',
+                'id': row['release_id'],
+                'changed_at': ts.isoformat(),
+            })
+
+    if merged:
+        ts, rank, row_id, _ = merged[-1]
+        next_cursor = encode_cursor([ts.isoformat(), rank, row_id])
+    else:
+        next_cursor = encode_cursor([cursor[0].isoformat(), cursor[1], cursor[2]]) if cursor else ''
+
+    return {
+        'success': True,
+        'count': len(changes),
+        'has_more': has_more,
+        'next_cursor': next_cursor,
+        'changes': changes,
+    }
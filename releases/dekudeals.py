@@ -0,0 +1,182 @@
+"""
+Локализации с DekuDeals: адрес страницы по названию, разбор блока языков
+(без сети - проверяется на сохранённых страницах, releases.replay), отбор
+кандидатов в БД и условный запрос через кеш (releases.http_cache).
+
+Используется check_localizations и источником импорта DekuDealsSource.
+"""
+import logging
+import threading
+from datetime import timedelta
+
+import requests
+from bs4 import BeautifulSoup
+from django.conf import settings
+from django.db.models import Case, Exists, F, OuterRef, Q, Value, When
+from django.utils import timezone
+
+from . import http_cache
+from .downloads import RateLimiter
+from .ingestion import ReleaseSource, known_languages
+from .models import GameRelease, GameReleaseAttribute, normalize_title
+
+logger = logging.getLogger(__name__)
+
+DEKUDEALS_ITEM_URL = "https://www.dekudeals.com/items/{slug}"
+REQUEST_TIMEOUT = 10
+SESSION_COOKIES = [
+    'BAh7DEkiD3Nlc3Npb25faWQGOgZFVG86HVJhY2s6OlNlc3Npb246OlNlc3Npb25JZAY6D0BwdWJsaWNfaWRJIkU0ZjEzMjA3OWZjNWFmYTY0NjI0Njk2OGQyOGYzZTdhMzUyNGJlNzMzMTU0OTkzMDUzYmQ5Y2U5MWU3YmExZGEyBjsARkkiCWNzcmYGOwBGSSIxUnVPMWN3WkUwS3hXWE5jd2l1ZlpTdkctMDJHLUUtMl9ISFRXVjhfNWxUYz0GOwBGSSIOX19GTEFTSF9fBjsARnsASSILc291cmNlBjsARiIXaHR0cHM6Ly9lLm1haWwucnUvSSIMbGFuZGluZwY7AEZJIgYvBjsAVEkiDGNvdW50cnkGOwBGSSIHdXMGOwBUSSIJYWJpZAY7AEZJIhk5MDQyNDgxOTg2OTYxNTk0ODk5MgY7AEY%3D--be10e9f18362118284078c9f9c33b6f92eb694a7'
+]
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64; rv:109.0) Gecko/20100101 Firefox/115.0',
+}
+
+LANGUAGE_LABELS = ('Languages:', 'Language:', 'Языки:', 'Язык:')
+RUSSIAN_WORDS = ('Russian', 'русский', 'Русский')
+ENGLISH_WORDS = ('English',)
+
+
+def dekudeals_url(game_title):
+    """Генерирует URL для DekuDeals на основе названия игры"""
+    slug = game_title.lower()
+    slug = ''.join(c if c.isalnum() or c == ' ' else ' ' for c in slug)
+    slug = '-'.join(slug.split())
+    return DEKUDEALS_ITEM_URL.format(slug=slug)
+
+
+def _languages_in(text, loco):
+    if any(word in text for word in RUSSIAN_WORDS) and 'RUSSIAN' not in loco:
+        loco.append('RUSSIAN')
+    if any(word in text for word in ENGLISH_WORDS) and 'ENGLISH' not in loco:
+        loco.append('ENGLISH')
+
+
+def parse_languages(content):
+    """Коды локализаций ('RUSSIAN', 'ENGLISH') со страницы игры; [] если блока языков нет"""
+    soup = BeautifulSoup(content, "html.parser")
+    loco = []
+
+    # Ищем блок с языками
+    for section in soup.select('div > div > ul > li'):
+        text = section.get_text(strip=True)
+        if 'Languages:' in text or 'Language:' in text:
+            _languages_in(text, loco)
+
+    # Альтернативные селекторы
+    for section in soup.select('.item-details, .game-info, .details'):
+        text = section.get_text()
+        if any(label in text for label in LANGUAGE_LABELS):
+            _languages_in(text, loco)
+
+    return loco
+
+
+def localization_candidates(force_all=False, recheck_after=None):
+    """
+    Игры к проверке, отобранные в SQL: с языком UNKNOW (по таблице атрибутов, без
+    чтения JSON всего каталога) или все при force_all, не проверявшиеся дольше
+    recheck_after часов. Сначала ближайшие будущие релизы, затем вышедшие от новых к старым.
+    """
+    games = GameRelease.objects.all()
+    if not force_all:
+        games = games.filter(Exists(GameReleaseAttribute.objects.filter(
+            release=OuterRef('pk'), kind=GameReleaseAttribute.LANGUAGE, code='UNKNOW',
+        )))
+    if recheck_after:
+        games = games.filter(
+            Q(localization_checked_at__isnull=True)
+            | Q(localization_checked_at__lt=timezone.now() - timedelta(hours=recheck_after))
+        )
+    today = timezone.localdate()
+    return games.only(
+        # Поля для запросов и GameReleaseAttribute.sync после записи - без догрузки по строке
+        'id', 'title', 'release_date', *GameReleaseAttribute.SOURCE_FIELDS,
+    ).order_by(
+        Case(When(release_date__gte=today, then=Value(0)), default=Value(1)),
+        Case(When(release_date__gte=today, then=F('release_date'))).asc(nulls_last=True),
+        '-release_date',
+        'id',
+    )
+
+
+def lookup_languages(http, limiter, game_title, entry=None, on_error=None):
+    """
+    Языки игры условным запросом по записи кеша: (языки, исход, запись кеша для сохранения).
+    Языки None - проверить не удалось; on_error(title, exc) - о каждой сетевой ошибке.
+    """
+    url = dekudeals_url(game_title)
+    headers = {**HEADERS, **http_cache.conditional_headers(entry)}
+
+    for cookie in SESSION_COOKIES:
+        try:
+            limiter.wait(url)
+            response = http.get(url, cookies={'rack.session': cookie}, headers=headers, timeout=REQUEST_TIMEOUT)
+            return http_cache.revalidate(url, entry, response, parse_languages)
+        except requests.RequestException as e:
+            if on_error:
+                on_error(game_title, e)
+            continue
+
+    return None, None, None
+
+
+class DekuDealsSource(ReleaseSource):
+    """
+    Дополняющий источник импорта (releases.ingestion): языки для релизов, найденных
+    в этом прогоне, и для INGESTION_LOCALIZATION_LIMIT кандидатов из БД.
+    Новые релизы не создаёт.
+    """
+    name = 'DEKUDEALS'
+    priority = 50
+
+    def __init__(self, http, **options):
+        super().__init__(http, **options)
+        self.workers = max(1, getattr(settings, 'LOCALIZATION_WORKERS', 4))
+        self.limiter = RateLimiter(getattr(settings, 'LOCALIZATION_RATE', 1.0), burst=self.workers)
+        self.limit = options.get('localization_limit')
+        if self.limit is None:
+            self.limit = getattr(settings, 'INGESTION_LOCALIZATION_LIMIT', 0)
+        self.cache_entries = {}
+        self._cache_lock = threading.Lock()
+
+    def discover(self, records=()):
+        titles = {}
+        for record in records:
+            if record.get('creates') and not known_languages(record.get('languages')):
+                titles.setdefault(normalize_title(record['title']), (record['title'], record.get('release_date')))
+        if self.limit:
+            recheck_after = getattr(settings, 'LOCALIZATION_RECHECK_HOURS', 24)
+            for game in localization_candidates(recheck_after=recheck_after)[:self.limit]:
+                titles.setdefault(normalize_title(game.title), (game.title, game.release_date))
+
+        entries = http_cache.load_entries(dekudeals_url(title) for title, _ in titles.values())
+        tasks = []
+        for title, release_date in titles.values():
+            entry = entries.get(dekudeals_url(title))
+            fresh = http_cache.is_fresh(entry, http_cache.ttl_for_release(release_date))
+            tasks.append((title, entry, fresh))
+        return tasks
+
+    def fetch(self, task):
+        title, entry, fresh = task
+        if fresh:
+            return entry.result, http_cache.FRESH, None
+        return lookup_languages(self.http, self.limiter, title, entry, on_error=self._log_error)
+
+    def _log_error(self, title, error):
+        logger.warning('DekuDeals lookup failed', extra={'title': title, 'error': str(error)})
+
+    def parse(self, raw, task):
+        languages, outcome, entry = raw
+        if languages is None:
+            self.count('failed')
+            return []
+        self.count(f'cache_{outcome}')
+        if entry is not None:
+            with self._cache_lock:
+                self.cache_entries[entry.url] = entry
+        return [{'title': task[0], 'languages': list(languages), 'checked': True}]
+
+    def commit(self):
+        http_cache.save_entries(list(self.cache_entries.values()))
+        self.cache_entries.clear()
@@ -0,0 +1,154 @@
+"""
+HTTP для импортёров: общая requests.Session с пулом соединений, ограничение
+частоты запросов к хосту и параллельное скачивание картинок прямо в хранилище медиа.
+
+Тело ответа читается кусками в SpooledTemporaryFile (в памяти до SPOOL_MAX_SIZE) -
+ContentAddressedStorage нужно пройти по содержимому дважды (хеш, затем запись),
+а временный файл на диске для иконки в сотню килобайт не нужен.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from tempfile import SpooledTemporaryFile
+from urllib.parse import urlsplit
+
+import requests
+from django.core.files import File
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from . import replay
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+    '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+)
+
+# (connect, read) таймауты на картинку, секунды
+DOWNLOAD_TIMEOUT = (5, 15)
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+SPOOL_MAX_SIZE = 1024 * 1024
+# Больше - не иконка, не качаем
+MAX_DOWNLOAD_SIZE = 10 * 1024 * 1024
+# Повторы поверх Retry адаптера: обрывы посреди тела ответа он не повторяет
+DOWNLOAD_ATTEMPTS = 3
+DOWNLOAD_BACKOFF = 0.5
+
+
+def build_session(pool_size=8, retries=3):
+    """Session с пулом соединений и повторами с экспоненциальной паузой на 429/5xx"""
+    session = requests.Session()
+    retry = Retry(
+        total=retries,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({
+        'User-Agent': USER_AGENT,
+        'Accept-Language': 'en-US,en;q=0.9',
+    })
+    # SCRAPER_HTTP_MODE=record/replay - запись ответов или работа без сети
+    return replay.install(session)
+
+
+class RateLimiter:
+    """
+    Token bucket на каждый хост: в среднем rate запросов в секунду, до burst подряд.
+    Общий для всех потоков - wait() блокирует вызывающий поток до выдачи токена.
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def _reserve(self, host):
+        """Забирает токен, возвращает сколько секунд ждать до его выдачи"""
+        with self._lock:
+            now = time.monotonic()
+            tokens, updated = self._buckets.get(host, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate) - 1
+            self._buckets[host] = (tokens, now)
+        return -tokens / self.rate if tokens < 0 else 0
+
+    def wait(self, url):
+        if self.rate <= 0:
+            return
+        delay = self._reserve(urlsplit(url).netloc.lower())
+        if delay:
+            time.sleep(delay)
+
+
+class DownloadTooLarge(Exception):
+    pass
+
+
+def _fetch(session, url):
+    """Тело ответа в SpooledTemporaryFile, курсор в начале"""
+    with session.get(url, timeout=DOWNLOAD_TIMEOUT, stream=True) as response:
+        response.raise_for_status()
+        length = response.headers.get('Content-Length')
+        if length and length.isdigit() and int(length) > MAX_DOWNLOAD_SIZE:
+            raise DownloadTooLarge(url)
+        body = SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+        size = 0
+        for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+            size += len(chunk)
+            if size > MAX_DOWNLOAD_SIZE:
+                body.close()
+                raise DownloadTooLarge(url)
+            body.write(chunk)
+    body.seek(0)
+    return body
+
+
+def download_to_storage(session, url, name, storage):
+    """Скачивает url и сохраняет в storage под name; возвращает итоговое имя или None"""
+    for attempt in range(DOWNLOAD_ATTEMPTS):
+        try:
+            body = _fetch(session, url)
+        except DownloadTooLarge:
+            logger.warning('Download too large: %s', url)
+            return None
+        except requests.HTTPError as e:
+            # 429/5xx уже повторил Retry адаптера, 4xx повторять бессмысленно
+            logger.warning('Download failed: %s (%s)', url, e)
+            return None
+        except requests.RequestException as e:
+            if attempt == DOWNLOAD_ATTEMPTS - 1:
+                logger.warning('Download failed: %s (%s)', url, e)
+                return None
+            time.sleep(DOWNLOAD_BACKOFF * 2 ** attempt)
+            continue
+        with body:
+            return storage.save(name, File(body, name))
+    return None
+
+
+def download_many(session, jobs, storage, workers=8):
+    """
+    jobs: [(key, url, name), ...] -> {key: сохранённое имя} для удачных загрузок.
+    Загрузки идут параллельно через общий пул соединений session.
+    """
+    if not jobs:
+        return {}
+
+    def run(job):
+        key, url, name = job
+        try:
+            return key, download_to_storage(session, url, name, storage)
+        except Exception:
+            logger.exception('Download failed: %s', url)
+            return key, None
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(jobs))), thread_name_prefix='download') as pool:
+        return {key: name for key, name in pool.map(run, jobs) if name}
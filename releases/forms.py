@@ -1,5 +1,5 @@
 from django import forms
-from .models import GameRelease
+from .models import GameRelease, normalize_title
 
 class GameReleaseForm(forms.ModelForm):
     # Делаем поля для множественного выбора
@@ -48,6 +48,15 @@ class GameReleaseForm(forms.ModelForm):
             self.fields['marketplaces'].initial = self.instance.marketplaces
             self.fields['languages'].initial = self.instance.languages
     
+    def clean_title(self):
+        title = self.cleaned_data['title']
+        duplicates = GameRelease.objects.filter(normalized_title=normalize_title(title))
+        if self.instance and self.instance.pk:
+            duplicates = duplicates.exclude(pk=self.instance.pk)
+        if duplicates.exists():
+            raise forms.ValidationError('Игра с таким названием уже есть')
+        return title
+    
     def save(self, commit=True):
         instance = super().save(commit=False)
         # Сохраняем множественные выборы как JSON
@@ -0,0 +1,122 @@
+"""
+Постоянный кеш внешних страниц для проверок (DekuDeals в check_localizations).
+
+Запись HttpCacheEntry хранит валидаторы ответа, хеш тела и результат разбора:
+- моложе TTL - в сеть не ходим вовсе, берём сохранённый результат;
+- старше - условный GET (If-None-Match / If-Modified-Since): на 304 и на тело
+  с тем же хешем разбор пропускается.
+TTL зависит от даты релиза: вокруг выхода языки меняются часто, у старых игр - почти никогда.
+"""
+import hashlib
+from datetime import timedelta
+
+from django.utils import timezone
+
+from .models import HttpCacheEntry
+
+# (релиз не дальше стольких дней от сегодня в любую сторону, TTL)
+TTL_POLICY = (
+    (30, timedelta(days=1)),
+    (180, timedelta(days=7)),
+)
+TTL_DEFAULT = timedelta(days=30)
+
+# Кешируем и «страницы нет»: не ходить за несуществующим адресом каждый прогон
+CACHEABLE_STATUSES = (200, 404, 410)
+
+# Адресов в одном WHERE url IN (...)
+LOOKUP_CHUNK = 500
+
+# Возможные исходы проверки - для итогов команды
+FRESH = 'fresh'
+NOT_MODIFIED = 'not_modified'
+UNCHANGED = 'unchanged'
+PARSED = 'parsed'
+UNCACHED = 'uncached'
+
+
+def ttl_for_release(release_date, today=None):
+    """Сколько доверять сохранённому результату для релиза с этой датой"""
+    if release_date is None:
+        return TTL_DEFAULT
+    today = today or timezone.localdate()
+    distance = abs((release_date - today).days)
+    for max_days, ttl in TTL_POLICY:
+        if distance <= max_days:
+            return ttl
+    return TTL_DEFAULT
+
+
+def is_fresh(entry, ttl, now=None):
+    return entry is not None and (now or timezone.now()) - entry.checked_at < ttl
+
+
+def conditional_headers(entry):
+    """Заголовки условного запроса по сохранённым валидаторам"""
+    headers = {}
+    if entry is not None and entry.status == 200:
+        if entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+    return headers
+
+
+def body_hash(content):
+    return hashlib.sha256(content).hexdigest()
+
+
+def revalidate(url, entry, response, parse):
+    """
+    Результат по ответу на условный запрос и запись кеша для сохранения (или None).
+    parse(content) вызывается только для изменившегося тела. Возвращает (результат, исход, запись).
+    """
+    now = timezone.now()
+    if response.status_code == 304 and entry is not None:
+        entry.checked_at = now
+        return entry.result, NOT_MODIFIED, entry
+
+    if response.status_code == 200:
+        digest = body_hash(response.content)
+        if entry is not None and entry.status == 200 and entry.body_hash == digest:
+            result, outcome = entry.result, UNCHANGED
+        else:
+            result, outcome = parse(response.content), PARSED
+    else:
+        same = entry is not None and entry.status == response.status_code
+        digest, result, outcome = '', [], UNCHANGED if same else PARSED
+
+    if response.status_code not in CACHEABLE_STATUSES:
+        return result, UNCACHED, None
+
+    entry = entry or HttpCacheEntry(url=url)
+    entry.status = response.status_code
+    entry.etag = response.headers.get('ETag', '')[:200]
+    entry.last_modified = response.headers.get('Last-Modified', '')[:100]
+    entry.body_hash = digest
+    entry.result = result
+    entry.checked_at = now
+    return result, outcome, entry
+
+
+def load_entries(urls):
+    """{url: HttpCacheEntry} по одному запросу на LOOKUP_CHUNK адресов"""
+    urls = list(urls)
+    entries = {}
+    for i in range(0, len(urls), LOOKUP_CHUNK):
+        entries.update(
+            (entry.url, entry) for entry in HttpCacheEntry.objects.filter(url__in=urls[i:i + LOOKUP_CHUNK])
+        )
+    return entries
+
+
+def save_entries(entries):
+    """Пакетный upsert записей по url"""
+    if not entries:
+        return
+    HttpCacheEntry.objects.bulk_create(
+        entries,
+        update_conflicts=True,
+        unique_fields=['url'],
+        update_fields=['status', 'etag', 'last_modified', 'body_hash', 'result', 'checked_at'],
+    )
@@ -0,0 +1,57 @@
+"""
+Импорт релизов IGN без браузера: страница upcoming скачивается requests'ом,
+разбирается releases.ign_pages, а фильтрация и сохранение - общие с IGNReleaseParser.
+
+Страница и картинки идут через одну requests.Session парсера (releases.downloads):
+keep-alive, пул соединений и повторы на 429/5xx.
+"""
+import logging
+
+from .ign_pages import parse_upcoming_page
+from .ign_parser import IGNReleaseParser
+from .runs import phase_of
+
+logger = logging.getLogger(__name__)
+
+# (connect, read) таймауты запроса страницы, секунды
+PAGE_TIMEOUT = (5, 20)
+
+
+class IGNHttpReleaseParser(IGNReleaseParser):
+    """IGNReleaseParser, у которого вместо Chrome - requests.Session"""
+
+    def fetch_page(self, url):
+        response = self.http.get(url, timeout=PAGE_TIMEOUT, headers={
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+        })
+        response.raise_for_status()
+        self.stats['total_pages_loaded'] += 1
+        return response.text
+
+    def parse_html(self, html):
+        """Игры со страницы после фильтров парсера - точка входа для тестов на сохранённых страницах"""
+        games = parse_upcoming_page(html)
+        self.stats['game_links_found'] += len(games)
+        logger.info('Upcoming page parsed', extra={'games': len(games)})
+        return self._filter_games(games)
+
+    def parse_releases(self):
+        logger.info('IGN parse started', extra={'date_from': self.today, 'date_to': self.max_date, 'fetcher': 'http'})
+
+        try:
+            with phase_of(self.recorder, 'fetch'):
+                html = self.fetch_page(self.BASE_URL)
+            with phase_of(self.recorder, 'parse'):
+                games_data = self.parse_html(html)
+            new_games = self._save_to_database(games_data)
+            self.stats['games_saved'] = len(new_games)
+            self._log_stats()
+            return new_games
+
+        except Exception:
+            # Ошибку не глотаем: прогон (RunRecorder) должен записаться как failed
+            self.stats['errors'] += 1
+            self._log_stats()
+            raise
+        finally:
+            self.http.close()
@@ -0,0 +1,236 @@
+"""
+Разбор страницы https://www.ign.com/upcoming/games без браузера и сети.
+
+На вход - HTML целиком (из requests или сохранённый в файл), на выходе - список
+словарей {title, release_date, platforms, image_url, url}. Им пользуются оба
+парсера: HTTP (releases.ign_http) и Selenium (по driver.page_source). Фильтрация
+по датам/платформам и сохранение остаются в IGNReleaseParser.
+
+Сначала пробуем встроенный JSON Next.js (<script id="__NEXT_DATA__">), если
+в нём нет игр - разбираем плитки HTML (a[href*="/games/"] с figcaption.tile-title).
+"""
+import json
+import re
+from datetime import datetime
+
+import lxml.html
+
+IGN_ORIGIN = 'https://www.ign.com'
+
+NEXT_DATA_RE = re.compile(
+    r'<script[^>]+id="__NEXT_DATA__"[^>]*>(.*?)</script>', re.DOTALL
+)
+ISO_DATE_RE = re.compile(r'^(\d{4}-\d{2}-\d{2})')
+DATE_JUNK_RE = re.compile(r'[^\w\s,]')
+DATE_IN_TEXT_RE = re.compile(r'([A-Za-z]{3,10}\s+\d{1,2},\s+\d{4})')
+
+ALLOWED_PLATFORMS = frozenset(['PS4', 'PS5', 'SWITCH', 'SWITCH2', 'XBOX_ONE', 'XBOX_SERIES'])
+# Слова в названии, по которым ссылка на /games/ - не игра (статьи, видео)
+EXCLUDE_TITLE_WORDS = ('ign', 'game', 'review', 'news', 'trailer', 'video', 'upcoming')
+
+# Подстроки slug/названия платформы IGN -> наш код. Порядок важен: switch-2 раньше switch
+PLATFORM_KEYS = (
+    ('playstation-5', 'PS5'),
+    ('playstation 5', 'PS5'),
+    ('ps5', 'PS5'),
+    ('playstation-4', 'PS4'),
+    ('playstation 4', 'PS4'),
+    ('ps4', 'PS4'),
+    ('xbox-series', 'XBOX_SERIES'),
+    ('xbox series', 'XBOX_SERIES'),
+    ('xbox-one', 'XBOX_ONE'),
+    ('xbox one', 'XBOX_ONE'),
+    ('nintendo-switch-2', 'SWITCH2'),
+    ('nintendo switch 2', 'SWITCH2'),
+    ('switch-2', 'SWITCH2'),
+    ('switch2', 'SWITCH2'),
+    ('switch 2', 'SWITCH2'),
+    ('nintendo-switch', 'SWITCH'),
+    ('nintendo switch', 'SWITCH'),
+    ('switch', 'SWITCH'),
+)
+
+DATE_FORMATS = ('%b %d, %Y', '%B %d, %Y', '%Y-%m-%d')
+
+
+def platform_code(value):
+    """Код платформы по slug/data-cy/названию IGN или None, если платформа нам не нужна"""
+    value = (value or '').lower()
+    for key, code in PLATFORM_KEYS:
+        if key in value:
+            return code
+    return None
+
+
+def parse_date(value):
+    """'Oct 1, 2025', 'October 1, 2025' или ISO '2025-10-01T00:00:00Z' -> date"""
+    if not value:
+        return None
+    value = value.strip()
+    iso = ISO_DATE_RE.match(value)
+    if iso:
+        value = iso.group(1)
+    else:
+        value = DATE_JUNK_RE.sub('', value)
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def absolute_url(href):
+    if href and href.startswith('/'):
+        return IGN_ORIGIN + href
+    return href
+
+
+# Встроенный JSON
+
+def _first(data, *paths):
+    """Первое непустое значение по списку путей вида 'metadata.names.name'"""
+    for path in paths:
+        value = data
+        for key in path.split('.'):
+            value = value.get(key) if isinstance(value, dict) else None
+        if value:
+            return value
+    return None
+
+
+def _json_platforms(item):
+    platforms = []
+    for entry in item.get('platforms') or item.get('platformAttributes') or []:
+        if isinstance(entry, dict):
+            entry = entry.get('slug') or entry.get('name') or ''
+        code = platform_code(entry)
+        if code and code not in platforms:
+            platforms.append(code)
+    return platforms
+
+
+def _json_game(item):
+    url = _first(item, 'url', 'link')
+    if not isinstance(url, str) or '/games/' not in url:
+        return None
+    title = _first(item, 'metadata.names.name', 'name', 'title')
+    release_date = parse_date(_first(item, 'releaseDate', 'release.date', 'date'))
+    if not isinstance(title, str) or not release_date:
+        return None
+    game = {
+        'title': title.strip(),
+        'release_date': release_date,
+        'platforms': _json_platforms(item),
+        'url': absolute_url(url),
+    }
+    image = _first(item, 'primaryImage.url', 'image.url', 'image')
+    if isinstance(image, str):
+        game['image_url'] = image
+    return game
+
+
+def _walk(node):
+    """Все объекты JSON в порядке документа - при повторах игры побеждает первое вхождение"""
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            yield node
+            stack.extend(reversed(list(node.values())))
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
+
+
+def parse_next_data(html):
+    """Игры из __NEXT_DATA__: любые объекты с url на /games/, названием и датой релиза"""
+    match = NEXT_DATA_RE.search(html)
+    if not match:
+        return []
+    try:
+        data = json.loads(match.group(1))
+    except ValueError:
+        return []
+    games = {}
+    for item in _walk(data):
+        game = _json_game(item)
+        if game and game['url'] not in games:
+            games[game['url']] = game
+    return list(games.values())
+
+
+# Плитки HTML
+
+def _text(element):
+    return ' '.join(element.text_content().split())
+
+
+def _tile_game(link):
+    """Одна плитка a[href*="/games/"] за один проход по её поддереву"""
+    title = date_text = image_url = None
+    platforms = []
+    for element in link.iter():
+        tag = element.tag
+        if not isinstance(tag, str):  # комментарии, processing instructions
+            continue
+        classes = element.get('class') or ''
+        if tag == 'figcaption':
+            if title is None and 'tile-title' in classes:
+                title = _text(element)
+        elif tag == 'div':
+            if date_text is None and 'tile-meta' in classes:
+                date_text = _text(element)
+        elif tag == 'span':
+            if 'platform-icon' in classes.split():
+                code = platform_code(element.get('data-cy'))
+                if not code:
+                    for img in element.iter('img'):
+                        if 'icon-nintendo-switch' in (img.get('class') or ''):
+                            code = 'SWITCH'
+                if code and code not in platforms:
+                    platforms.append(code)
+        elif tag == 'img':
+            if image_url is None and element.get('src'):
+                image_url = element.get('src')
+
+    if not title:
+        lines = [line.strip() for line in link.itertext() if line.strip()]
+        title = lines[0] if lines else ''
+    if not title:
+        return None
+
+    if date_text is None:
+        match = DATE_IN_TEXT_RE.search(_text(link))
+        if not match:
+            return None
+        date_text = match.group(1)
+
+    game = {
+        'title': title,
+        'release_date': parse_date(date_text),
+        'platforms': platforms,
+        'url': absolute_url(link.get('href')),
+    }
+    if image_url:
+        game['image_url'] = image_url
+    return game
+
+
+def parse_tiles(html):
+    """Игры из плиток страницы: один разбор lxml, один проход по дереву"""
+    if not html or not html.strip():
+        return []
+    root = lxml.html.fromstring(html)
+    games = []
+    for link in root.iter('a'):
+        if '/games/' not in (link.get('href') or ''):
+            continue
+        game = _tile_game(link)
+        if game:
+            games.append(game)
+    return games
+
+
+def parse_upcoming_page(html):
+    """Все игры со страницы upcoming: из встроенного JSON, иначе из плиток"""
+    return parse_next_data(html) or parse_tiles(html)
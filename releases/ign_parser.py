@@ -1,23 +1,75 @@
-import requests
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from bs4 import BeautifulSoup
+import logging
 import time
-import re
-import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 from django.utils import timezone
-from django.core.files import File
-from tempfile import NamedTemporaryFile
-from .models import GameRelease
+from django.conf import settings
+from .models import normalize_title
+from core.browser_pool import acquire_driver, release_driver
+from .downloads import build_session
+from .replay import record_page
+from .analytics import get_release_stats
+from .ign_pages import ALLOWED_PLATFORMS, EXCLUDE_TITLE_WORDS, parse_tiles, parse_upcoming_page
+from .ingestion import ReleaseSource, ReleaseWriter
+from .runs import phase_of
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+
+logger = logging.getLogger(__name__)
+
+TILE_SELECTOR = "a[href*='/games/']"
+# Сколько ждать появления/смены плиток, секунды
+TILES_TIMEOUT = 30
+COOKIE_ACCEPT_XPATH = (
+    "//button[contains(text(), 'Accept')] | "
+    "//button[contains(text(), 'Accept All')] | "
+    "//button[contains(text(), 'Принять')] | "
+    "//button[contains(@id, 'accept')] | "
+    "//button[contains(@class, 'accept')]"
+)
+CALENDAR_BUTTON_XPATH = "//button[contains(@class, 'calendar-dropdown')]"
+CALENDAR_YEAR_XPATH = "//div[@data-cy='calendar-year-container']"
+CALENDAR_NEXT_XPATH = "//button[@data-cy='calendar-next-btn']"
+MONTH_CODES = ['JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN',
+               'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC']
+
+
+def month_workers(months):
+    """
+    Браузеров для месяцев календаря: IGN_MONTH_WORKERS, но с пулом - не больше,
+    чем в нём останется после основного браузера (лишняя аренда ждала бы LEASE_TIMEOUT).
+    """
+    workers = getattr(settings, 'IGN_MONTH_WORKERS', 3)
+    if getattr(settings, 'BROWSER_POOL_URL', ''):
+        workers = min(workers, getattr(settings, 'BROWSER_POOL_SIZE', 4) - 1)
+    return max(1, min(workers, months))
+
+
+def _tiles_signature(driver):
+    """Ссылки первых плиток - по их смене видно, что сетка перерисовалась"""
+    try:
+        links = driver.find_elements(By.CSS_SELECTOR, TILE_SELECTOR)[:5]
+        return tuple(link.get_attribute('href') for link in links)
+    except Exception:
+        return ()
+
 
 class IGNReleaseParser:
     
-    def __init__(self):
-        self.setup_driver()
+    def __init__(self, http=None, recorder=None, writer=None):
+        # RunRecorder прогона (releases.runs): фазы fetch, parse, dedupe, save, images и счётчики stats
+        self.recorder = recorder
+        # Общая Session на прогон: страницы (HTTP-парсер) и картинки, пул на DOWNLOAD_WORKERS соединений
+        self.download_workers = getattr(settings, 'IGN_DOWNLOAD_WORKERS', 8)
+        self.http = http or build_session(pool_size=self.download_workers)
+        # Дедупликация, вставка и иконки - общие для всех источников импорта (в пайплайне - его writer)
+        self.writer = writer or ReleaseWriter(self.http, self.download_workers, recorder=recorder)
+        # Основной браузер берётся при первой загрузке страницы (setup_driver), не при создании
+        self.driver = None
+        # Сбой основного браузера; ошибки месяцев (свои браузеры) его не касаются
+        self.driver_failed = False
         self.stats = {
             'total_pages_loaded': 0,
             'game_links_found': 0,
@@ -32,199 +84,176 @@ class IGNReleaseParser:
         self.BASE_URL = "https://www.ign.com/upcoming/games"
     
     def setup_driver(self):
-        """Настраивает Chrome driver"""
-        chrome_options = Options()
-        chrome_options.add_argument("--headless=new")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--window-size=1920,1080")
-        chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
-        
-        chrome_options.add_argument("--disable-features=VizDisplayCompositor")
-        chrome_options.add_argument("--disable-background-timer-throttling")
-        chrome_options.add_argument("--disable-backgrounding-occluded-windows")
-        chrome_options.add_argument("--disable-renderer-backgrounding")
-        chrome_options.add_argument("--disable-ipc-flooding-protection")
-
-        
-        chrome_options.add_argument("--disable-extensions")
-        chrome_options.add_argument("--disable-plugins")
-        chrome_options.add_argument("--disable-translate")
-        chrome_options.add_argument("--disable-default-apps")
-
-        #
-        chrome_options.add_argument("--disable-extensions")
-        chrome_options.add_argument("--disable-plugins")
-        
-        chrome_options.binary_location = "/usr/bin/google-chrome"
-        # Явно указываем путь к ChromeDriver
-        service = webdriver.ChromeService(executable_path="/usr/local/bin/chromedriver")
-        
-        self.driver = webdriver.Chrome(service=service, options=chrome_options)
+        """Основной Chrome из пула browser_pool (если настроен) или свой; берётся один раз"""
+        if self.driver is None:
+            self.driver = acquire_driver()
+        return self.driver
     
     def parse_releases(self):
-        print(f"📅 Ищем игры с {self.today} по {self.max_date}")
+        logger.info('IGN parse started', extra={'date_from': self.today, 'date_to': self.max_date, 'fetcher': 'browser'})
         
         try:
-            self.driver.set_page_load_timeout(60)
-            self.driver.implicitly_wait(10)
-            max_retries = 3
-            for attempt in range(max_retries):
-                try:
-                    self.driver.get(self.BASE_URL)
-                    self.stats['total_pages_loaded'] += 1
-                    print(f"✅ Страница загружена (попытка {attempt + 1})")
-                    break
-                except Exception as e:
-                    print(f"⚠️ Ошибка загрузки страницы (попытка {attempt + 1}): {e}")
-                    if attempt == max_retries - 1:
-                        raise e
-                    time.sleep(5)
-            print("⏳ Ждем загрузки контента...")
-            time.sleep(10)
-            page_title = self.driver.title
-            print(f"📄 Заголовок страницы: {page_title}")
-            games_data = self._parse_games_from_page()
+            with phase_of(self.recorder, 'fetch'):
+                # Следующие месяцы - параллельно, каждый в своём браузере
+                pages = [self._fetch_upcoming()] + self._fetch_months()
+
+            with phase_of(self.recorder, 'parse'):
+                raw_games = [game for page in pages for game in parse_tiles(page)]
+                self.stats['game_links_found'] += len(raw_games)
+            with phase_of(self.recorder, 'dedupe'):
+                raw_games = self._merge_games(raw_games)
+            games_data = self._filter_games(raw_games)
             new_games = self._save_to_database(games_data)
             
             self.stats['games_saved'] = len(new_games)
-            self._print_stats()
-            
-            print(f"✅ Парсинг завершен! Добавлено {len(new_games)} новых игр")
-
-
-            self._select_calendar_months()
-
-            games_data = self._parse_games_from_page()
-
-            new_games += self._save_to_database(games_data)
-            self.stats['games_saved'] = len(new_games)
-            self._print_stats()
-            
-            print(f"✅ Парсинг завершен! Добавлено {len(new_games)} новых игр")
-
-
+            self._log_stats()
             return new_games
             
-        except Exception as e:
-            print(f"❌ Критическая ошибка парсинга: {e}")
+        except Exception:
+            # Ошибку не глотаем: прогон (RunRecorder) должен записаться как failed
             self.stats['errors'] += 1
-            self._print_stats()
-            return []
+            self._log_stats()
+            raise
         finally:
-            self.driver.quit()
+            if self.driver is not None:
+                release_driver(self.driver, failed=self.driver_failed)
+                self.driver = None
+            self.http.close()
 
-    def _close_cookie_banner(self):
+    def _load_upcoming_page(self, driver):
+        """Открывает страницу upcoming и ждёт появления плиток вместо фиксированной паузы"""
+        driver.set_page_load_timeout(60)
+        max_retries = 3
+        for attempt in range(max_retries):
+            try:
+                driver.get(self.BASE_URL)
+                WebDriverWait(driver, TILES_TIMEOUT).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, TILE_SELECTOR))
+                )
+                logger.debug('Upcoming page loaded', extra={'attempt': attempt + 1})
+                return
+            except Exception as e:
+                logger.warning('Upcoming page load failed', extra={'attempt': attempt + 1, 'error': str(e)})
+                if attempt == max_retries - 1:
+                    raise e
+                time.sleep(5)
+
+    def _fetch_upcoming(self):
+        """HTML первой страницы upcoming из основного браузера"""
+        driver = self.setup_driver()
         try:
-            cookie_accept_btn = WebDriverWait(self.driver, 5).until(
-                EC.element_to_be_clickable((By.XPATH, 
-                    "//button[contains(text(), 'Accept')] | \
-                    //button[contains(text(), 'Accept All')] | \
-                    //button[contains(text(), 'Принять')] | \
-                    //button[contains(@id, 'accept')] | \
-                    //button[contains(@class, 'accept')]"
-                ))
+            self._load_upcoming_page(driver)
+        except Exception:
+            self.driver_failed = True
+            raise
+        self.stats['total_pages_loaded'] += 1
+        logger.info('Upcoming page fetched', extra={'page_title': driver.title})
+        page_source = driver.page_source
+        record_page('ign-upcoming', page_source)
+        return page_source
+
+    def _close_cookie_banner(self, driver):
+        try:
+            cookie_accept_btn = WebDriverWait(driver, 5).until(
+                EC.element_to_be_clickable((By.XPATH, COOKIE_ACCEPT_XPATH))
             )
             cookie_accept_btn.click()
-            print("✅ Закрыли баннер с куками")
-            time.sleep(1)  
-            
+            WebDriverWait(driver, 5).until(EC.invisibility_of_element(cookie_accept_btn))
+            logger.debug('Cookie banner closed')
         except Exception:
-            print("ℹ️ Баннера с куками нет или он уже закрыт")
-            pass
+            logger.debug('No cookie banner')
+
+    def _months_to_crawl(self):
+        """(год, месяц) на IGN_MONTH_HORIZON месяцев вперёд от текущего"""
+        horizon = getattr(settings, 'IGN_MONTH_HORIZON', 1)
+        year, month = self.today.year, self.today.month
+        months = []
+        for _ in range(horizon):
+            month += 1
+            if month > 12:
+                year, month = year + 1, 1
+            months.append((year, month))
+        return months
+
+    def _fetch_months(self):
+        """HTML страниц по месяцам; время - по самому медленному месяцу, а не сумма"""
+        months = self._months_to_crawl()
+        if not months:
+            return []
+        logger.info('Crawling months', extra={'months': [f'{m:02d}.{y}' for y, m in months]})
+        workers = month_workers(len(months))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ign-month') as pool:
+            futures = {pool.submit(self._fetch_month, year, month): (year, month) for year, month in months}
+            results = []
+            for future in as_completed(futures):
+                year, month = futures[future]
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    logger.warning('Calendar month failed', extra={'month': f'{month:02d}.{year}', 'error': str(e)})
+                    self.stats['errors'] += 1
+        return results
 
-    def _select_calendar_months(self):
+    def _fetch_month(self, year, month):
+        """Отдельный браузер (из пула или свой): страница upcoming -> календарь -> месяц; HTML сетки"""
+        driver = acquire_driver()
+        failed = True
         try:
-            self._close_cookie_banner()
-            calendar_btn = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable((By.XPATH, "//button[contains(@class, 'calendar-dropdown')]"))
-            )
-            calendar_btn.click()
-            print("✅ Открыли календарь")
-            time.sleep(2)
-            current_month = timezone.now().month
-            current_year = timezone.now().year
-            print(f"📅 Системная дата: {current_month}.{current_year}")
-            months_to_check = []
-            if current_month < 12:
-                months_to_check.append(current_month + 1)
-            months_to_check = sorted(list(set(months_to_check)))
-            print(f"🔍 Планируем проверить месяцы: {months_to_check}")
-            month_codes = ['JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN',
-                        'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC']
-            year_element = self.driver.find_element(By.XPATH, "//div[@data-cy='calendar-year-container']")
-            displayed_year = int(year_element.text)
-            print(f"📅 Год в календаре: {displayed_year}")
-            target_year = current_year
-            for month_num in months_to_check:
-                if month_num == 1 and current_month == 12:
-                    target_year = current_year + 1
-                    break 
-            if target_year > displayed_year:
-                print(f"➡️ Нужно переключиться на {target_year} год")
-                next_year_btn = self.driver.find_element(By.XPATH, "//button[@data-cy='calendar-next-btn']")
-                next_year_btn.click()
-                print(f"✅ Перешли на следующий год")
-                time.sleep(1)
-            for month_num in months_to_check:
+            self._load_upcoming_page(driver)
+            self._close_cookie_banner(driver)
+            wait = WebDriverWait(driver, 10)
 
-                month_code = month_codes[month_num - 1]
-                print(f"🔍 Ищем игры за {month_code}...")
-                month_btn = WebDriverWait(self.driver, 10).until(
-                    EC.element_to_be_clickable((By.XPATH, f"//button[@data-cy='{month_code}']"))
-                )
-                self.driver.execute_script("arguments[0].scrollIntoView(true);", month_btn)
-                time.sleep(0.5)
+            wait.until(EC.element_to_be_clickable((By.XPATH, CALENDAR_BUTTON_XPATH))).click()
+            year_element = wait.until(EC.visibility_of_element_located((By.XPATH, CALENDAR_YEAR_XPATH)))
+            while int(year_element.text) < year:
+                displayed = year_element.text
+                driver.find_element(By.XPATH, CALENDAR_NEXT_XPATH).click()
+                wait.until(lambda d: d.find_element(By.XPATH, CALENDAR_YEAR_XPATH).text != displayed)
+                year_element = driver.find_element(By.XPATH, CALENDAR_YEAR_XPATH)
 
-                month_btn.click()
-                print(f"✅ Выбрали месяц {month_code}")
-                time.sleep(5)
-                month_games = self._parse_games_from_page()
-                print(f"📊 Нашли {len(month_games)} игр за {month_code}")
-                if month_num != months_to_check[-1]:
-                    calendar_btn = WebDriverWait(self.driver, 10).until(
-                        EC.element_to_be_clickable((By.XPATH, "//button[contains(@class, 'calendar-dropdown')]"))
-                    )
-                    calendar_btn.click()
-                    time.sleep(2)
+            before = _tiles_signature(driver)
+            month_btn = wait.until(
+                EC.element_to_be_clickable((By.XPATH, f"//button[@data-cy='{MONTH_CODES[month - 1]}']"))
+            )
+            driver.execute_script("arguments[0].scrollIntoView(true);", month_btn)
+            month_btn.click()
+            # Ждём, пока сетка плиток сменится на выбранный месяц
+            try:
+                WebDriverWait(driver, TILES_TIMEOUT).until(lambda d: _tiles_signature(d) not in (before, ()))
+            except TimeoutException:
+                # Первые плитки месяца могут совпасть с текущими - берём страницу как есть
+                logger.info('Tiles did not change', extra={'month': f'{month:02d}.{year}', 'timeout': TILES_TIMEOUT})
+            page_source = driver.page_source
+            record_page(f'ign-upcoming-{year}-{month:02d}', page_source)
+            self.stats['total_pages_loaded'] += 1
+            failed = False
+            return page_source
+        finally:
+            release_driver(driver, failed=failed)
 
-        except Exception as e:
-            print(f"⚠️ Ошибка работы с календарем: {e}")
-            import traceback
-            traceback.print_exc() 
+    def _merge_games(self, games):
+        """Склеивает игры со всех страниц, убирая повторы по нормализованному названию"""
+        merged = {}
+        for game_data in games:
+            key = normalize_title(game_data.get('title'))
+            if key and key not in merged:
+                merged[key] = game_data
+        return list(merged.values())
     
-    def _parse_games_from_page(self):
+    def _filter_games(self, games):
+        """Оставляет игры в окне дат с нужными платформами, считает пропуски"""
         games_data = []
-        
-        try:
-            game_links = self.driver.find_elements(By.XPATH, "//a[contains(@href, '/games/')]")
-            print(f"🔎 Найдено {len(game_links)} ссылок на игры")
-            
-            for i, element in enumerate(game_links):
-                try:
-                    game_data = self._parse_game_element(element)
-                    if not game_data:
-                        continue
-                    if self._is_game_in_time_range(game_data):
-                        if self._is_valid_game(game_data):
-                            games_data.append(game_data)
-                            self.stats['games_parsed'] += 1
-                            print(f"    ✅ {game_data['title']} - {game_data['release_date']} - {game_data['platforms']}")
-                        else:
-                            print(f"    ⏩ Пропускаем (неподходящие платформы): {game_data['title']} - {game_data.get('platforms', [])}")
-                            self.stats['invalid_platform_skipped'] += 1
-                    else:
-                        self.stats['too_far_skipped'] += 1
-                        
-                except Exception as e:
-                    print(f"  ❌ Ошибка парсинга элемента {i+1}: {e}")
-                    continue
-            
-        except Exception as e:
-            print(f"❌ Ошибка при парсинге игр: {e}")
-            self.stats['errors'] += 1
-        
+        for game_data in games:
+            if self._is_game_in_time_range(game_data):
+                if self._is_valid_game(game_data):
+                    games_data.append(game_data)
+                    self.stats['games_parsed'] += 1
+                    logger.debug('Game accepted', extra={'title': game_data['title'], 'release_date': game_data['release_date']})
+                else:
+                    logger.debug('Game skipped: platforms', extra={'title': game_data['title'], 'platforms': game_data.get('platforms', [])})
+                    self.stats['invalid_platform_skipped'] += 1
+            else:
+                self.stats['too_far_skipped'] += 1
         return games_data
     
     def _is_game_in_time_range(self, game_data):
@@ -233,142 +262,6 @@ class IGNReleaseParser:
             return False
         return self.today <= release_date <= self.max_date
     
-    def _parse_game_element(self, element):
-        try:
-            game_data = {}
-            element_html = element.get_attribute('outerHTML')
-            soup = BeautifulSoup(element_html, 'html.parser')
-            title_elem = soup.find('figcaption', class_=re.compile(r'tile-title'))
-            if title_elem:
-                game_data['title'] = title_elem.get_text(strip=True)
-            else:
-                element_text = element.text.strip()
-                lines = [line.strip() for line in element_text.split('\n') if line.strip()]
-                if lines:
-                    game_data['title'] = lines[0]
-            
-            if not game_data.get('title'):
-                return None
-            date_elem = soup.find('div', class_=re.compile(r'tile-meta'))
-            if date_elem:
-                date_text = date_elem.get_text(strip=True)
-                game_data['release_date'] = self._parse_date(date_text)
-            else:
-                element_text = element.text.strip()
-                date_match = re.search(r'([A-Za-z]{3,10}\s+\d{1,2},\s+\d{4})', element_text)
-                if date_match:
-                    game_data['release_date'] = self._parse_date(date_match.group(1))
-                else:
-                    return None
-            
-            platforms_elem = soup.find(['div', 'span'], class_=re.compile(r'platforms'))
-
-            if platforms_elem:
-                platforms = self._parse_platforms_from_element(platforms_elem)
-                game_data['platforms'] = platforms
-            else:
-                game_data['platforms'] = []
-            img_elem = soup.find('img')
-            if img_elem:
-                img_src = img_elem.get('src')
-                if img_src:
-                    game_data['image_url'] = img_src
-            href = element.get_attribute('href')
-            if href:
-                if href.startswith('/'):
-                    href = 'https://www.ign.com' + href
-                game_data['url'] = href
-            
-            return game_data
-            
-        except Exception as e:
-            print(f"Ошибка парсинга элемента: {e}")
-            return None
-    
- 
-
-    def _parse_platforms_from_element(self, platforms_elem):
-        """Парсит платформы из HTML элемента - только нужные нам платформы"""
-        platforms = []
-        ALLOWED_PLATFORMS = ['PS4', 'PS5', 'SWITCH', 'SWITCH2', 'XBOX_ONE', 'XBOX_SERIES']
-        
-        platform_containers = platforms_elem.find_all('span', class_='platform-icon')
-        
-        for container in platform_containers:
-            data_cy = container.get('data-cy', '').lower()
-            platform_map = {
-                'ps4': 'PS4',
-                'playstation-4': 'PS4',
-                'ps5': 'PS5', 
-                'playstation-5': 'PS5',
-                'xbox-one': 'XBOX_ONE',
-                'xbox-series': 'XBOX_SERIES',
-                'switch-2': 'SWITCH2',
-                'switch2': 'SWITCH2',
-                'switch': 'SWITCH',
-                'nintendo-switch': 'SWITCH',
-                'nintendo-switch-2': 'SWITCH2',
-                
-            }
-            
-            for key, platform in platform_map.items():
-                if key in data_cy and platform in ALLOWED_PLATFORMS:
-                    platforms.append(platform)
-                    break
-            if not platforms or platforms[-1] != platform:  
-                img = container.find('img')
-                if img:
-                    class_str = ' '.join(img.get('class', []))
-                    if 'icon-nintendo-switch' in class_str:
-                        platforms.append('SWITCH')
-        
-        platforms = list(set(platforms))
-        
-        return platforms
-    
-    def _parse_date(self, date_text):
-        """Парсит дату из текста в объект datetime"""
-        try:
-            clean_date = re.sub(r'[^\w\s,]', '', date_text.strip())
-            
-            date_formats = [
-                '%b %d, %Y',  # Oct 1, 2025
-                '%B %d, %Y',  # October 1, 2025
-            ]
-            
-            for fmt in date_formats:
-                try:
-                    parsed_date = datetime.strptime(clean_date, fmt).date()
-                    return parsed_date
-                except ValueError:
-                    continue
-            
-            return None
-            
-        except Exception as e:
-            print(f"⚠️ Ошибка парсинга даты '{date_text}': {e}")
-            return None
-    
-    def _download_image(self, image_url, game_title):
-        """Скачивает и сохраняет изображение игры"""
-        try:
-            if not image_url:
-                return None
-            clean_title = re.sub(r'[^\w\s-]', '', game_title)
-            clean_title = re.sub(r'\s+', '_', clean_title)
-            filename = f"{clean_title}.jpg"
-            response = requests.get(image_url, timeout=10)
-            response.raise_for_status()
-            with NamedTemporaryFile(delete=False, suffix='.jpg') as temp_file:
-                temp_file.write(response.content)
-                temp_file.flush()
-                
-                return temp_file.name
-                
-        except Exception as e:
-            print(f"⚠️ Ошибка загрузки изображения для {game_title}: {e}")
-            return None
-    
     def _is_valid_game(self, game_data):
         """Проверяет валидность данных игры"""
         if not game_data.get('title'):
@@ -376,12 +269,10 @@ class IGNReleaseParser:
         title = game_data['title']
         if len(title) < 2 or len(title) > 200:
             return False
-        exclude_words = ['ign', 'game', 'review', 'news', 'trailer', 'video', 'upcoming']
-        if any(word in title.lower() for word in exclude_words):
+        if any(word in title.lower() for word in EXCLUDE_TITLE_WORDS):
             return False
         platforms = game_data.get('platforms', [])
-        allowed_platforms = ['PS4', 'PS5', 'SWITCH', 'SWITCH2', 'XBOX_ONE', 'XBOX_SERIES']
-        has_our_platforms = any(platform in allowed_platforms for platform in platforms)
+        has_our_platforms = any(platform in ALLOWED_PLATFORMS for platform in platforms)
         
         if not has_our_platforms:
             return False
@@ -389,94 +280,94 @@ class IGNReleaseParser:
         return True
     
     def _save_to_database(self, games_data):
-        """Сохраняет игры в БД, только новые"""
-        new_games = []
-        
+        """Сохраняет игры в БД, только новые: все строки одним INSERT, иконки - одним UPDATE (ReleaseWriter)"""
         for game_data in games_data:
-            try:
-                existing_game = GameRelease.objects.filter(
-                    title__iexact=game_data['title']
-                ).first()
-                
-                if existing_game:
-                    continue
-                image_path = None
-                if game_data.get('image_url'):
-                    image_path = self._download_image(game_data['image_url'], game_data['title'])
-                game = GameRelease(
-                    title=game_data['title'][:200],
-                    release_date=game_data['release_date'],
-                    platforms=game_data.get('platforms', []),
-                    marketplaces=['AVITO', 'DIFMARK','TELEGRAM', 'WILDBERRIES', 'DIGISELLER','FUNPAY','GGSEL'],
-                    languages=['UNKNOW'],
-                    marketplace_platforms={},  
-                    description=f"Автоматически добавлено из IGN. {game_data.get('url', '')}",
-                    is_published=True
-                )
-                game.save()
+            game_data.setdefault('source', IGNSource.name)
+        with phase_of(self.recorder, 'save'):
+            created = self.writer.insert_new(games_data)
 
-                if game.platforms:  
-                    game.marketplace_platforms['DIFMARK'] = game.platforms.copy()
-                    game.save()
-                if image_path and os.path.exists(image_path):
-                    try:
-                        with open(image_path, 'rb') as img_file:
-                            game.icon.save(f"{game.id}_{game.title[:50]}.jpg", File(img_file), save=True)
-                        print(f"    🖼️ Изображение сохранено для {game.title}")
-                    except Exception as e:
-                        print(f"⚠️ Ошибка сохранения изображения: {e}")
-                    finally:
-                       
-                        try:
-                            os.unlink(image_path)
-                        except:
-                            pass
-                
-                new_games.append(game)
-                print(f"✅ Добавлена новая игра: {game_data['title']}")
-                
-            except Exception as e:
-                print(f"❌ Ошибка сохранения игры {game_data.get('title')}: {e}")
-                self.stats['errors'] += 1
-                continue
-        
-        return new_games
+        for game, game_data in created:
+            logger.debug('Release added', extra={'title': game_data['title']})
+        with phase_of(self.recorder, 'images'):
+            self.writer.attach_icons(created)
+        if self.recorder is not None:
+            self.recorder.finish_counts(created=len(created))
+        return [game for game, _ in created]
     
-    def _print_stats(self):
-       
-        print("\n📊 ДЕТАЛЬНАЯ СТАТИСТИКА ПАРСИНГА:")
-        print(f"   📄 Загружено страниц: {self.stats['total_pages_loaded']}")
-        print(f"   🔗 Найдено ссылок на игры: {self.stats['game_links_found']}")
-        print(f"   ✅ Успешно распарсено игр: {self.stats['games_parsed']}")
-        print(f"   ⏩ Пропущено игр с неподходящими платформами: {self.stats['invalid_platform_skipped']}")
-        print(f"   ⏩ Пропущено игр с датой вне диапазона: {self.stats['too_far_skipped']}")
-        print(f"   💾 Сохранено в БД: {self.stats['games_saved']}")
-        print(f"   ❌ Ошибок: {self.stats['errors']}")
+    def _log_stats(self):
+        """Одно событие со всеми счётчиками; они же - в счётчики прогона"""
+        logger.info('IGN parse stats', extra=self.stats)
+        if self.recorder is not None:
+            self.recorder.update_counters(self.stats, prefix='ign.')
+
+
+class IGNSource(ReleaseSource):
+    """
+    IGN как источник импорта (releases.ingestion): страница upcoming и месяцы
+    календаря в браузере или одна страница по HTTP. Фильтры дат и платформ - парсера.
+    """
+    name = 'IGN'
+    creates = True
+    priority = 10
+
+    def __init__(self, http, fetcher=None, **options):
+        super().__init__(http, **options)
+        self.fetcher = fetcher or getattr(settings, 'IGN_FETCHER', 'browser')
+        # Парсер - ради загрузки и фильтров: Session и writer пайплайна, браузер - в fetch()
+        if self.fetcher == 'http':
+            from .ign_http import IGNHttpReleaseParser
+            self.parser = IGNHttpReleaseParser(http=http, writer=self.writer)
+        else:
+            self.parser = IGNReleaseParser(http=http, writer=self.writer)
+            # Месяцы - каждый в своём браузере, upcoming - в основном
+            self.workers = 1 + month_workers(len(self.parser._months_to_crawl()))
+
+    def discover(self, records=()):
+        logger.info('IGN parse started', extra={'date_from': self.parser.today, 'date_to': self.parser.max_date, 'fetcher': self.fetcher})
+        if self.fetcher == 'http':
+            return [('upcoming', None)]
+        return [('upcoming', None)] + [('month', month) for month in self.parser._months_to_crawl()]
+
+    def fetch(self, task):
+        kind, month = task
+        if self.fetcher == 'http':
+            return self.parser.fetch_page(self.parser.BASE_URL)
+        if kind == 'month':
+            return self.parser._fetch_month(*month)
+        return self.parser._fetch_upcoming()
+
+    def parse(self, raw, task):
+        # В HTML браузера после выбора месяца __NEXT_DATA__ остаётся от первой страницы - только плитки
+        return parse_upcoming_page(raw) if self.fetcher == 'http' else parse_tiles(raw)
+
+    def normalize(self, record):
+        if not self.parser._is_game_in_time_range(record):
+            self.count('too_far_skipped')
+            return None
+        if not self.parser._is_valid_game(record):
+            self.count('invalid_platform_skipped')
+            return None
+        return record
+
+    def close(self):
+        if self.parser.driver is not None:
+            release_driver(self.parser.driver, failed=self.parser.driver_failed)
+            self.parser.driver = None
 
 
 # Утилитарные функции
-def run_parser():
-  
-    parser = IGNReleaseParser()
+def run_parser(fetcher='browser', recorder=None):
+    """
+    fetcher: "browser" - Selenium + Chrome, "http" - requests без браузера (releases.ign_http).
+    recorder - RunRecorder прогона (releases.runs), если его нужно записать.
+    """
+    if fetcher == 'http':
+        from .ign_http import IGNHttpReleaseParser
+        parser = IGNHttpReleaseParser(recorder=recorder)
+    else:
+        parser = IGNReleaseParser(recorder=recorder)
     return parser.parse_releases()
 
 def get_parser_stats():
-  
-    total_games = GameRelease.objects.count()
-    upcoming_games = GameRelease.objects.filter(
-        release_date__gte=timezone.now().date()
-    ).count()
-    published_games = GameRelease.objects.filter(is_published=True).count()
-    
-    # Статистика по платформам
-    platform_stats = {}
-    for game in GameRelease.objects.all():
-        for platform in game.get_platforms_list():
-            platform_stats[platform] = platform_stats.get(platform, 0) + 1
-    
-    return {
-        'total_games': total_games,
-        'upcoming_games': upcoming_games,
-        'published_games': published_games,
-        'platform_stats': platform_stats  # Добавляем статистику по платформам
-    }
\ No newline at end of file
+    """Сводка по каталогу для вывода после парсинга (считается в SQL, см. releases.analytics)"""
+    return get_release_stats()
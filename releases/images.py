@@ -0,0 +1,119 @@
+"""
+Производные размеры иконок игр (список, модалка, retina) в WebP и JPEG.
+
+Ресайз - чистая функция над байтами (render_icon_variants), поэтому её можно
+гонять и в пуле потоков при загрузке/импорте, и в пуле процессов при бэкфилле.
+"""
+import io
+import os
+
+from core.background import submit_after_commit
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image
+
+# имя варианта -> максимальный размер (ширина, высота)
+# В списке иконка выводится высотой 254px, в модалке - на ширину колонки
+ICON_VARIANTS = {
+    'list': (512, 256),
+    'list_2x': (1024, 512),
+    'modal': (400, 800),
+    'modal_2x': (800, 1600),
+}
+
+# формат -> (расширение, параметры сохранения Pillow)
+ICON_FORMATS = {
+    'webp': ('webp', {'format': 'WEBP', 'quality': 80, 'method': 4}),
+    'jpg': ('jpg', {'format': 'JPEG', 'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+DERIVED_DIR = 'game_icons/derived'
+
+# Форматы с альфа-каналом; для остальных (JPEG) прозрачность заливается фоном
+ALPHA_FORMATS = {'WEBP', 'PNG'}
+ICON_BACKGROUND = (255, 255, 255)
+
+
+def _has_alpha(image):
+    return image.mode in ('RGBA', 'LA', 'PA') or (image.mode == 'P' and 'transparency' in image.info)
+
+
+def _flatten(image):
+    """RGBA -> RGB поверх ICON_BACKGROUND: простой convert('RGB') делает прозрачное чёрным"""
+    background = Image.new('RGB', image.size, ICON_BACKGROUND)
+    background.paste(image, mask=image.getchannel('A'))
+    return background
+
+
+def render_icon_variants(source_bytes):
+    """Возвращает {(вариант, формат): байты} для всех ICON_VARIANTS x ICON_FORMATS"""
+    with Image.open(io.BytesIO(source_bytes)) as original:
+        original.load()
+        if _has_alpha(original):
+            image = original.convert('RGBA')
+        elif original.mode not in ('RGB', 'L'):
+            image = original.convert('RGB')
+        else:
+            image = original.copy()
+
+    result = {}
+    for variant, size in ICON_VARIANTS.items():
+        resized = image.copy()
+        # Не увеличиваем: если исходник меньше, вариант равен исходнику
+        resized.thumbnail(size, Image.LANCZOS)
+        flat = _flatten(resized) if resized.mode == 'RGBA' else resized
+        for fmt, (ext, save_kwargs) in ICON_FORMATS.items():
+            buffer = io.BytesIO()
+            (resized if save_kwargs['format'] in ALPHA_FORMATS else flat).save(buffer, **save_kwargs)
+            result[(variant, fmt)] = buffer.getvalue()
+    return result
+
+
+def variant_name(icon_name, variant, fmt):
+    stem = os.path.splitext(os.path.basename(icon_name))[0]
+    ext = ICON_FORMATS[fmt][0]
+    return f"{DERIVED_DIR}/{stem}_{variant}.{ext}"
+
+
+def store_icon_variants(game, rendered):
+    """Пишет отрендеренные варианты в хранилище и сохраняет пути в game.icon_variants"""
+    delete_icon_variants(game)
+    variants = {}
+    for (variant, fmt), data in rendered.items():
+        name = variant_name(game.icon.name, variant, fmt)
+        saved_name = default_storage.save(name, ContentFile(data))
+        variants.setdefault(variant, {})[fmt] = saved_name
+
+    game.icon_variants = variants
+    type(game).objects.filter(pk=game.pk).update(icon_variants=variants)
+    return variants
+
+
+def delete_icon_variants(game):
+    for formats in (game.icon_variants or {}).values():
+        for name in formats.values():
+            default_storage.delete(name)
+
+
+def build_icon_variants(game):
+    """Синхронно строит все варианты иконки игры"""
+    if not game.icon:
+        return {}
+    with game.icon.open('rb') as f:
+        source_bytes = f.read()
+    return store_icon_variants(game, render_icon_variants(source_bytes))
+
+
+def _build_in_background(game_id):
+    from .models import GameRelease
+
+    game = GameRelease.objects.filter(pk=game_id).first()
+    if game:
+        build_icon_variants(game)
+
+
+def schedule_icon_variants(game):
+    """Ставит генерацию вариантов в фоновый пул после коммита транзакции"""
+    if not game.icon:
+        return
+    submit_after_commit(_build_in_background, game.pk)
@@ -0,0 +1,415 @@
+"""
+Импорт релизов из нескольких источников.
+
+Источник (ReleaseSource) проходит четыре стадии:
+    discover() -> задачи (страницы, месяцы календаря, игры для проверки),
+    fetch(task) -> сырой ответ,
+    parse(raw, task) -> сырые записи,
+    normalize(record) -> запись импорта или None (отброшена фильтрами источника).
+
+Запись импорта - dict: title обязателен, остальное по возможности:
+release_date, platforms, image_url, url, languages; source проставляет пайплайн.
+
+IngestionPipeline запускает источники параллельно в две фазы: сначала те, что
+находят новые релизы (creates = True), затем дополняющие (DekuDeals), которые
+получают найденное в discover(). Записи склеиваются по normalize_title
+(merge_records) и пишутся общим ReleaseWriter - дедупликация, bulk_create и
+иконки одинаковы для всех источников.
+
+Источники перечислены в settings.INGESTION_SOURCES (пути к классам). Ход прогона -
+в логгер releases.ingestion, время фаз и счётчики - в IngestionRun (releases.runs).
+"""
+import logging
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .downloads import build_session, download_many
+from .images import schedule_icon_variants
+from .models import CatalogVersion, GameRelease, GameReleaseAttribute, normalize_title
+from .runs import phase_of
+
+logger = logging.getLogger(__name__)
+
+# Названий в одном WHERE normalized_title IN (...) - с запасом под лимит переменных SQLite
+TITLE_LOOKUP_CHUNK = 500
+# Площадки, на которые ставится новая игра из импорта
+DEFAULT_MARKETPLACES = ['AVITO', 'DIFMARK', 'TELEGRAM', 'WILDBERRIES', 'DIGISELLER', 'FUNPAY', 'GGSEL']
+# Поля существующих релизов, которые импорт может дополнить (остальное правят вручную)
+ENRICH_FIELDS = ('languages',)
+
+
+class ReleaseSource:
+    """
+    Базовый источник. Подкласс задаёт name и стадии; fetch - единственная
+    обязательная. Стадии fetch/parse/normalize идут в потоках (workers штук),
+    discover и commit - в вызывающем потоке, только там можно ходить в БД.
+    """
+    name = ''
+    # Может ли запись источника создать новый GameRelease (иначе только дополняет существующие)
+    creates = False
+    # Меньше - главнее при расхождении полей одного релиза между источниками
+    priority = 100
+    workers = 1
+
+    def __init__(self, http, writer=None, **options):
+        self.http = http
+        # ReleaseWriter пайплайна - источник пишет через него, своего не создаёт
+        self.writer = writer
+        # Параметры прогона (например fetcher у IGN); незнакомые источник игнорирует
+        self.options = options
+        self.stats = Counter()
+        self._stats_lock = threading.Lock()
+
+    def count(self, key, value=1):
+        with self._stats_lock:
+            self.stats[key] += value
+
+    def discover(self, records=()):
+        """Задачи прогона; records - уже найденные другими источниками записи"""
+        return []
+
+    def fetch(self, task):
+        raise NotImplementedError
+
+    def parse(self, raw, task):
+        return raw
+
+    def normalize(self, record):
+        return record
+
+    def commit(self):
+        """После записи релизов: служебное состояние источника (кеш и т.п.)"""
+
+    def close(self):
+        """Освобождает ресурсы источника (браузеры)"""
+
+    def _run_task(self, task):
+        started = time.monotonic()
+        raw = self.fetch(task)
+        fetched = time.monotonic()
+        self.count('fetched')
+        self.count('fetch_seconds', fetched - started)
+        records = []
+        for record in self.parse(raw, task):
+            self.count('parsed')
+            record = self.normalize(record)
+            if record is None:
+                self.count('rejected')
+                continue
+            record['source'] = self.name
+            records.append(record)
+        self.count('parse_seconds', time.monotonic() - fetched)
+        return records
+
+    def collect(self, records=()):
+        """Все стадии источника; ошибка задачи считается и не валит остальные"""
+        tasks = list(self.discover(records))
+        self.count('tasks', len(tasks))
+        if not tasks:
+            return []
+        results = []
+        workers = max(1, min(self.workers, len(tasks)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f'ingest-{self.name.lower()}') as pool:
+            futures = {pool.submit(self._run_task, task): task for task in tasks}
+            for future in as_completed(futures):
+                try:
+                    results.extend(future.result())
+                except Exception as e:
+                    logger.warning('Source task failed', extra={'source': self.name, 'task': str(futures[future]), 'error': str(e)})
+                    self.count('errors')
+        self.count('records', len(results))
+        return results
+
+
+def merge_records(records, priorities=None):
+    """
+    Склеивает записи разных источников об одном релизе (ключ normalize_title).
+    Скалярные поля - от самого приоритетного источника, у которого они есть,
+    платформы и языки - объединение. {ключ: запись}
+    """
+    priorities = priorities or {}
+    ordered = sorted(records, key=lambda record: priorities.get(record.get('source'), 100))
+    merged = {}
+    for record in ordered:
+        key = normalize_title((record.get('title') or '')[:200])
+        if not key:
+            continue
+        target = merged.get(key)
+        if target is None:
+            target = merged[key] = {**record, 'sources': [], 'creates': False}
+            target['platforms'] = list(record.get('platforms') or [])
+            if 'languages' in record:
+                target['languages'] = list(record['languages'] or [])
+        else:
+            for field in ('release_date', 'image_url', 'url'):
+                if not target.get(field) and record.get(field):
+                    target[field] = record[field]
+            for platform in record.get('platforms') or []:
+                if platform not in target['platforms']:
+                    target['platforms'].append(platform)
+            if 'languages' in record:
+                languages = target.setdefault('languages', [])
+                for language in record['languages'] or []:
+                    if language not in languages:
+                        languages.append(language)
+        if record.get('source') and record['source'] not in target['sources']:
+            target['sources'].append(record['source'])
+        target['creates'] = target['creates'] or record.get('creates', False)
+        if record.get('checked'):
+            target['checked'] = True
+    return merged
+
+
+def known_languages(languages):
+    """Языки без UNKNOW, отсортированные - так их пишет check_localizations"""
+    return sorted(language for language in languages or [] if language != 'UNKNOW')
+
+
+class ReleaseWriter:
+    """
+    Запись импорта в БД, общая для всех источников:
+    новые релизы - один IN на дубли и один bulk_create, иконки - параллельно и одним bulk_update,
+    существующие - дополнение ENRICH_FIELDS одним bulk_update.
+    """
+
+    def __init__(self, http, download_workers=8, recorder=None):
+        self.http = http
+        self.download_workers = download_workers
+        # RunRecorder прогона (releases.runs) - время фаз save и images
+        self.recorder = recorder
+
+    def existing(self, keys, fields=None):
+        """{normalized_title: GameRelease} по одному IN на TITLE_LOOKUP_CHUNK названий"""
+        found = {}
+        keys = list(keys)
+        for i in range(0, len(keys), TITLE_LOOKUP_CHUNK):
+            games = GameRelease.objects.filter(normalized_title__in=keys[i:i + TITLE_LOOKUP_CHUNK])
+            if fields:
+                games = games.only(*fields)
+            found.update((game.normalized_title, game) for game in games)
+        return found
+
+    def build(self, key, record):
+        """Новая запись сразу в конечном виде: публикация на DIFMARK по всем платформам"""
+        platforms = list(record.get('platforms', []))
+        return GameRelease(
+            title=record['title'][:200],
+            normalized_title=key,
+            release_date=record['release_date'],
+            platforms=platforms,
+            marketplaces=list(DEFAULT_MARKETPLACES),
+            languages=known_languages(record.get('languages')) or ['UNKNOW'],
+            marketplace_platforms={'DIFMARK': platforms.copy()} if platforms else {},
+            description=f"Автоматически добавлено из {record.get('source') or 'импорта'}. {record.get('url', '')}",
+            is_published=True,
+            row_version=1,
+            localization_checked_at=timezone.now() if record.get('checked') else None,
+        )
+
+    def insert_new(self, records):
+        """Только новые релизы; при гонке с другим импортом - повтор. [(game, record)]"""
+        batch = {}
+        for record in records:
+            key = normalize_title(record['title'][:200])
+            if key and key not in batch:
+                batch[key] = record
+
+        for attempt in range(2):
+            existing = self.existing(batch, fields=['id', 'normalized_title'])
+            pending = [(key, record) for key, record in batch.items() if key not in existing]
+            games = [self.build(key, record) for key, record in pending]
+            if not games:
+                return []
+            try:
+                with transaction.atomic():
+                    GameRelease.objects.bulk_create(games)
+                    if any(game.pk is None for game in games):
+                        # БД без RETURNING (MySQL) - дочитываем id по уникальному ключу
+                        ids = dict(GameRelease.objects.filter(
+                            normalized_title__in=[game.normalized_title for game in games]
+                        ).values_list('normalized_title', 'id'))
+                        for game in games:
+                            game.pk = ids.get(game.normalized_title)
+                    # bulk_create обходит save() и post_save
+                    GameReleaseAttribute.sync(games)
+            except IntegrityError as e:
+                if attempt:
+                    raise
+                logger.info('Concurrent import inserted some titles, retrying', extra={'error': str(e)})
+                continue
+            CatalogVersion.bump()
+            return list(zip(games, [record for _, record in pending]))
+        return []
+
+    def attach_icons(self, created):
+        """Картинки качаются параллельно прямо в хранилище после вставки и записываются одним bulk_update"""
+        games = {game.pk: game for game, _ in created}
+        jobs = [
+            (
+                game.pk,
+                record['image_url'],
+                game.icon.field.generate_filename(game, f"{game.id}_{game.title[:50]}.jpg"),
+            )
+            for game, record in created if record.get('image_url')
+        ]
+        if not jobs:
+            return []
+        storage = GameRelease._meta.get_field('icon').storage
+        names = download_many(self.http, jobs, storage, workers=self.download_workers)
+
+        now = timezone.now()
+        with_icons = []
+        for pk, name in names.items():
+            game = games[pk]
+            game.icon.name = name
+            game.updated_at = now
+            with_icons.append(game)
+        skipped = len(jobs) - len(with_icons)
+        logger.info('Icons downloaded', extra={'saved': len(with_icons), 'failed': skipped})
+
+        if with_icons:
+            GameRelease.objects.bulk_update(with_icons, ['icon', 'updated_at'])
+            CatalogVersion.bump()
+            for game in with_icons:
+                schedule_icon_variants(game)
+        return with_icons
+
+    def enrich(self, merged):
+        """Дополняет существующие релизы языками из импорта; [обновлённые релизы]"""
+        fields = ['id', 'title', 'normalized_title', 'release_date', *GameReleaseAttribute.SOURCE_FIELDS]
+        existing = self.existing(merged, fields=fields)
+        changed, checked = [], []
+        now = timezone.now()
+        for key, game in existing.items():
+            record = merged[key]
+            if record.get('checked'):
+                checked.append(game.pk)
+            languages = known_languages(record.get('languages'))
+            if languages and languages != game.get_languages_list():
+                game.languages = languages
+                game.updated_at = now
+                game.row_version = F('row_version') + 1
+                changed.append(game)
+
+        with transaction.atomic():
+            if checked:
+                GameRelease.objects.filter(pk__in=checked).update(localization_checked_at=now)
+            if changed:
+                GameRelease.objects.bulk_update(changed, [*ENRICH_FIELDS, 'updated_at', 'row_version'])
+                GameReleaseAttribute.sync(changed)
+                CatalogVersion.bump()
+        return changed
+
+    def save(self, merged):
+        """Записывает склеенные записи: {'created': [GameRelease], 'updated': [GameRelease]}"""
+        with phase_of(self.recorder, 'save'):
+            updated = self.enrich(merged)
+            created = self.insert_new([
+                record for record in merged.values()
+                if record.get('creates') and record.get('release_date')
+            ])
+        for game, record in created:
+            logger.debug('Release added', extra={'title': record['title'], 'sources': record['sources']})
+        logger.info('Releases saved', extra={'created_count': len(created), 'updated_count': len(updated)})
+        with phase_of(self.recorder, 'images'):
+            self.attach_icons(created)
+        return {'created': [game for game, _ in created], 'updated': updated}
+
+
+def load_sources(http, names=None, writer=None, **options):
+    """
+    Экземпляры источников из settings.INGESTION_SOURCES (names - только эти, по name).
+    http и writer - общие для прогона Session и ReleaseWriter.
+    """
+    sources = []
+    for path in getattr(settings, 'INGESTION_SOURCES', []):
+        source_class = import_string(path)
+        if names and source_class.name not in names:
+            continue
+        sources.append(source_class(http, writer=writer, **options))
+    return sources
+
+
+class IngestionPipeline:
+    """Прогон нескольких источников: сбор параллельно, склейка, одна общая запись"""
+
+    def __init__(self, sources=None, names=None, workers=None, **options):
+        self.download_workers = getattr(settings, 'IGN_DOWNLOAD_WORKERS', 8)
+        self.http = build_session(pool_size=self.download_workers)
+        self.writer = ReleaseWriter(self.http, self.download_workers)
+        self.sources = sources if sources is not None else load_sources(self.http, names, self.writer, **options)
+        self.workers = workers or max(1, len(self.sources))
+
+    def _collect(self, sources, records=()):
+        found = []
+        if not sources:
+            return found
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(sources)), thread_name_prefix='ingest') as pool:
+            futures = {pool.submit(source.collect, records): source for source in sources}
+            for future in as_completed(futures):
+                source = futures[future]
+                try:
+                    source_records = future.result()
+                except Exception:
+                    logger.exception('Source failed', extra={'source': source.name})
+                    source.count('errors')
+                    continue
+                for record in source_records:
+                    record['creates'] = source.creates
+                logger.info('Source collected', extra={'source': source.name, 'records': len(source_records)})
+                found.extend(source_records)
+        return found
+
+    def run(self, recorder=None):
+        """recorder - RunRecorder прогона: фазы fetch (сбор, стена), parse (сумма по задачам), dedupe, save, images"""
+        self.writer.recorder = recorder
+        priorities = {source.name: source.priority for source in self.sources}
+        try:
+            with phase_of(recorder, 'fetch'):
+                records = self._collect([source for source in self.sources if source.creates])
+            with phase_of(recorder, 'dedupe'):
+                merged = merge_records(records, priorities)
+            with phase_of(recorder, 'fetch'):
+                records += self._collect(
+                    [source for source in self.sources if not source.creates],
+                    list(merged.values()),
+                )
+            with phase_of(recorder, 'dedupe'):
+                merged = merge_records(records, priorities)
+            logger.info('Records merged', extra={'releases': len(merged), 'records': len(records)})
+            result = self.writer.save(merged)
+            for source in self.sources:
+                source.commit()
+            if recorder is not None:
+                recorder.finish_counts(created=len(result['created']), updated=len(result['updated']))
+            return result
+        finally:
+            for source in self.sources:
+                try:
+                    source.close()
+                except Exception:
+                    logger.exception('Source close failed', extra={'source': source.name})
+            if recorder is not None:
+                self._record_sources(recorder)
+            self.http.close()
+
+    def _record_sources(self, recorder):
+        for source in self.sources:
+            stats = dict(source.stats)
+            recorder.add_time('parse', stats.pop('parse_seconds', 0))
+            stats.pop('fetch_seconds', None)
+            recorder.update_counters(stats, prefix=f"{source.name.lower()}.")
+
+    def stats(self):
+        return {
+            source.name: {key: round(value, 3) if isinstance(value, float) else value for key, value in source.stats.items()}
+            for source in self.sources
+        }
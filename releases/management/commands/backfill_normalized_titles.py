@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from releases.models import GameRelease, normalize_title
+
+
+class Command(BaseCommand):
+    help = 'Заполняет normalized_title у существующих релизов; дубли по названию оставляет с NULL и выводит'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Сколько релизов обновлять за один bulk_update (по умолчанию: 500)'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        taken = set(
+            GameRelease.objects.exclude(normalized_title=None).values_list('normalized_title', flat=True)
+        )
+
+        batch = []
+        duplicates = []
+        updated = 0
+        queryset = GameRelease.objects.filter(normalized_title=None).only('id', 'title').order_by('id')
+        for game in queryset.iterator(chunk_size=batch_size):
+            key = normalize_title(game.title)
+            if key in taken:
+                duplicates.append(game)
+                continue
+            taken.add(key)
+            game.normalized_title = key
+            batch.append(game)
+            if len(batch) >= batch_size:
+                updated += self._update(batch)
+                batch = []
+        if batch:
+            updated += self._update(batch)
+
+        for game in duplicates:
+            self.stdout.write(self.style.WARNING(f'  дубль: #{game.id} {game.title}'))
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ normalized_title заполнен у {updated} игр, дублей без ключа: {len(duplicates)}'
+        ))
+
+    def _update(self, batch):
+        with transaction.atomic():
+            GameRelease.objects.bulk_update(batch, ['normalized_title'])
+        return len(batch)
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from releases.models import GameRelease, GameReleaseAttribute
+
+
+class Command(BaseCommand):
+    help = 'Заполняет индексируемые атрибуты (платформы, площадки, языки, публикации) из JSON полей'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Сколько релизов обрабатывать за одну транзакцию (по умолчанию: 500)'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        queryset = GameRelease.objects.only(
+            'id', 'platforms', 'marketplaces', 'languages', 'marketplace_platforms'
+        ).order_by('id')
+
+        total = 0
+        batch = []
+        for game in queryset.iterator(chunk_size=batch_size):
+            batch.append(game)
+            if len(batch) >= batch_size:
+                total += self._sync(batch)
+                batch = []
+        if batch:
+            total += self._sync(batch)
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Атрибуты пересобраны для {total} игр'))
+
+    def _sync(self, batch):
+        with transaction.atomic():
+            GameReleaseAttribute.sync(batch)
+        self.stdout.write(f'  ... {batch[-1].id}')
+        return len(batch)
@@ -0,0 +1,74 @@
+import re
+import time
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+from django.core.management.base import BaseCommand, CommandError
+
+from releases.ign_pages import parse_tiles
+
+
+def legacy_parse_tiles(html):
+    """
+    Прежний разбор IGNReleaseParser: свой BeautifulSoup на outerHTML каждой ссылки
+    и регулярки в каждом вызове. Оставлен только для сравнения скорости;
+    круговые запросы к WebDriver (outerHTML/text/href на ссылку) сюда не входят.
+    """
+    games = []
+    page = BeautifulSoup(html, 'html.parser')
+    for link in page.find_all('a', href=re.compile(r'/games/')):
+        soup = BeautifulSoup(str(link), 'html.parser')
+        title_elem = soup.find('figcaption', class_=re.compile(r'tile-title'))
+        if not title_elem:
+            continue
+        game = {'title': title_elem.get_text(strip=True)}
+        date_elem = soup.find('div', class_=re.compile(r'tile-meta'))
+        game['date_text'] = date_elem.get_text(strip=True) if date_elem else None
+        platforms_elem = soup.find(['div', 'span'], class_=re.compile(r'platforms'))
+        game['platforms'] = [
+            span.get('data-cy', '').lower()
+            for span in (platforms_elem.find_all('span', class_='platform-icon') if platforms_elem else [])
+        ]
+        img = soup.find('img')
+        game['image_url'] = img.get('src') if img else None
+        games.append(game)
+    return games
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает скорость разбора сохранённых страниц IGN: прежний BeautifulSoup на плитку и lxml за один проход'
+
+    def add_arguments(self, parser):
+        parser.add_argument('pages', nargs='+', help='HTML файлы или каталоги с *.html')
+        parser.add_argument('--repeat', type=int, default=5, help='Прогонов на каждый вариант')
+
+    def handle(self, *args, **options):
+        pages = []
+        for name in options['pages']:
+            path = Path(name)
+            files = sorted(path.glob('*.html')) if path.is_dir() else [path]
+            for file in files:
+                if not file.is_file():
+                    raise CommandError(f'Нет файла {file}')
+                pages.append(file.read_text(encoding='utf-8', errors='replace'))
+        if not pages:
+            raise CommandError('Не найдено ни одной страницы')
+
+        repeat = max(1, options['repeat'])
+        results = {}
+        for label, func in (('before (bs4 на плитку)', legacy_parse_tiles), ('after (lxml)', parse_tiles)):
+            tiles = 0
+            started = time.perf_counter()
+            for _ in range(repeat):
+                for html in pages:
+                    tiles += len(func(html))
+            elapsed = time.perf_counter() - started
+            results[label] = (tiles, elapsed)
+            rate = tiles / elapsed if elapsed else 0
+            self.stdout.write(
+                f'{label:24} {tiles // repeat:6} плиток/прогон  {elapsed / repeat * 1000:9.1f} мс/прогон  {rate:10.0f} плиток/с'
+            )
+
+        (_, before), (_, after) = results.values()
+        if after:
+            self.stdout.write(self.style.SUCCESS(f'Ускорение: x{before / after:.1f}'))
@@ -0,0 +1,87 @@
+import contextlib
+import io
+import resource
+import time
+import tracemalloc
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from releases import replay
+from releases.dekudeals import parse_languages
+from releases.ign_pages import parse_upcoming_page
+from releases.models import normalize_title
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет парсеры на записанных страницах (SCRAPER_HTTP_MODE=record): скорость разбора IGN и DekuDeals, '
+        'время записи в БД и пик памяти. Сеть не используется, БД не меняется (транзакция откатывается)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fixtures', default=None, help='Каталог записи (по умолчанию SCRAPER_FIXTURES_DIR)')
+        parser.add_argument('--repeat', type=int, default=3, help='Прогонов разбора на каждый корпус')
+
+    def handle(self, *args, **options):
+        root = Path(options['fixtures'] or replay.fixtures_dir())
+        if not root.is_dir():
+            raise CommandError(f'Нет каталога записи {root}; запишите его: SCRAPER_HTTP_MODE=record manage.py parse_ign_releases')
+        repeat = max(1, options['repeat'])
+
+        ign_pages = [html for _, html in replay.recorded_pages(root, 'ign')]
+        ign_pages += [body.decode('utf-8', 'replace') for url, body in replay.recorded_bodies(root, 'ign.com')
+                      if '/upcoming' in url]
+        deku_pages = [body for _, body in replay.recorded_bodies(root, 'dekudeals')]
+        self.stdout.write(f'📁 {root}: IGN страниц {len(ign_pages)}, DekuDeals страниц {len(deku_pages)}')
+
+        games = []
+        if ign_pages:
+            games = self._measure('IGN разбор', repeat, lambda: [g for html in ign_pages for g in parse_upcoming_page(html)], 'плиток')
+        if deku_pages:
+            self._measure('DekuDeals разбор', repeat, lambda: [parse_languages(body) for body in deku_pages], 'страниц')
+        if games:
+            self._measure_db(games)
+
+        peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        self.stdout.write(f'🧠 Пик RSS процесса: {peak_kb // 1024} МБ')
+
+    def _measure(self, label, repeat, func, unit):
+        tracemalloc.start()
+        started = time.perf_counter()
+        for _ in range(repeat):
+            result = func()
+        elapsed = (time.perf_counter() - started) / repeat
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        rate = len(result) / elapsed if elapsed else 0
+        self.stdout.write(
+            f'{label:18} {len(result):6} {unit}/прогон  {elapsed * 1000:9.1f} мс  {rate:10.0f} {unit}/с  '
+            f'пик Python {peak / 1024 / 1024:.1f} МБ'
+        )
+        return result
+
+    def _measure_db(self, games):
+        """Вставка разобранных игр тем же кодом, что у импорта, с откатом транзакции"""
+        from releases.ign_http import IGNHttpReleaseParser
+
+        unique = {}
+        for game in games:
+            if game.get('release_date') and normalize_title(game['title']) not in unique:
+                unique[normalize_title(game['title'])] = game
+
+        parser = IGNHttpReleaseParser()
+        tracemalloc.start()
+        started = time.perf_counter()
+        with transaction.atomic(), contextlib.redirect_stdout(io.StringIO()):
+            created = parser.writer.insert_new([{**game, "source": "IGN"} for game in unique.values()])
+            transaction.set_rollback(True)
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        parser.http.close()
+        self.stdout.write(
+            f'{"Запись в БД":18} {len(created):6} новых игр     {elapsed * 1000:9.1f} мс  '
+            f'пик Python {peak / 1024 / 1024:.1f} МБ (откатано)'
+        )
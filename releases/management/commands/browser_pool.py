@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.browser_pool import serve
+
+
+class Command(BaseCommand):
+    help = 'Держит пул прогретых headless Chrome для парсеров (см. BROWSER_POOL_URL)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--size', type=int, default=getattr(settings, 'BROWSER_POOL_SIZE', 4),
+                            help='Сколько браузеров держать запущенными')
+        parser.add_argument('--max-uses', type=int, default=getattr(settings, 'BROWSER_POOL_MAX_USES', 20),
+                            help='Перезапуск браузера после стольких выдач')
+        parser.add_argument('--max-rss-mb', type=int, default=getattr(settings, 'BROWSER_POOL_MAX_RSS_MB', 1024),
+                            help='Перезапуск браузера, если его процессы заняли больше (0 - без ограничения)')
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"🌐 Пул браузеров: {options['size']} шт. на http://{options['host']}:{options['port']} "
+            f"(перезапуск после {options['max_uses']} выдач или {options['max_rss_mb']} МБ)"
+        )
+        try:
+            serve(options['host'], options['port'], options['size'], options['max_uses'], options['max_rss_mb'])
+        except KeyboardInterrupt:
+            self.stdout.write('Остановлено')
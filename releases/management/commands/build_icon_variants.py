@@ -0,0 +1,87 @@
+import os
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from releases.images import render_icon_variants, store_icon_variants
+from releases.models import GameRelease
+
+# Строк GameRelease на одно чтение курсора
+GAME_CHUNK_SIZE = 500
+
+
+def _render(game_id, source_bytes):
+    # Выполняется в дочернем процессе: только Pillow, без БД
+    return game_id, render_icon_variants(source_bytes)
+
+
+class Command(BaseCommand):
+    help = 'Строит производные размеры иконок (WebP/JPEG) для уже загруженных игр'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Количество процессов для ресайза (по умолчанию: число ядер)'
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Перестроить варианты и для игр, у которых они уже есть'
+        )
+
+    def handle(self, *args, **options):
+        games = GameRelease.objects.exclude(icon='').exclude(icon__isnull=True)
+        if not options['force']:
+            games = games.filter(icon_variants={})
+
+        games = games.only('id', 'title', 'icon', 'icon_variants').order_by('pk')
+        total = games.count()
+        if not total:
+            self.stdout.write(self.style.WARNING('❌ Нет иконок для обработки'))
+            return
+
+        workers = max(1, options['workers'])
+        self.stdout.write(f"🖼️ Обрабатываем {total} иконок в {workers} процессах...")
+
+        self.done = 0
+        self.failed = 0
+        # В памяти не больше 2 * workers исходников: следующая иконка читается, когда освободилось место
+        max_pending = workers * 2
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = {}
+            last_pk = 0
+            while True:
+                chunk = list(games.filter(pk__gt=last_pk)[:GAME_CHUNK_SIZE])
+                if not chunk:
+                    break
+                last_pk = chunk[-1].pk
+                # Процессы пула создаются при отправке задач - соединение с БД они наследовать не должны
+                connections.close_all()
+                for game in chunk:
+                    while len(pending) >= max_pending:
+                        self._collect(pending, return_when=FIRST_COMPLETED)
+                    try:
+                        with game.icon.open('rb') as f:
+                            pending[pool.submit(_render, game.pk, f.read())] = game
+                    except OSError as e:
+                        self.stdout.write(self.style.ERROR(f"  ⚠️ {game.title}: {e}"))
+                        self.failed += 1
+            while pending:
+                self._collect(pending)
+
+        self.stdout.write(self.style.SUCCESS(f"✅ Готово: {self.done}, ошибок: {self.failed}"))
+
+    def _collect(self, pending, return_when=ALL_COMPLETED):
+        """Сохраняет готовые варианты и убирает их из pending"""
+        finished, _ = wait(pending, return_when=return_when)
+        for future in finished:
+            game = pending.pop(future)
+            try:
+                _, rendered = future.result()
+                store_icon_variants(game, rendered)
+                self.done += 1
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(f"  ⚠️ Ошибка обработки {game.title}: {e}"))
+                self.failed += 1
@@ -1,20 +1,67 @@
-import time
-import requests
-from bs4 import BeautifulSoup
+import json
+import os
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
+from pathlib import Path
+
+from django.conf import settings
 from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
 from django.utils import timezone
-from releases.models import GameRelease
+from releases import http_cache
+from releases.dekudeals import dekudeals_url, localization_candidates, lookup_languages
+from releases.downloads import RateLimiter, build_session
+from releases.models import CatalogVersion, GameRelease, GameReleaseAttribute
+from releases.runs import RunRecorder, phase_of
+
+# Строк GameRelease на одно чтение курсора при обходе кандидатов
+CANDIDATE_CHUNK_SIZE = 500
 
 
 class Command(BaseCommand):
     help = 'Проверяет русскую локализацию для игр на DekuDeals и обновляет БД'
-    
+
     def add_arguments(self, parser):
         parser.add_argument(
             '--delay',
             type=float,
-            default=2.0,
-            help='Задержка между запросами в секундах (по умолчанию: 2)'
+            help='Пауза между запросами в секундах (то же, что --rate 1/delay)'
+        )
+        parser.add_argument(
+            '--rate',
+            type=float,
+            default=settings.LOCALIZATION_RATE,
+            help=f'Запросов в секунду к DekuDeals (по умолчанию: {settings.LOCALIZATION_RATE})'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=settings.LOCALIZATION_WORKERS,
+            help=f'Параллельных запросов (по умолчанию: {settings.LOCALIZATION_WORKERS})'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.LOCALIZATION_BATCH_SIZE,
+            help=f'Игр на одну запись в БД и контрольную точку (по умолчанию: {settings.LOCALIZATION_BATCH_SIZE})'
+        )
+        parser.add_argument(
+            '--restart',
+            action='store_true',
+            help='Не продолжать прерванный прогон, начать заново'
+        )
+        parser.add_argument(
+            '--recheck-after',
+            type=float,
+            default=settings.LOCALIZATION_RECHECK_HOURS,
+            help=f'Пропускать игры, проверенные меньше стольких часов назад (по умолчанию: {settings.LOCALIZATION_RECHECK_HOURS})'
+        )
+        parser.add_argument(
+            '--refresh',
+            action='store_true',
+            help='Не доверять свежим проверкам и записям кеша (условные запросы всё равно используются)'
         )
         parser.add_argument(
             '--game-id',
@@ -27,129 +74,221 @@ class Command(BaseCommand):
             help='Проверить все игры, не только с русским языком'
         )
 
-    def __init__(self):
-        super().__init__()
-        self.session_cookies = [
-            'BAh7DEkiD3Nlc3Npb25faWQGOgZFVG86HVJhY2s6OlNlc3Npb246OlNlc3Npb25JZAY6D0BwdWJsaWNfaWRJIkU0ZjEzMjA3OWZjNWFmYTY0NjI0Njk2OGQyOGYzZTdhMzUyNGJlNzMzMTU0OTkzMDUzYmQ5Y2U5MWU3YmExZGEyBjsARkkiCWNzcmYGOwBGSSIxUnVPMWN3WkUwS3hXWE5jd2l1ZlpTdkctMDJHLUUtMl9ISFRXVjhfNWxUYz0GOwBGSSIOX19GTEFTSF9fBjsARnsASSILc291cmNlBjsARiIXaHR0cHM6Ly9lLm1haWwucnUvSSIMbGFuZGluZwY7AEZJIgYvBjsAVEkiDGNvdW50cnkGOwBGSSIHdXMGOwBUSSIJYWJpZAY7AEZJIhk5MDQyNDgxOTg2OTYxNTk0ODk5MgY7AEY%3D--be10e9f18362118284078c9f9c33b6f92eb694a7'
-        ]
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64; rv:109.0) Gecko/20100101 Firefox/115.0',
-        }
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.http = None
+        self.limiter = None
+        self.recorder = None
 
     def get_dekudeals_url(self, game_title):
         """Генерирует URL для DekuDeals на основе названия игры"""
-        slug = game_title.lower()
-        slug = ''.join(c if c.isalnum() or c == ' ' else ' ' for c in slug)
-        slug = '-'.join(slug.split())
-        return f"https://www.dekudeals.com/items/{slug}"
-
-    def check_game_localization(self, game_title):
-        """Проверяет наличие русской локализации для игры"""
-        url = self.get_dekudeals_url(game_title)
-        loco=[]
-        
-        for cookie in self.session_cookies:
+        return dekudeals_url(game_title)
+
+    def check_game_localization(self, game_title, entry=None):
+        """
+        Проверяет наличие русской локализации для игры условным запросом по записи кеша.
+        (языки, исход, запись кеша для сохранения); языки None - проверить не удалось
+        """
+        return lookup_languages(self.http, self.limiter, game_title, entry, on_error=self._report_error)
+
+    def _report_error(self, game_title, error):
+        self.stdout.write(self.style.WARNING(f"Ошибка при проверке {game_title}: {error}"))
+        if self.recorder is not None:
+            self.recorder.error(str(error), title=game_title)
+
+    # --- Контрольная точка ---
+
+    def _checkpoint_path(self):
+        return Path(settings.LOCALIZATION_CHECKPOINT)
+
+    def _load_checkpoint(self, mode):
+        """ID, уже обработанные прерванным прогоном того же режима"""
+        path = self._checkpoint_path()
+        try:
+            data = json.loads(path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return set()
+        if data.get('mode') != mode:
+            return set()
+        return set(data.get('done', []))
+
+    def _save_checkpoint(self, mode, done):
+        path = self._checkpoint_path()
+        tmp = path.with_name(path.name + '.tmp')
+        tmp.write_text(json.dumps({'mode': mode, 'done': sorted(done)}), encoding='utf-8')
+        os.replace(tmp, path)
+
+    def _clear_checkpoint(self):
+        self._checkpoint_path().unlink(missing_ok=True)
+
+    # --- Проверка и запись ---
+
+    def _check_all(self, games, workers, refresh=False):
+        """
+        (игра, языки, исход, запись кеша) по мере готовности. Игры со свежей записью
+        кеша в сеть не идут. В полёте не больше 2 * workers запросов, так что очередь
+        не растёт вместе с каталогом.
+        """
+        games = iter(games)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='localization') as pool:
+            pending = {}
             try:
-                cookies = {'rack.session': cookie}
-                response = requests.get(url, cookies=cookies, headers=self.headers, timeout=10)
-                
-                if response.status_code == 200:
-                    soup = BeautifulSoup(response.content, "html.parser")
-                    
-                    # Ищем блок с языками
-                    language_sections = soup.select('div > div > ul > li')
-                    for section in language_sections:
-                        text = section.get_text(strip=True)
-                        if 'Languages:' in text or 'Language:' in text:
-                            has_russian = any(word in text for word in ['Russian', 'русский', 'Русский'])
-                            if has_russian and 'RUSSIAN' not in loco: loco.append('RUSSIAN')
-                        if 'Languages:' in text or 'Language:' in text:
-                            has_russian = any(word in text for word in ['English'])
-                            if has_russian and 'ENGLISH' not in loco: loco.append('ENGLISH')
-                    
-                    # Альтернативные селекторы
-                    details_sections = soup.select('.item-details, .game-info, .details')
-                    for section in details_sections:
-                        text = section.get_text()
-                        if any(word in text for word in ['Languages:', 'Language:', 'Языки:', 'Язык:']):
-                            has_russian = any(word in text for word in ['Russian', 'русский', 'Русский'])
-                            if has_russian and 'RUSSIAN' not in loco: loco.append('RUSSIAN')
-                        if any(word in text for word in ['Languages:', 'Language:', 'Языки:', 'Язык:']):
-                            has_russian = any(word in text for word in ['English'])
-                            if has_russian and 'ENGLISH' not in loco: loco.append('ENGLISH')
-
-
-
-                            
-                
-                return loco
-                time.sleep(1)
-                
-            except requests.RequestException as e:
-                self.stdout.write(self.style.WARNING(f"Ошибка при проверке {game_title}: {e}"))
-                continue
-        
-        return None
+                while True:
+                    chunk = list(islice(games, workers * 2 - len(pending)))
+                    with phase_of(self.recorder, 'fetch'):
+                        entries = http_cache.load_entries(self.get_dekudeals_url(game.title) for game in chunk)
+                    for game in chunk:
+                        entry = entries.get(self.get_dekudeals_url(game.title))
+                        if not refresh and http_cache.is_fresh(entry, http_cache.ttl_for_release(game.release_date)):
+                            yield game, entry.result, http_cache.FRESH, None
+                            continue
+                        pending[pool.submit(self.check_game_localization, game.title, entry)] = game
+                    if not pending:
+                        if chunk:
+                            continue
+                        return
+                    # Время фазы fetch - ожидание ответов, без записи в БД между ними
+                    with phase_of(self.recorder, 'fetch'):
+                        finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        yield (pending.pop(future), *future.result())
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def _flush(self, changed, cache_entries, processed):
+        """
+        Пакетная запись: языки одним UPDATE на пачку (атрибуты и версия каталога - как при save()),
+        отметка проверки и записи кеша - ещё по одному запросу
+        """
+        with phase_of(self.recorder, 'save'), transaction.atomic():
+            if processed:
+                GameRelease.objects.filter(pk__in=processed).update(localization_checked_at=timezone.now())
+            if changed:
+                now = timezone.now()
+                for game in changed:
+                    game.updated_at = now
+                    game.row_version = F('row_version') + 1
+                GameRelease.objects.bulk_update(changed, ['languages', 'updated_at', 'row_version'])
+                GameReleaseAttribute.sync(changed)
+                CatalogVersion.bump()
+            http_cache.save_entries(list(cache_entries.values()))
+        changed.clear()
+        cache_entries.clear()
 
     def handle(self, *args, **options):
-        delay = options['delay']
+        rate = 1 / options['delay'] if options['delay'] else options['rate']
+        workers = max(1, options['workers'])
+        batch_size = max(1, options['batch_size'])
         game_id = options['game_id']
         force_all = options['force_all']
-        
+        # Одну игру по ID проверяем всегда по сети
+        refresh = options['refresh'] or bool(game_id)
+
         self.stdout.write(self.style.SUCCESS('🚀 Запуск проверки локализаций...'))
-        
+
         # Определяем какие игры проверять
         if game_id:
             games = GameRelease.objects.filter(id=game_id)
             self.stdout.write(f"Проверяем игру с ID: {game_id}")
-        elif force_all:
-            games = GameRelease.objects.all()
-            self.stdout.write("Проверяем ВСЕ игры (режим --force-all)")
         else:
-            # Только игры с русским языком
-            games_with_russian = []
-            all_games = GameRelease.objects.all()
-            
-            for game in all_games:
-                languages = game.get_languages_list()
-                if 'UNKNOW' in languages:
-                    games_with_russian.append(game)
-            
-            games = games_with_russian
-            self.stdout.write(f"Проверяем игры с русским языком: {len(games)} шт")
-        
-        if not games:
+            games = localization_candidates(force_all, None if refresh else options['recheck_after'])
+            if force_all:
+                self.stdout.write("Проверяем ВСЕ игры (режим --force-all)")
+            else:
+                self.stdout.write("Проверяем игры с неизвестной локализацией")
+
+        # Контрольная точка только для прогонов по каталогу
+        mode = None if game_id else ('all' if force_all else 'unknown')
+        done = set()
+        if mode:
+            if options['restart']:
+                self._clear_checkpoint()
+            done = self._load_checkpoint(mode)
+            if done:
+                self.stdout.write(f"↩️  Продолжаем прерванный прогон: уже обработано {len(done)}")
+
+        total = games.count()
+        self.stdout.write(f"К проверке: {total} шт")
+        if not total:
             self.stdout.write(self.style.WARNING("❌ Не найдено игр для проверки"))
+            if mode:
+                self._clear_checkpoint()
             return
-        
+
+        # Постоянная память на любом каталоге: строки читаются кусками, обработанные отсеиваются на ходу
+        games = (
+            game for game in games.iterator(chunk_size=CANDIDATE_CHUNK_SIZE)
+            if game.pk not in done
+        )
+
         updated_count = 0
         failed_count = 0
-        total = len(games)
-        
-        for i, game in enumerate(games, 1):
-            self.stdout.write(f"[{i}/{total}] Проверяем: {game.title}")
-            
-            new_loco = self.check_game_localization(game.title)
-            new_loco.sort()
-            
-            if new_loco is not None:
-
-                if new_loco!=[]:
-                    game.languages = new_loco
-                    game.save()
-                    updated_count += 1
-            else:
-                self.stdout.write(self.style.ERROR(f"  ⚠️  Не удалось проверить"))
-                failed_count += 1
-            
-            # Задержка между запросами
-            if i < total:  # Не ждать после последней игры
-                time.sleep(delay)
-        
+        checked_count = 0
+        changed = []
+        cache_entries = {}
+        processed = []
+        outcomes = Counter()
+
+        # Время фаз, исходы кеша и ошибки - в IngestionRun (releases.runs)
+        with RunRecorder('check_localizations', sources=['DEKUDEALS']) as run:
+            self.recorder = run
+            self.http = build_session(pool_size=workers)
+            self.limiter = RateLimiter(rate, burst=workers)
+            try:
+                for i, (game, new_loco, outcome, entry) in enumerate(self._check_all(games, workers, refresh), 1):
+                    self.stdout.write(f"[{i}/{total}] Проверяем: {game.title}")
+
+                    if new_loco is None:
+                        # В контрольную точку не попадает - повторим при следующем запуске
+                        self.stdout.write(self.style.ERROR(f"  ⚠️  Не удалось проверить {game.title}"))
+                        failed_count += 1
+                        run.count('failed')
+                        continue
+
+                    outcomes[outcome] += 1
+                    checked_count += 1
+                    if entry is not None:
+                        cache_entries[entry.url] = entry
+                    if new_loco and sorted(new_loco) != game.get_languages_list():
+                        game.languages = sorted(new_loco)
+                        changed.append(game)
+                        updated_count += 1
+                    processed.append(game.pk)
+
+                    if len(processed) >= batch_size:
+                        self._flush(changed, cache_entries, processed)
+                        done.update(processed)
+                        processed.clear()
+                        if mode:
+                            self._save_checkpoint(mode, done)
+            except KeyboardInterrupt:
+                self._flush(changed, cache_entries, processed)
+                done.update(processed)
+                if mode:
+                    self._save_checkpoint(mode, done)
+                self.stdout.write(self.style.WARNING(
+                    f"\n⏸️  Прервано: обработано {len(done)}, следующий запуск продолжит с этого места"
+                ))
+                run.interrupt()
+                return
+            finally:
+                self.http.close()
+                run.update_counters(outcomes, prefix='cache_')
+                run.finish_counts(updated=updated_count)
+
+            self._flush(changed, cache_entries, processed)
+            if mode:
+                self._clear_checkpoint()
+
         # Итоги
         self.stdout.write("\n" + "="*50)
-        self.stdout.write(self.style.SUCCESS(f"🎉 ПРОВЕРКА ЗАВЕРШЕНА!"))
-        self.stdout.write(f"📊 Обработано игр: {total}")
+        self.stdout.write(self.style.SUCCESS("🎉 ПРОВЕРКА ЗАВЕРШЕНА!"))
+        self.stdout.write(f"📊 Проверено игр: {checked_count} из {total}")
         self.stdout.write(f"✅ Обновлено: {updated_count}")
         self.stdout.write(f"❌ Ошибок: {failed_count}")
-        self.stdout.write("="*50)
\ No newline at end of file
+        self.stdout.write(
+            f"🗄️  Кеш: свежих {outcomes[http_cache.FRESH]}, не изменились {outcomes[http_cache.NOT_MODIFIED]} (304)"
+            f" / {outcomes[http_cache.UNCHANGED]} (тот же хеш), разобрано {outcomes[http_cache.PARSED]}"
+        )
+        self.stdout.write("="*50)
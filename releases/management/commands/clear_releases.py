@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
 from releases.models import GameRelease
+from core.storage import collect_garbage
 
 class Command(BaseCommand):
     help = 'Очищает все записи о релизах из БД'
@@ -34,4 +35,14 @@ class Command(BaseCommand):
             self.style.SUCCESS(
                 f'✅ Удалено {deleted_count} игр из БД'
             )
+        )
+
+        # Иконки удалённых игр больше никто не использует. Свежие файлы (моложе периода
+        # ожидания по умолчанию) не трогаем - их могла записать ещё не закоммиченная загрузка;
+        # их уберёт следующий gc_media
+        files_deleted, freed = collect_garbage()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'🧹 Удалено {files_deleted} неиспользуемых файлов ({freed / 1024 / 1024:.1f} МБ)'
+            )
         )
\ No newline at end of file
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from core.storage import collect_garbage
+
+
+class Command(BaseCommand):
+    help = 'Удаляет медиа-файлы (иконки, аватарки), на которые больше нет ссылок в БД'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace',
+            type=int,
+            default=3600,
+            help='Не трогать файлы моложе N секунд (по умолчанию: 3600)'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только показать, сколько файлов будет удалено'
+        )
+
+    def handle(self, *args, **options):
+        deleted, freed = collect_garbage(grace_seconds=options['grace'], dry_run=options['dry_run'])
+        prefix = 'Будет удалено' if options['dry_run'] else '✅ Удалено'
+        self.stdout.write(
+            self.style.SUCCESS(f"{prefix} {deleted} файлов, {freed / 1024 / 1024:.1f} МБ")
+        )
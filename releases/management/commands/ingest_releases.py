@@ -0,0 +1,56 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import import_string
+from releases.ingestion import IngestionPipeline
+from releases.runs import RunRecorder
+
+
+class Command(BaseCommand):
+    help = 'Импорт релизов из всех источников settings.INGESTION_SOURCES (IGN, DekuDeals, ...) с общей склейкой и записью'
+
+    def add_arguments(self, parser):
+        names = [import_string(path).name for path in getattr(settings, 'INGESTION_SOURCES', [])]
+        parser.add_argument(
+            '--source',
+            action='append',
+            choices=names,
+            help='Только этот источник (можно несколько раз); по умолчанию все',
+        )
+        parser.add_argument(
+            '--fetcher',
+            choices=['browser', 'http'],
+            default=getattr(settings, 'IGN_FETCHER', 'browser'),
+            help='Как IGN забирает страницы: browser - Selenium + Chrome, http - requests без браузера',
+        )
+        parser.add_argument(
+            '--localization-limit',
+            type=int,
+            default=getattr(settings, 'INGESTION_LOCALIZATION_LIMIT', 0),
+            help='Сколько релизов из БД с неизвестной локализацией дополнительно проверить на DekuDeals',
+        )
+
+    def handle(self, *args, **options):
+        pipeline = IngestionPipeline(
+            names=options['source'],
+            fetcher=options['fetcher'],
+            localization_limit=options['localization_limit'],
+        )
+        self.stdout.write(f"🎮 Импорт релизов: {', '.join(source.name for source in pipeline.sources)}")
+        run = RunRecorder('ingest_releases', sources=[source.name for source in pipeline.sources])
+        try:
+            with run:
+                result = pipeline.run(recorder=run)
+        except Exception as e:
+            if run.run is None:
+                raise  # прогон даже не записался (нет БД) - нужен полный traceback
+            # Traceback уже в прогоне (status=failed) - в stderr одна строка и ненулевой код выхода
+            raise CommandError(f"Импорт не удался (прогон #{run.run.pk}): {type(e).__name__}: {e}") from e
+
+        self.stdout.write("\n📊 ИСТОЧНИКИ:")
+        for name, stats in pipeline.stats().items():
+            counters = ', '.join(f"{key}={value}" for key, value in sorted(stats.items()))
+            self.stdout.write(f"   {name}: {counters}")
+        self.stdout.write(self.style.SUCCESS(
+            f"\n✅ Импорт завершен! Добавлено {len(result['created'])}, обновлено {len(result['updated'])} "
+            f"(прогон #{run.run.pk}, {run.run.duration:.1f} с)"
+        ))
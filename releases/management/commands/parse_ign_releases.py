@@ -1,15 +1,33 @@
-from django.core.management.base import BaseCommand
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
 from releases.models import GameRelease
 from releases.ign_parser import run_parser, get_parser_stats
+from releases.runs import RunRecorder
 
 class Command(BaseCommand):
     help = 'Парсит релизы игр с IGN.com и сохраняет в БД'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fetcher',
+            choices=['browser', 'http'],
+            default=getattr(settings, 'IGN_FETCHER', 'browser'),
+            help='browser - Selenium + Chrome, http - requests без браузера',
+        )
+
     def handle(self, *args, **options):
-        self.stdout.write('🎮 Запуск парсера IGN релизов...')
+        self.stdout.write(f"🎮 Запуск парсера IGN релизов ({options['fetcher']})...")
         
-        # Запускаем парсер
-        new_games = run_parser()
+        # Запускаем парсер; время фаз, счётчики и ошибки - в IngestionRun
+        run = RunRecorder('parse_ign_releases', sources=['IGN'])
+        try:
+            with run:
+                new_games = run_parser(options['fetcher'], recorder=run)
+        except Exception as e:
+            if run.run is None:
+                raise  # прогон даже не записался (нет БД) - нужен полный traceback
+            # Traceback уже в прогоне (status=failed) - в stderr одна строка и ненулевой код выхода
+            raise CommandError(f"Парсинг IGN не удался (прогон #{run.run.pk}): {type(e).__name__}: {e}") from e
         
         # Показываем статистику
         stats = get_parser_stats()
@@ -27,6 +45,7 @@ class Command(BaseCommand):
         
         self.stdout.write(
             self.style.SUCCESS(
-                f'\n✅ Парсинг завершен! Добавлено {len(new_games)} новых игр'
+                f'\n✅ Парсинг завершен! Добавлено {len(new_games)} новых игр '
+                f'(прогон #{run.run.pk}, {run.run.duration:.1f} с)'
             )
         )
\ No newline at end of file
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:09
+
+import django.core.validators
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GameRelease',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200, verbose_name='Название игры')),
+                ('icon', models.ImageField(blank=True, null=True, upload_to='game_icons/', verbose_name='Иконка игры')),
+                ('icon_variants', models.JSONField(blank=True, default=dict, editable=False, verbose_name='Варианты иконки')),
+                ('release_date', models.DateField(verbose_name='Дата релиза')),
+                ('is_published', models.BooleanField(default=False, verbose_name='Опубликовано')),
+                ('platforms', models.JSONField(default=list, help_text='Список платформ: ["PS4", "PS5", "Switch"]', verbose_name='Платформы')),
+                ('marketplaces', models.JSONField(default=['Avito', 'Difmark', 'Wildberries', 'Digiseller'], help_text='Список площадок: ["Avito", "Digiseller"]', verbose_name='Площадки')),
+                ('languages', models.JSONField(default=list, help_text='Список языков: ["Русский", "Английский"]', verbose_name='Локализации')),
+                ('marketplace_platforms', models.JSONField(default=dict, help_text='Формат: {"Avito": ["PS4", "PS5"], "Digiseller": ["Switch"]}', verbose_name='Публикации по площадкам')),
+                ('description', models.TextField(blank=True, verbose_name='Описание игры')),
+                ('price', models.DecimalField(decimal_places=2, default=0, max_digits=10, validators=[django.core.validators.MinValueValidator(Decimal('0'))], verbose_name='Цена')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Дата обновления')),
+            ],
+            options={
+                'verbose_name': 'Релиз игры',
+                'verbose_name_plural': 'Релизы игр',
+                'ordering': ['release_date', 'title'],
+                'indexes': [models.Index(fields=['release_date'], name='releases_ga_release_24a6c1_idx'), models.Index(fields=['is_published'], name='releases_ga_is_publ_57a906_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('releases', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GameReleaseAttribute',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('platform', 'Платформа'), ('marketplace', 'Площадка'), ('language', 'Локализация'), ('published_on', 'Публикации на площадке'), ('publication', 'Публикация площадка:платформа')], max_length=20, verbose_name='Вид')),
+                ('code', models.CharField(max_length=40, verbose_name='Код')),
+                ('release', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attributes', to='releases.gamerelease')),
+            ],
+            options={
+                'verbose_name': 'Атрибут релиза',
+                'verbose_name_plural': 'Атрибуты релизов',
+                'indexes': [models.Index(fields=['kind', 'code', 'release'], name='releases_ga_kind_e8b985_idx')],
+                'constraints': [models.UniqueConstraint(fields=('release', 'kind', 'code'), name='unique_release_attribute')],
+            },
+        ),
+    ]
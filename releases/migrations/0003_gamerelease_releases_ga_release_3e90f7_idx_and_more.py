@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('releases', '0002_gamereleaseattribute'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='gamerelease',
+            index=models.Index(fields=['release_date', 'title'], name='releases_ga_release_3e90f7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='gamerelease',
+            index=models.Index(fields=['title', 'release_date'], name='releases_ga_title_8d151b_idx'),
+        ),
+    ]
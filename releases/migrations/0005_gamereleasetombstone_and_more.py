@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('releases', '0004_catalogversion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GameReleaseTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('release_id', models.BigIntegerField(verbose_name='ID релиза')),
+                ('title', models.CharField(max_length=200, verbose_name='Название игры')),
+                ('deleted_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата удаления')),
+            ],
+            options={
+                'verbose_name': 'Удалённый релиз',
+                'verbose_name_plural': 'Удалённые релизы',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='gamerelease',
+            index=models.Index(fields=['updated_at', 'id'], name='releases_ga_updated_03255d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='gamereleasetombstone',
+            index=models.Index(fields=['deleted_at', 'id'], name='releases_ga_deleted_84a826_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('releases', '0005_gamereleasetombstone_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gamerelease',
+            name='row_version',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Версия записи'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('releases', '0006_gamerelease_row_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gamerelease',
+            name='normalized_title',
+            field=models.CharField(editable=False, max_length=200, null=True, unique=True, verbose_name='Нормализованное название'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('releases', '0007_gamerelease_normalized_title'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HttpCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.CharField(max_length=500, unique=True, verbose_name='URL')),
+                ('status', models.PositiveSmallIntegerField(default=200, verbose_name='HTTP статус')),
+                ('etag', models.CharField(blank=True, max_length=200, verbose_name='ETag')),
+                ('last_modified', models.CharField(blank=True, max_length=100, verbose_name='Last-Modified')),
+                ('body_hash', models.CharField(blank=True, max_length=64, verbose_name='SHA-256 тела')),
+                ('result', models.JSONField(blank=True, default=list, verbose_name='Результат разбора')),
+                ('checked_at', models.DateTimeField(verbose_name='Дата проверки')),
+            ],
+            options={
+                'verbose_name': 'Кеш HTTP ответа',
+                'verbose_name_plural': 'Кеш HTTP ответов',
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('releases', '0008_httpcacheentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gamerelease',
+            name='localization_checked_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Локализация проверена'),
+        ),
+        migrations.AddIndex(
+            model_name='gamerelease',
+            index=models.Index(fields=['localization_checked_at'], name='releases_ga_localiz_3e9072_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('releases', '0009_gamerelease_localization_checked_at_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IngestionRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('command', models.CharField(max_length=50, verbose_name='Команда')),
+                ('sources', models.JSONField(blank=True, default=list, verbose_name='Источники')),
+                ('status', models.CharField(choices=[('running', 'Выполняется'), ('success', 'Успешно'), ('failed', 'Ошибка'), ('interrupted', 'Прервано')], default='running', max_length=12, verbose_name='Статус')),
+                ('started_at', models.DateTimeField(auto_now_add=True, verbose_name='Начало')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Окончание')),
+                ('duration', models.FloatField(blank=True, null=True, verbose_name='Длительность, с')),
+                ('phases', models.JSONField(blank=True, default=dict, verbose_name='Фазы')),
+                ('counters', models.JSONField(blank=True, default=dict, verbose_name='Счётчики')),
+                ('errors', models.JSONField(blank=True, default=list, verbose_name='Ошибки')),
+                ('peak_memory_mb', models.FloatField(blank=True, null=True, verbose_name='Пик памяти, МБ')),
+                ('created_count', models.PositiveIntegerField(default=0, verbose_name='Добавлено')),
+                ('updated_count', models.PositiveIntegerField(default=0, verbose_name='Обновлено')),
+            ],
+            options={
+                'verbose_name': 'Прогон импорта',
+                'verbose_name_plural': 'Прогоны импорта',
+                'ordering': ['-started_at'],
+                'indexes': [models.Index(fields=['command', 'started_at'], name='releases_in_command_b7b4ff_idx')],
+            },
+        ),
+    ]
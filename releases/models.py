@@ -2,6 +2,130 @@ from django.db import models
 from django.core.validators import MinValueValidator
 from decimal import Decimal
 from django.conf import settings
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.functional import cached_property
+
+
+def normalize_choice_codes(values, choices):
+    """
+    Приводит значения к кодам из choices: в JSON исторически лежат и коды
+    ("AVITO"), и названия ("Avito", "Русский"). Неизвестные значения - в верхний регистр.
+    """
+    lookup = {}
+    for code, label in choices:
+        lookup[code.lower()] = code
+        lookup[label.lower()] = code
+    result = []
+    for value in values if isinstance(values, (list, tuple)) else []:
+        if not isinstance(value, str) or not value:
+            continue
+        code = lookup.get(value.lower(), value.upper())
+        if code not in result:
+            result.append(code)
+    return result
+
+
+def normalize_title(title):
+    """Ключ дедупликации релизов: регистр и пробелы не различаем ("The  Game" == "the game")"""
+    return ' '.join((title or '').split()).casefold()[:200]
+
+
+# Порядок и иконки площадок в таблицах release_list / release_modal
+MARKETPLACE_ICONS = {
+    'AVITO': 'platform_icons/avito.jpg',
+    'TELEGRAM': 'platform_icons/difmark.png',
+    'DIFMARK': 'platform_icons/difmark2.png',
+    'WILDBERRIES': 'platform_icons/wb.jpg',
+    'DIGISELLER': 'platform_icons/diga.png',
+    'GGSEL': 'platform_icons/ggsel.png',
+    'FUNPAY': 'platform_icons/funpay.jpg',
+    'DARKSTORE': 'platform_icons/darkstore.png',
+}
+
+PLATFORM_ICONS = {
+    'PS4': 'platform_icons/ps4.png',
+    'PS5': 'platform_icons/ps5.png',
+    'SWITCH': 'platform_icons/ns.png',
+    'SWITCH2': 'platform_icons/ns2.png',
+    'XBOX_ONE': 'platform_icons/xbox.png',
+    'XBOX_SERIES': 'platform_icons/xboxs.png',
+}
+
+LANGUAGE_ICONS = {
+    'RUSSIAN': 'platform_icons/ru.jpg',
+    'ENGLISH': 'platform_icons/en.jpg',
+    'UNKNOW': 'platform_icons/unknow.png',
+}
+
+MARKETPLACE_STATUS_DISPLAY = {
+    'not_published': 'Не опубликовано',
+    'partially_published': 'Частично опубликовано',
+    'fully_published': 'Опубликовано',
+}
+
+
+def marketplace_status(published_platforms, all_platforms):
+    """Статус площадки по числу опубликованных платформ относительно всех платформ релиза"""
+    if not published_platforms:
+        return 'not_published'
+    elif len(published_platforms) == len(all_platforms):
+        return 'fully_published'
+    return 'partially_published'
+
+
+class PublicationMatrix:
+    """
+    Площадка -> платформа -> опубликовано, плюс статус площадки.
+    Строится один раз на экземпляр GameRelease (см. GameRelease.publication_matrix),
+    шаблоны и фильтры release_tags только читают из неё.
+    """
+
+    def __init__(self, release):
+        # Порядок колонок совпадает с заголовком таблицы (display_platforms_list)
+        platforms = sorted(release.get_platforms_list())
+        publications = release.get_marketplace_platforms_dict()
+        selected = release.get_marketplaces_list()
+        self.rows = []
+        self.by_code = {}
+        for code, name in release.MARKETPLACE_CHOICES:
+            published = publications.get(code) or []
+            status = marketplace_status(published, platforms)
+            row = {
+                'code': code,
+                'name': name,
+                'is_selected': code in selected,
+                'icon_url': MARKETPLACE_ICONS.get(code, ''),
+                'status': status,
+                'status_display': MARKETPLACE_STATUS_DISPLAY[status],
+                'platforms': [
+                    {'code': platform, 'is_published': platform in published}
+                    for platform in platforms
+                ],
+                'published': frozenset(published),
+            }
+            self.rows.append(row)
+            self.by_code[code] = row
+
+    def status(self, marketplace):
+        row = self.by_code.get(marketplace)
+        return row['status'] if row else 'not_published'
+
+    def status_display(self, marketplace):
+        return MARKETPLACE_STATUS_DISPLAY[self.status(marketplace)]
+
+    def is_published(self, marketplace, platform):
+        row = self.by_code.get(marketplace)
+        return bool(row) and platform in row['published']
+
+    def as_json(self):
+        """Строки матрицы для JSON ответа (без служебного множества published)"""
+        return [
+            {key: value for key, value in row.items() if key != 'published'}
+            for row in self.rows
+        ]
+
 
 class GameRelease(models.Model):
     PLATFORM_CHOICES = [
@@ -32,9 +156,22 @@ class GameRelease(models.Model):
     
     # Основная информация
     title = models.CharField(max_length=200, verbose_name='Название игры')
+    # normalize_title(title); уникальный индекс вместо title__iexact при импорте.
+    # NULL - у старых дублей, которые backfill_normalized_titles не смог занять
+    normalized_title = models.CharField(
+        max_length=200, unique=True, null=True, editable=False, verbose_name='Нормализованное название'
+    )
     icon = models.ImageField(upload_to='game_icons/', blank=True, null=True, verbose_name='Иконка игры')
+    # Производные размеры иконки, см. releases.images: {"list": {"webp": "...", "jpg": "..."}, ...}
+    icon_variants = models.JSONField(default=dict, blank=True, editable=False, verbose_name='Варианты иконки')
     release_date = models.DateField(verbose_name='Дата релиза')
     is_published = models.BooleanField(default=False, verbose_name='Опубликовано')
+    # Версия строки для оптимистичной блокировки изменений публикаций (releases.publications)
+    row_version = models.PositiveIntegerField(default=0, editable=False, verbose_name='Версия записи')
+    # Когда check_localizations последний раз успешно проверил языки; NULL - ни разу
+    localization_checked_at = models.DateTimeField(
+        null=True, blank=True, editable=False, verbose_name='Локализация проверена'
+    )
     
     # Платформы (многие ко многим через JSON)
     platforms = models.JSONField(
@@ -83,10 +220,82 @@ class GameRelease(models.Model):
         indexes = [
             models.Index(fields=['release_date']),
             models.Index(fields=['is_published']),
+            # Ключи keyset-пагинации release_list (id в SQLite индексе есть неявно)
+            models.Index(fields=['release_date', 'title']),
+            models.Index(fields=['title', 'release_date']),
+            # Лента изменений: WHERE (updated_at, id) > cursor
+            models.Index(fields=['updated_at', 'id']),
+            # Отбор кандидатов check_localizations по давности проверки
+            models.Index(fields=['localization_checked_at']),
         ]
     
     def __str__(self):
         return f"{self.title} ({self.release_date})"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Название из БД - по нему save() видит, что его поменяли
+        instance._loaded_title = instance.__dict__.get('title')
+        return instance
+
+    def _title_changed(self):
+        if self._state.adding:
+            return True
+        if 'title' not in self.__dict__:
+            # Поле отложено (only/defer) и не присваивалось
+            return False
+        return self.__dict__['title'] != getattr(self, '_loaded_title', None)
+
+    def _update_normalized_title(self):
+        """
+        Ключ пересчитывается только при смене названия. Если его уже занял другой
+        релиз (старые дубли, см. backfill_normalized_titles), остаётся NULL -
+        иначе любое сохранение такой записи падало бы на уникальном индексе.
+        """
+        key = normalize_title(self.title)
+        if key and GameRelease.objects.filter(normalized_title=key).exclude(pk=self.pk).exists():
+            key = None
+        self.normalized_title = key
+
+    def save(self, *args, **kwargs):
+        self.__dict__.pop('publication_matrix', None)
+        if self._title_changed():
+            self._update_normalized_title()
+            if kwargs.get('update_fields') is not None and 'title' in kwargs['update_fields']:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'normalized_title'}
+        if kwargs.get('update_fields') is None:
+            # Полное сохранение (форма, парсер) тоже делает устаревшими прочитанные клиентами версии
+            self.row_version = (self.row_version or 0) + 1
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        if 'title' in self.__dict__ and (update_fields is None or 'title' in update_fields):
+            self._loaded_title = self.title
+        if update_fields is None or set(update_fields) & set(GameReleaseAttribute.SOURCE_FIELDS):
+            self.sync_attributes()
+
+    def get_attribute_pairs(self):
+        """Множество (вид, код) для индексируемой таблицы GameReleaseAttribute"""
+        pairs = set()
+        for code in normalize_choice_codes(self.platforms, self.PLATFORM_CHOICES):
+            pairs.add((GameReleaseAttribute.PLATFORM, code))
+        for code in normalize_choice_codes(self.marketplaces, self.MARKETPLACE_CHOICES):
+            pairs.add((GameReleaseAttribute.MARKETPLACE, code))
+        for code in normalize_choice_codes(self.languages, self.LANGUAGE_CHOICES):
+            pairs.add((GameReleaseAttribute.LANGUAGE, code))
+        publications = self.marketplace_platforms if isinstance(self.marketplace_platforms, dict) else {}
+        for marketplace, platforms in publications.items():
+            marketplace_code = normalize_choice_codes([marketplace], self.MARKETPLACE_CHOICES)
+            if not marketplace_code:
+                continue
+            pairs.add((GameReleaseAttribute.PUBLISHED_ON, marketplace_code[0]))
+            for platform in normalize_choice_codes(platforms, self.PLATFORM_CHOICES):
+                pairs.add((GameReleaseAttribute.PUBLICATION, f"{marketplace_code[0]}:{platform}"))
+        return pairs
+
+    def sync_attributes(self):
+        """Приводит строки GameReleaseAttribute в соответствие с JSON полями"""
+        GameReleaseAttribute.sync([self])
     
     def get_platforms_list(self):
         """Возвращает список платформ"""
@@ -104,6 +313,36 @@ class GameRelease(models.Model):
         """Возвращает словарь площадка->платформы"""
         return self.marketplace_platforms or {}
     
+    def get_icon_variant_url(self, variant, fmt):
+        """URL производного размера иконки или None, если он ещё не построен"""
+        from django.core.files.storage import default_storage
+        name = (self.icon_variants or {}).get(variant, {}).get(fmt)
+        return default_storage.url(name) if name else None
+
+    def get_media_references(self):
+        """Файлы, на которые ссылается запись помимо icon (для сборщика мусора медиа)"""
+        return [name for formats in (self.icon_variants or {}).values() for name in formats.values()]
+
+    def get_icon_sources(self):
+        """
+        srcset для <picture>: {"list": {"webp": "a.webp 1x, b.webp 2x", "jpg": ..., "src": ...}, "modal": {...}}
+        Пустой словарь, если варианты ещё не построены - тогда шаблон берёт icon.url
+        """
+        sources = {}
+        for base in ('list', 'modal'):
+            entry = {}
+            for fmt in ('webp', 'jpg'):
+                url_1x = self.get_icon_variant_url(base, fmt)
+                url_2x = self.get_icon_variant_url(f'{base}_2x', fmt)
+                if not url_1x:
+                    continue
+                entry[fmt] = f"{url_1x} 1x, {url_2x} 2x" if url_2x else f"{url_1x} 1x"
+                if fmt == 'jpg':
+                    entry['src'] = url_1x
+            if 'src' in entry:
+                sources[base] = entry
+        return sources
+
     def is_released(self):
         """Проверяет, вышел ли уже релиз"""
         from django.utils import timezone
@@ -122,47 +361,16 @@ class GameRelease(models.Model):
         return [choice[0] for choice in self.MARKETPLACE_CHOICES]
     
     def get_language_icon(self, language):
-        """Возвращает иконку для платформы"""
-        icons = {
-            'RUSSIAN': 'platform_icons/ru.jpg',
-            'ENGLISH': 'platform_icons/en.jpg',
-            'UNKNOW': 'platform_icons/unknow.png',
-        }
-        return icons.get(language, '')
+        """Возвращает иконку для языка"""
+        return LANGUAGE_ICONS.get(language, '')
 
     def display_languages_list(self):
-        icons = {
-            'RUSSIAN': 'platform_icons/ru.jpg',
-            'ENGLISH': 'platform_icons/en.jpg',
-            'UNKNOW': 'platform_icons/unknow.png',
-        }
-        arr=self.languages if isinstance(self.languages, list) else []
-        rz=[]
-        for lang in arr:
-            rz.append({
-                "code":lang,
-                "icon":icons.get(lang,''),
-            })
-        return rz
+        arr = self.languages if isinstance(self.languages, list) else []
+        return [{"code": lang, "icon": LANGUAGE_ICONS.get(lang, '')} for lang in arr]
 
     def display_platforms_list(self):
-        icons = {
-            'PS4': 'platform_icons/ps4.png',
-            'PS5': 'platform_icons/ps5.png',
-            'SWITCH': 'platform_icons/ns.png',
-            'SWITCH2': 'platform_icons/ns2.png',
-            'XBOX_ONE': 'platform_icons/xbox.png',
-            'XBOX_SERIES': 'platform_icons/xboxs.png',
-        }
-        arr=self.platforms if isinstance(self.platforms, list) else []
-        arr.sort()
-        rz=[]
-        for market in arr:
-            rz.append({
-                "code":market,
-                "icon":icons.get(market,''),
-            })
-        return rz
+        arr = self.platforms if isinstance(self.platforms, list) else []
+        return [{"code": platform, "icon": PLATFORM_ICONS.get(platform, '')} for platform in sorted(arr)]
     
     def get_platform_icon(self, platform):
         """Возвращает иконку для платформы"""
@@ -193,72 +401,30 @@ class GameRelease(models.Model):
 
 #
 
+    @cached_property
+    def publication_matrix(self):
+        """Матрица публикаций, одна на экземпляр; сбрасывается в save()"""
+        return PublicationMatrix(self)
+
     def get_all_marketplaces_display(self):
         """Возвращает данные по всем площадкам с иконками и статусами"""
-        MARKETPLACE_ICONS = {
-            'AVITO': 'platform_icons/avito.jpg',
-            'TELEGRAM': 'platform_icons/difmark.png', 
-            'DIFMARK': 'platform_icons/difmark2.png', 
-            'WILDBERRIES': 'platform_icons/wb.jpg',
-            'DIGISELLER': 'platform_icons/diga.png',
-            'GGSEL': 'platform_icons/ggsel.png',
-            'FUNPAY': 'platform_icons/funpay.jpg',
-            'DARKSTORE': 'platform_icons/darkstore.png',
-        }
-        
-        all_marketplaces = [choice[0] for choice in self.MARKETPLACE_CHOICES]
-        selected_marketplaces = self.get_marketplaces_list()
-        
-        marketplaces = []
-        i = 0
-        for marketplace in ['AVITO', 'TELEGRAM', 'DIFMARK', 'WILDBERRIES', 'DIGISELLER','GGSEL', 'FUNPAY', 'DARKSTORE']:
-            icon_path = MARKETPLACE_ICONS.get(marketplace)
-            icon_url = f"{icon_path}" if icon_path else ""
-            
-            # Получаем статус публикации для этой площадки
-            status = self.get_marketplace_platform_status(marketplace)
-            
-            marketplaces.append({
-                'code': all_marketplaces[i],
-                'name': dict(self.MARKETPLACE_CHOICES).get(marketplace, marketplace),
-                'is_selected': marketplace in selected_marketplaces,
-                'icon_url': icon_url,
-                'status': status  # Добавляем статус публикации
-            })
-            i += 1
-        
-        return marketplaces
+        return self.publication_matrix.rows
+
     def toggle_platform_publication(self, marketplace, platform):
-        """Переключает публикацию платформы на площадке"""
-        publications = self.get_marketplace_platforms_dict()
-        
-        if marketplace not in publications:
-            publications[marketplace] = []
-        
-        if platform in publications[marketplace]:
-            publications[marketplace].remove(platform)
-            # Если массив пустой, удаляем площадку
-            if not publications[marketplace]:
-                del publications[marketplace]
-        else:
-            publications[marketplace].append(platform)
-        
-        self.marketplace_platforms = publications
-        self.save()
-        return platform in publications.get(marketplace, [])
+        """Переключает публикацию платформы на площадке (атомарно, см. releases.publications)"""
+        from .publications import update_publications
+        release = update_publications(self.pk, [(marketplace, platform, None)])
+        self.marketplaces = release.marketplaces
+        self.marketplace_platforms = release.marketplace_platforms
+        self.row_version = release.row_version
+        self.updated_at = release.updated_at
+        self.__dict__.pop('publication_matrix', None)
+        return platform in self.get_marketplace_platforms_dict().get(marketplace, [])
 
     def get_marketplace_status(self, marketplace):
         """Возвращает статус площадки"""
         publications = self.get_marketplace_platforms_dict()
-        marketplace_platforms = publications.get(marketplace, [])
-        all_platforms = self.get_platforms_list()
-        
-        if not marketplace_platforms:
-            return 'not_published'
-        elif len(marketplace_platforms) == len(all_platforms):
-            return 'fully_published'
-        else:
-            return 'partially_published'
+        return marketplace_status(publications.get(marketplace, []), self.get_platforms_list())
 
     def get_platform_publication_status(self, marketplace, platform):
         """Возвращает статус публикации платформы на площадке"""
@@ -266,21 +432,201 @@ class GameRelease(models.Model):
         return platform in publications.get(marketplace, [])
     def get_marketplace_status_display(self, status):
         """Возвращает текстовое представление статуса"""
-        status_map = {
-            'not_published': 'Не опубликовано',
-            'partially_published': 'Частично опубликовано', 
-            'fully_published': 'Опубликовано'
-        }
-        return status_map.get(status, 'Не опубликовано')
+        return MARKETPLACE_STATUS_DISPLAY.get(status, 'Не опубликовано')
+
     def get_marketplace_platform_status(self, marketplace):
         """Возвращает статус публикации платформ на конкретной площадке"""
-        publications = self.get_marketplace_platforms_dict()
-        marketplace_platforms = publications.get(marketplace, [])
-        all_platforms = self.get_platforms_list()
-        
-        if not marketplace_platforms:
-            return 'not_published'  # Ни одной платформы не опубликовано
-        elif len(marketplace_platforms) == len(all_platforms):
-            return 'fully_published'  # Все платформы опубликованы
-        else:
-            return 'partially_published'  # Часть платформ опубликована
\ No newline at end of file
+        return self.get_marketplace_status(marketplace)
+
+
+class GameReleaseAttribute(models.Model):
+    """
+    Нормализованная копия JSON полей GameRelease (платформы, площадки, языки,
+    матрица публикаций) для фильтрации по индексу вместо LIKE по JSON тексту.
+    Источник правды - JSON поля, строки пересобираются в GameRelease.save().
+    """
+    PLATFORM = 'platform'
+    MARKETPLACE = 'marketplace'
+    LANGUAGE = 'language'
+    PUBLISHED_ON = 'published_on'  # площадка есть в marketplace_platforms
+    PUBLICATION = 'publication'  # "AVITO:PS5" - платформа опубликована на площадке
+
+    KIND_CHOICES = [
+        (PLATFORM, 'Платформа'),
+        (MARKETPLACE, 'Площадка'),
+        (LANGUAGE, 'Локализация'),
+        (PUBLISHED_ON, 'Публикации на площадке'),
+        (PUBLICATION, 'Публикация площадка:платформа'),
+    ]
+
+    SOURCE_FIELDS = ('platforms', 'marketplaces', 'languages', 'marketplace_platforms')
+
+    release = models.ForeignKey(GameRelease, on_delete=models.CASCADE, related_name='attributes')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, verbose_name='Вид')
+    code = models.CharField(max_length=40, verbose_name='Код')
+
+    class Meta:
+        verbose_name = 'Атрибут релиза'
+        verbose_name_plural = 'Атрибуты релизов'
+        constraints = [
+            models.UniqueConstraint(fields=['release', 'kind', 'code'], name='unique_release_attribute'),
+        ]
+        indexes = [
+            models.Index(fields=['kind', 'code', 'release']),
+        ]
+
+    def __str__(self):
+        return f"{self.release_id} {self.kind}={self.code}"
+
+    @classmethod
+    def sync(cls, releases):
+        """Пакетно пересобирает атрибуты для списка релизов: один SELECT, один DELETE, один INSERT"""
+        releases = [release for release in releases if release.pk]
+        if not releases:
+            return
+
+        existing = {}
+        for pk, release_id, kind, code in cls.objects.filter(
+            release__in=releases
+        ).values_list('pk', 'release_id', 'kind', 'code'):
+            existing[(release_id, kind, code)] = pk
+
+        wanted = set()
+        for release in releases:
+            for kind, code in release.get_attribute_pairs():
+                wanted.add((release.pk, kind, code))
+
+        stale = [pk for key, pk in existing.items() if key not in wanted]
+        if stale:
+            cls.objects.filter(pk__in=stale).delete()
+        missing = [
+            cls(release_id=release_id, kind=kind, code=code)
+            for release_id, kind, code in wanted if (release_id, kind, code) not in existing
+        ]
+        if missing:
+            cls.objects.bulk_create(missing, ignore_conflicts=True)
+
+
+def filter_by_attribute(queryset, kind, code):
+    """Фильтр релизов по атрибуту через индекс (kind, code, release)"""
+    return queryset.filter(
+        pk__in=GameReleaseAttribute.objects.filter(kind=kind, code=code).values('release_id')
+    )
+
+
+
+class CatalogVersion(models.Model):
+    """
+    Одна строка с номером версии каталога релизов. Номер растёт при любой
+    записи GameRelease - по нему инвалидируются кеши API во всех процессах.
+    """
+    version = models.BigIntegerField(default=0, verbose_name='Версия')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Дата изменения')
+
+    class Meta:
+        verbose_name = 'Версия каталога'
+        verbose_name_plural = 'Версия каталога'
+
+    @classmethod
+    def current(cls):
+        obj, _ = cls.objects.get_or_create(pk=1)
+        return obj
+
+    @classmethod
+    def bump(cls):
+        from django.utils import timezone
+        updated = cls.objects.filter(pk=1).update(version=F('version') + 1, updated_at=timezone.now())
+        if not updated:
+            cls.objects.get_or_create(pk=1, defaults={'version': 1})
+
+
+class GameReleaseTombstone(models.Model):
+    """Запись об удалённом релизе для ленты изменений API"""
+    release_id = models.BigIntegerField(verbose_name='ID релиза')
+    title = models.CharField(max_length=200, verbose_name='Название игры')
+    deleted_at = models.DateTimeField(auto_now_add=True, verbose_name='Дата удаления')
+
+    class Meta:
+        verbose_name = 'Удалённый релиз'
+        verbose_name_plural = 'Удалённые релизы'
+        indexes = [
+            models.Index(fields=['deleted_at', 'id']),
+        ]
+
+    def __str__(self):
+        return f"{self.title} (удалён {self.deleted_at})"
+
+
+class IngestionRun(models.Model):
+    """
+    Один прогон импорта (ingest_releases, parse_ign_releases, check_localizations):
+    время по фазам, счётчики, ошибки и пик памяти - для страницы трендов (releases.runs).
+    """
+    STATUS_RUNNING = 'running'
+    STATUS_SUCCESS = 'success'
+    STATUS_FAILED = 'failed'
+    STATUS_INTERRUPTED = 'interrupted'
+    STATUS_CHOICES = [
+        (STATUS_RUNNING, 'Выполняется'),
+        (STATUS_SUCCESS, 'Успешно'),
+        (STATUS_FAILED, 'Ошибка'),
+        (STATUS_INTERRUPTED, 'Прервано'),
+    ]
+
+    command = models.CharField(max_length=50, verbose_name='Команда')
+    sources = models.JSONField(default=list, blank=True, verbose_name='Источники')
+    status = models.CharField(max_length=12, choices=STATUS_CHOICES, default=STATUS_RUNNING, verbose_name='Статус')
+    started_at = models.DateTimeField(auto_now_add=True, verbose_name='Начало')
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name='Окончание')
+    duration = models.FloatField(null=True, blank=True, verbose_name='Длительность, с')
+    # {"fetch": 12.3, "parse": 0.4, "dedupe": 0.1, "save": 0.2, "images": 3.1}, секунды
+    phases = models.JSONField(default=dict, blank=True, verbose_name='Фазы')
+    counters = models.JSONField(default=dict, blank=True, verbose_name='Счётчики')
+    errors = models.JSONField(default=list, blank=True, verbose_name='Ошибки')
+    peak_memory_mb = models.FloatField(null=True, blank=True, verbose_name='Пик памяти, МБ')
+    created_count = models.PositiveIntegerField(default=0, verbose_name='Добавлено')
+    updated_count = models.PositiveIntegerField(default=0, verbose_name='Обновлено')
+
+    class Meta:
+        verbose_name = 'Прогон импорта'
+        verbose_name_plural = 'Прогоны импорта'
+        ordering = ['-started_at']
+        indexes = [
+            models.Index(fields=['command', 'started_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.command} {self.started_at} ({self.status})"
+
+
+class HttpCacheEntry(models.Model):
+    """
+    Последний ответ внешней страницы (DekuDeals) и результат её разбора.
+    Валидаторы ETag / Last-Modified идут в условный запрос, хеш тела позволяет
+    не разбирать страницу повторно, если она не изменилась (releases.http_cache).
+    """
+    url = models.CharField(max_length=500, unique=True, verbose_name='URL')
+    status = models.PositiveSmallIntegerField(default=200, verbose_name='HTTP статус')
+    etag = models.CharField(max_length=200, blank=True, verbose_name='ETag')
+    last_modified = models.CharField(max_length=100, blank=True, verbose_name='Last-Modified')
+    body_hash = models.CharField(max_length=64, blank=True, verbose_name='SHA-256 тела')
+    result = models.JSONField(default=list, blank=True, verbose_name='Результат разбора')
+    checked_at = models.DateTimeField(verbose_name='Дата проверки')
+
+    class Meta:
+        verbose_name = 'Кеш HTTP ответа'
+        verbose_name_plural = 'Кеш HTTP ответов'
+
+    def __str__(self):
+        return f"{self.url} ({self.status}, {self.checked_at})"
+
+
+@receiver(post_save, sender=GameRelease)
+@receiver(post_delete, sender=GameRelease)
+def bump_catalog_version(sender, **kwargs):
+    CatalogVersion.bump()
+
+
+@receiver(post_delete, sender=GameRelease)
+def create_tombstone(sender, instance, **kwargs):
+    GameReleaseTombstone.objects.create(release_id=instance.pk, title=instance.title[:200])
@@ -0,0 +1,110 @@
+"""
+Keyset-пагинация для списка релизов.
+
+Номера страниц в шаблоне остаются, но "Вперёд"/"Назад" передают курсор -
+ключ сортировки последней/первой строки текущей страницы - и следующая
+страница выбирается по индексу (WHERE key > cursor LIMIT n), без OFFSET.
+Прямой переход на номер страницы работает через OFFSET, как раньше.
+"""
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db.models import Q
+
+# sort_by из GameReleaseFilterForm -> полный порядок с уникальным хвостом id
+KEYSET_ORDERINGS = {
+    'release_date': ('release_date', 'title', 'id'),
+    '-release_date': ('-release_date', 'title', 'id'),
+    'title': ('title', 'release_date', 'id'),
+    '-title': ('-title', 'release_date', 'id'),
+}
+
+
+def encode_cursor(values):
+    raw = json.dumps([str(value) for value in values], ensure_ascii=False)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, size):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (ValueError, UnicodeDecodeError):
+        return None
+    if not isinstance(values, list) or len(values) != size:
+        return None
+    return values
+
+
+def decode_keyset_cursor(cursor, ordering, model):
+    """
+    Значения курсора, приведённые к типам полей сортировки модели.
+    None для испорченного курсора - тогда страница выбирается через OFFSET.
+    """
+    values = decode_cursor(cursor, len(ordering))
+    if values is None:
+        return None
+    try:
+        return [
+            model._meta.get_field(field.lstrip('-')).to_python(value)
+            for field, value in zip(ordering, values)
+        ]
+    except (ValidationError, TypeError, ValueError):
+        return None
+
+
+def _keyset_filter(ordering, values, forward=True):
+    """(a, b, c) > (x, y, z) с учётом направления каждого поля"""
+    condition = Q()
+    equal = Q()
+    for field, value in zip(ordering, values):
+        descending = field.startswith('-')
+        name = field.lstrip('-')
+        use_gt = descending != forward  # вперёд по убыванию = меньше
+        step = Q(**{f"{name}__{'gt' if use_gt else 'lt'}": value})
+        condition |= equal & step
+        equal &= Q(**{name: value})
+    return condition
+
+
+def _reverse(ordering):
+    return tuple(field[1:] if field.startswith('-') else '-' + field for field in ordering)
+
+
+def _row_key(obj, ordering):
+    return [getattr(obj, field.lstrip('-')) for field in ordering]
+
+
+def get_keyset_page(queryset, sort_by, page_number, per_page, count, after=None, before=None):
+    """
+    Возвращает django Page (совместимый с шаблоном) с атрибутами
+    next_cursor / previous_cursor. count передаётся снаружи, чтобы не
+    делать лишний COUNT - он уже посчитан в общем агрегате статистики.
+    """
+    ordering = KEYSET_ORDERINGS.get(sort_by, KEYSET_ORDERINGS['release_date'])
+    paginator = Paginator(queryset.order_by(*ordering), per_page)
+    paginator.count = count  # cached_property - подставляем готовое значение
+
+    try:
+        number = paginator.validate_number(page_number)
+    except PageNotAnInteger:
+        number = 1
+    except EmptyPage:
+        number = paginator.num_pages
+
+    cursor = decode_keyset_cursor(after or before, ordering, queryset.model) if (after or before) else None
+    if cursor and after:
+        rows = list(queryset.filter(_keyset_filter(ordering, cursor)).order_by(*ordering)[:per_page])
+    elif cursor and before:
+        rows = list(queryset.filter(_keyset_filter(ordering, cursor, forward=False)).order_by(*_reverse(ordering))[:per_page])
+        rows.reverse()
+    else:
+        offset = (number - 1) * per_page
+        rows = list(queryset.order_by(*ordering)[offset:offset + per_page])
+
+    page = Page(rows, number, paginator)
+    page.next_cursor = encode_cursor(_row_key(rows[-1], ordering)) if rows else ''
+    page.previous_cursor = encode_cursor(_row_key(rows[0], ordering)) if rows else ''
+    return page
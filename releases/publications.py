@@ -0,0 +1,176 @@
+"""
+Изменение матрицы публикаций (площадки и платформы на них) без потерянных обновлений.
+
+Каждое изменение - один условный UPDATE ... WHERE row_version = <прочитанная версия>
+только по колонкам marketplaces/marketplace_platforms. Если запись успели изменить,
+либо повторяем (переключатели из UI), либо отвечаем конфликтом (клиент прислал version).
+"""
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import CatalogVersion, GameRelease, GameReleaseAttribute, normalize_choice_codes
+
+# Сколько раз перечитываем запись, если клиент не прислал ожидаемую версию
+MAX_RETRIES = 3
+# Ограничение на размер пакета изменений (8 площадок x 6 платформ с запасом)
+MAX_CHANGES = 200
+
+MARKETPLACE_CODES = frozenset(code for code, _ in GameRelease.MARKETPLACE_CHOICES)
+PLATFORM_CODES = frozenset(code for code, _ in GameRelease.PLATFORM_CHOICES)
+
+UPDATE_FIELDS = ('marketplaces', 'marketplace_platforms')
+
+
+class PublicationError(Exception):
+    """Некорректный пакет изменений"""
+
+    def __init__(self, message):
+        super().__init__(message)
+        self.message = message
+
+
+class PublicationConflict(Exception):
+    """Запись изменили после того, как клиент её прочитал"""
+
+    def __init__(self, release):
+        super().__init__(f'GameRelease {release.pk} changed (version {release.row_version})')
+        self.release = release
+
+
+def parse_publication_changes(items):
+    """
+    [{"marketplace": "AVITO", "platform": "PS5", "published": true},
+     {"marketplace": "GGSEL", "selected": false}, ...] -> [(marketplace, platform|None, bool), ...]
+    """
+    if not isinstance(items, list) or not items:
+        raise PublicationError('changes must be a non-empty list')
+    if len(items) > MAX_CHANGES:
+        raise PublicationError(f'Too many changes, max {MAX_CHANGES}')
+
+    changes = []
+    for item in items:
+        if not isinstance(item, dict):
+            raise PublicationError('Each change must be an object')
+        marketplace = item.get('marketplace')
+        if marketplace not in MARKETPLACE_CODES:
+            raise PublicationError(f'Unknown marketplace: {marketplace}')
+        platform = item.get('platform')
+        if platform is None:
+            state = item.get('selected')
+        else:
+            if platform not in PLATFORM_CODES:
+                raise PublicationError(f'Unknown platform: {platform}')
+            state = item.get('published')
+        if not isinstance(state, bool):
+            raise PublicationError('published/selected must be true or false')
+        changes.append((marketplace, platform, state))
+    return changes
+
+
+def apply_changes(release, changes):
+    """
+    Новые (marketplaces, marketplace_platforms) после изменений. state=None - переключить.
+    Публикация платформы включает и саму площадку, снятие площадки снимает её публикации.
+    """
+    # По умолчанию в marketplaces лежат названия ("Avito") - пишем обратно уже коды
+    marketplaces = normalize_choice_codes(release.get_marketplaces_list(), GameRelease.MARKETPLACE_CHOICES)
+    publications = {
+        marketplace: list(platforms)
+        for marketplace, platforms in release.get_marketplace_platforms_dict().items()
+    }
+
+    for marketplace, platform, state in changes:
+        if platform is None:
+            if state is None:
+                state = marketplace not in marketplaces
+            if state and marketplace not in marketplaces:
+                marketplaces.append(marketplace)
+            elif not state and marketplace in marketplaces:
+                marketplaces.remove(marketplace)
+                publications.pop(marketplace, None)
+            continue
+
+        published = publications.setdefault(marketplace, [])
+        if state is None:
+            state = platform not in published
+        if state:
+            if platform not in published:
+                published.append(platform)
+            if marketplace not in marketplaces:
+                marketplaces.append(marketplace)
+        elif platform in published:
+            published.remove(platform)
+        if not published:
+            del publications[marketplace]
+
+    return marketplaces, publications
+
+
+def _write(release, marketplaces, publications):
+    """Условный UPDATE по версии строки; True, если запись не менялась с момента чтения"""
+    now = timezone.now()
+    updated = GameRelease.objects.filter(pk=release.pk, row_version=release.row_version).update(
+        marketplaces=marketplaces,
+        marketplace_platforms=publications,
+        row_version=F('row_version') + 1,
+        updated_at=now,
+    )
+    if not updated:
+        return False
+    release.marketplaces = marketplaces
+    release.marketplace_platforms = publications
+    release.row_version += 1
+    release.updated_at = now
+    release.__dict__.pop('publication_matrix', None)
+    return True
+
+
+def _after_write(releases):
+    # update() обходит save() и post_save - синхронизируем индекс атрибутов и версию каталога сами
+    GameReleaseAttribute.sync(releases)
+    CatalogVersion.bump()
+
+
+def update_publications(pk, changes, expected_version=None):
+    """
+    Применяет пакет изменений к одному релизу атомарно и возвращает обновлённый GameRelease.
+    С expected_version - строгая проверка (PublicationConflict), без неё - до MAX_RETRIES попыток.
+    """
+    for _ in range(MAX_RETRIES):
+        with transaction.atomic():
+            release = GameRelease.objects.select_for_update().get(pk=pk)
+            if expected_version is not None and release.row_version != expected_version:
+                raise PublicationConflict(release)
+            marketplaces, publications = apply_changes(release, changes)
+            if (marketplaces, publications) == (release.get_marketplaces_list(), release.get_marketplace_platforms_dict()):
+                return release
+            if _write(release, marketplaces, publications):
+                _after_write([release])
+                return release
+        if expected_version is not None:
+            raise PublicationConflict(GameRelease.objects.get(pk=pk))
+    raise PublicationConflict(GameRelease.objects.get(pk=pk))
+
+
+def publish_everywhere(pks):
+    """Публикует каждый релиз на всех площадках по всем его платформам одной транзакцией"""
+    marketplaces = [code for code, _ in GameRelease.MARKETPLACE_CHOICES]
+    changed = []
+    with transaction.atomic():
+        for release in GameRelease.objects.select_for_update().filter(pk__in=pks):
+            changes = [
+                (marketplace, platform, True)
+                for marketplace in marketplaces
+                for platform in release.get_platforms_list()
+            ] + [(marketplace, None, True) for marketplace in marketplaces]
+            new_marketplaces, publications = apply_changes(release, changes)
+            if (new_marketplaces, publications) == (release.get_marketplaces_list(), release.get_marketplace_platforms_dict()):
+                continue
+            # Строка заблокирована в этой транзакции, конфликт здесь означает гонку вне select_for_update (SQLite)
+            if not _write(release, new_marketplaces, publications):
+                raise PublicationConflict(release)
+            changed.append(release)
+        if changed:
+            _after_write(changed)
+    return changed
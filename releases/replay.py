@@ -0,0 +1,149 @@
+"""
+Запись и воспроизведение HTTP ответов парсеров (IGN, DekuDeals, картинки).
+
+SCRAPER_HTTP_MODE = "record" - ответы сети сохраняются в SCRAPER_FIXTURES_DIR,
+SCRAPER_HTTP_MODE = "replay" - сеть не используется, ответы берутся из каталога
+(не записанный запрос -> requests.ConnectionError).
+
+Подключается в releases.downloads.build_session, так что работает для всех, кто
+ходит в сеть через общую Session. Страницы из браузера (Selenium) в режиме record
+сохраняются снимками page_source в <каталог>/pages/ - их читают benchmark_scrapers
+и benchmark_ign_parse.
+
+Раскладка: <каталог>/http/<host>/<sha1 метода и url>.json (статус, заголовки) + .body
+"""
+import hashlib
+import json
+import re
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+MODE_RECORD = 'record'
+MODE_REPLAY = 'replay'
+
+# Заголовки, которые при воспроизведении только мешают (тело уже распаковано)
+DROP_HEADERS = ('content-encoding', 'transfer-encoding', 'content-length', 'set-cookie')
+
+PAGE_NAME_RE = re.compile(r'[^\w.-]+')
+
+
+def get_mode():
+    return getattr(settings, 'SCRAPER_HTTP_MODE', '') or ''
+
+
+def fixtures_dir():
+    return Path(getattr(settings, 'SCRAPER_FIXTURES_DIR', Path(settings.BASE_DIR) / 'scraper_fixtures'))
+
+
+def request_key(method, url):
+    """Ключ записи: метод + url с отсортированными параметрами, без фрагмента"""
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    normalized = urlunsplit((parts.scheme, parts.netloc.lower(), parts.path, query, ''))
+    return hashlib.sha1(f'{method.upper()} {normalized}'.encode()).hexdigest()
+
+
+def _paths(root, method, url):
+    host = urlsplit(url).netloc.lower() or 'local'
+    base = root / 'http' / host / request_key(method, url)
+    return base.with_suffix('.json'), base.with_suffix('.body')
+
+
+class RecordingAdapter(HTTPAdapter):
+    """Обычный HTTPAdapter, который сохраняет каждый ответ в каталог фикстур"""
+
+    def __init__(self, root, **kwargs):
+        self.root = Path(root)
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        kwargs['stream'] = False
+        response = super().send(request, **kwargs)
+        meta_path, body_path = _paths(self.root, request.method, request.url)
+        meta_path.parent.mkdir(parents=True, exist_ok=True)
+        body_path.write_bytes(response.content)
+        meta_path.write_text(json.dumps({
+            'method': request.method,
+            'url': request.url,
+            'status': response.status_code,
+            'reason': response.reason,
+            'headers': {
+                name: value for name, value in response.headers.items()
+                if name.lower() not in DROP_HEADERS
+            },
+        }, ensure_ascii=False, indent=1), encoding='utf-8')
+        return response
+
+
+class ReplayAdapter(HTTPAdapter):
+    """Отдаёт записанные ответы без сети"""
+
+    def __init__(self, root, **kwargs):
+        self.root = Path(root)
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        meta_path, body_path = _paths(self.root, request.method, request.url)
+        if not meta_path.exists():
+            raise requests.ConnectionError(f'Not recorded: {request.method} {request.url}', request=request)
+        meta = json.loads(meta_path.read_text(encoding='utf-8'))
+
+        response = requests.Response()
+        response.status_code = meta['status']
+        response.reason = meta.get('reason', '')
+        response.headers = CaseInsensitiveDict(meta.get('headers', {}))
+        response._content = body_path.read_bytes() if body_path.exists() else b''
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        return response
+
+
+def install(session, mode=None, root=None):
+    """Подменяет транспорт Session на запись/воспроизведение; без режима ничего не делает"""
+    mode = get_mode() if mode is None else mode
+    if mode not in (MODE_RECORD, MODE_REPLAY):
+        return session
+    root = fixtures_dir() if root is None else Path(root)
+    current = session.get_adapter('https://')
+    kwargs = {
+        'pool_connections': current._pool_connections,
+        'pool_maxsize': current._pool_maxsize,
+        'max_retries': current.max_retries,
+    }
+    adapter = RecordingAdapter(root, **kwargs) if mode == MODE_RECORD else ReplayAdapter(root, **kwargs)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def record_page(name, html):
+    """Снимок страницы из браузера (в режиме record)"""
+    if get_mode() != MODE_RECORD:
+        return
+    path = fixtures_dir() / 'pages' / f"{PAGE_NAME_RE.sub('_', name)}.html"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(html, encoding='utf-8')
+
+
+def recorded_bodies(root, host_contains):
+    """(url, тело) записанных ответов с хостом, содержащим host_contains"""
+    root = Path(root)
+    for meta_path in sorted((root / 'http').glob('*/*.json')):
+        if host_contains not in meta_path.parent.name:
+            continue
+        meta = json.loads(meta_path.read_text(encoding='utf-8'))
+        body_path = meta_path.with_suffix('.body')
+        if meta.get('status') == 200 and body_path.exists():
+            yield meta['url'], body_path.read_bytes()
+
+
+def recorded_pages(root, prefix=''):
+    """Снимки страниц из браузера: (имя, html)"""
+    for path in sorted((Path(root) / 'pages').glob(f'{prefix}*.html')):
+        yield path.stem, path.read_text(encoding='utf-8')
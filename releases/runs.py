@@ -0,0 +1,207 @@
+"""
+История прогонов импорта: RunRecorder пишет IngestionRun, тренды для страницы сотрудников.
+
+    with RunRecorder('ingest_releases', sources=['IGN']) as run:
+        with run.phase('fetch'):
+            ...
+        run.count('pages', 3)
+        run.finish_counts(created=10, updated=2)
+
+Пока прогон идёт, предупреждения и ошибки логгеров RUN_LOGGERS (из любых потоков)
+попадают в IngestionRun.errors - отдельно звать run.error() для них не нужно.
+"""
+import logging
+import resource
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager, nullcontext
+
+from django.utils import timezone
+
+from core.logs import record_fields
+
+from .models import IngestionRun
+
+logger = logging.getLogger(__name__)
+
+# Логгеры, чьи WARNING+ записываются в ошибки прогона
+RUN_LOGGERS = ('releases', 'core.browser_pool')
+# Больше ошибок в одном прогоне не храним - хватит для разбора, строка не раздувается
+MAX_RUN_ERRORS = 100
+ERROR_MESSAGE_LENGTH = 500
+# Хвост traceback - там место ошибки
+TRACEBACK_LENGTH = 4000
+
+
+def peak_memory_mb():
+    """Пик RSS процесса: ru_maxrss в КБ на Linux и в байтах на macOS"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def _json_value(value):
+    return value if isinstance(value, (str, int, float, bool, type(None), list, dict)) else str(value)
+
+
+def _traceback(exc_info):
+    return logging.Formatter().formatException(exc_info)[-TRACEBACK_LENGTH:]
+
+
+def phase_of(recorder, name):
+    """recorder.phase(name) или пустой контекст, если прогон не записывается"""
+    return recorder.phase(name) if recorder is not None else nullcontext()
+
+
+class _ErrorCollector(logging.Handler):
+
+    def __init__(self, recorder):
+        super().__init__(level=logging.WARNING)
+        self.recorder = recorder
+
+    def emit(self, record):
+        """Сообщение, поля из extra (источник, задача, ошибка) и traceback, если он есть"""
+        try:
+            fields = {key: _json_value(value) for key, value in record_fields(record).items()}
+            fields.update(logger=record.name, level=record.levelname)
+            if record.exc_info:
+                fields['exc'] = _traceback(record.exc_info)
+            elif record.exc_text:
+                fields['exc'] = record.exc_text[-TRACEBACK_LENGTH:]
+            self.recorder.error(record.getMessage(), **fields)
+        except Exception:
+            self.handleError(record)
+
+
+class RunRecorder:
+    """Запись одного прогона; фазы и счётчики можно пополнять из нескольких потоков"""
+
+    def __init__(self, command, sources=()):
+        self.command = command
+        self.sources = list(sources)
+        self.run = None
+        self.phases = defaultdict(float)
+        self.counters = Counter()
+        self.errors = []
+        self.created = 0
+        self.updated = 0
+        # Итоговый статус, выставленный явно (interrupt), иначе - по исключению при выходе
+        self.status = None
+        self._lock = threading.Lock()
+        self._collector = _ErrorCollector(self)
+        self._started = None
+
+    def __enter__(self):
+        self.run = IngestionRun.objects.create(command=self.command, sources=self.sources)
+        self._started = time.monotonic()
+        for name in RUN_LOGGERS:
+            logging.getLogger(name).addHandler(self._collector)
+        logger.info('Ingestion run started', extra={'run_id': self.run.pk, 'command': self.command})
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        for name in RUN_LOGGERS:
+            logging.getLogger(name).removeHandler(self._collector)
+        if exc_type is not None and issubclass(exc_type, KeyboardInterrupt):
+            self.interrupt()
+        elif exc is not None:
+            self.error(f"{exc_type.__name__}: {exc}", level='CRITICAL', exc=_traceback((exc_type, exc, tb)))
+            self.status = IngestionRun.STATUS_FAILED
+        self._save(self.status or IngestionRun.STATUS_SUCCESS)
+        return False
+
+    def interrupt(self):
+        """Прогон остановлен оператором (Ctrl+C) - сохранится со статусом interrupted"""
+        self.status = IngestionRun.STATUS_INTERRUPTED
+
+    @contextmanager
+    def phase(self, name):
+        """Время фазы; повторные входы (и из разных потоков) суммируются"""
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.monotonic() - started)
+
+    def add_time(self, name, seconds):
+        with self._lock:
+            self.phases[name] += seconds
+
+    def count(self, key, value=1):
+        with self._lock:
+            self.counters[key] += value
+
+    def update_counters(self, counters, prefix=''):
+        with self._lock:
+            for key, value in counters.items():
+                self.counters[f"{prefix}{key}"] += value
+
+    def error(self, message, **fields):
+        with self._lock:
+            self.counters['errors'] += 1
+            if len(self.errors) < MAX_RUN_ERRORS:
+                self.errors.append({'message': str(message)[:ERROR_MESSAGE_LENGTH], **fields})
+
+    def finish_counts(self, created=0, updated=0):
+        self.created, self.updated = created, updated
+
+    def _save(self, status):
+        duration = time.monotonic() - self._started
+        run = self.run
+        run.status = status
+        run.finished_at = timezone.now()
+        run.duration = round(duration, 3)
+        run.phases = {name: round(seconds, 3) for name, seconds in self.phases.items()}
+        run.counters = dict(self.counters)
+        run.errors = self.errors
+        run.peak_memory_mb = peak_memory_mb()
+        run.created_count = self.created
+        run.updated_count = self.updated
+        run.save()
+        logger.info('Ingestion run finished', extra={
+            'run_id': run.pk,
+            'command': self.command,
+            'status': status,
+            'duration': run.duration,
+            'created_count': run.created_count,
+            'updated_count': run.updated_count,
+            'errors': len(self.errors),
+            'peak_memory_mb': run.peak_memory_mb,
+            **{f"phase_{name}": seconds for name, seconds in run.phases.items()},
+        })
+
+
+def run_trends(limit=100, command=None):
+    """
+    Последние прогоны от старых к новым с долями для графиков:
+    длительность и выход (добавлено + обновлено) относительно максимума выборки.
+    """
+    runs = IngestionRun.objects.all()
+    if command:
+        runs = runs.filter(command=command)
+    runs = list(runs.order_by('-started_at')[:limit])[::-1]
+    max_duration = max((run.duration or 0 for run in runs), default=0) or 1
+    max_yield = max((run.created_count + run.updated_count for run in runs), default=0) or 1
+    rows = []
+    for run in runs:
+        run_yield = run.created_count + run.updated_count
+        rows.append({
+            'id': run.pk,
+            'command': run.command,
+            'sources': run.sources,
+            'status': run.status,
+            'started_at': run.started_at.isoformat(),
+            'duration': run.duration,
+            'phases': run.phases,
+            'counters': run.counters,
+            'errors': len(run.errors),
+            'peak_memory_mb': run.peak_memory_mb,
+            'created': run.created_count,
+            'updated': run.updated_count,
+            'yield': run_yield,
+            # Высота столбиков в процентах
+            'duration_pct': round(100 * (run.duration or 0) / max_duration, 1),
+            'yield_pct': round(100 * run_yield / max_yield, 1),
+        })
+    return rows
@@ -0,0 +1,270 @@
+document.addEventListener('DOMContentLoaded', function() {
+    // Модальное окно
+    const modal = document.getElementById('gameModal');
+    const closeBtn = document.querySelector('.close');
+    const modalBody = document.getElementById('modalBody');
+    
+    // Открытие модального окна
+    document.querySelectorAll('.view-game').forEach(button => {
+        button.addEventListener('click', function() {
+            const gameId = this.getAttribute('data-game-id');
+            loadGameDetails(gameId);
+        });
+    });
+    
+    // Закрытие модального окна
+    closeBtn.addEventListener('click', function() {
+        modal.style.display = 'none';
+    });
+    
+    window.addEventListener('click', function(event) {
+        if (event.target === modal) {
+            modal.style.display = 'none';
+        }
+    });
+    
+    // Загрузка данных игры через AJAX
+    function loadGameDetails(gameId) {
+        fetch(`/releases/game/${gameId}/modal/`)
+            .then(response => response.text())
+            .then(html => {
+                modalBody.innerHTML = html;
+                modal.style.display = 'block';
+            })
+            .catch(error => {
+                console.error('Error:', error);
+                modalBody.innerHTML = '<p>Ошибка загрузки данных</p>';
+                modal.style.display = 'block';
+            });
+    }
+});
+
+// Функция для переключения площадки
+function toggleMarketplace(gameId, marketplace, element) {
+    const formData = new FormData();
+    formData.append('marketplace', marketplace);
+    
+    fetch(`/releases/game/${gameId}/toggle-marketplace/`, {
+        method: 'POST',
+        body: formData,
+        headers: {
+            'X-CSRFToken': getCookie('csrftoken'),
+        }
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            // Обновляем визуальное состояние
+            if (data.is_selected) {
+                element.classList.remove('not-selected');
+                element.classList.add('selected');
+                element.querySelector('div:last-child div:last-child').textContent = '✅ Активна';
+            } else {
+                element.classList.remove('selected');
+                element.classList.add('not-selected');
+                element.querySelector('div:last-child div:last-child').textContent = '❌ Не активна';
+            }
+            
+            // Перезагружаем модальное окно
+            setTimeout(() => {
+                // Находим модальное окно и перезагружаем его содержимое
+                const modalBody = document.getElementById('modalBody');
+                if (modalBody) {
+                    fetch(`/releases/game/${gameId}/modal/`)
+                        .then(response => response.text())
+                        .then(html => {
+                            modalBody.innerHTML = html;
+                        })
+                        .catch(error => {
+                            console.error('Error:', error);
+                        });
+                }
+            }, 300);
+            
+        } else {
+            alert('Ошибка обновления площадки');
+        }
+    })
+    .catch(error => {
+        console.error('Error:', error);
+        alert('Ошибка сети');
+    });
+}
+
+// Функция для переключения статуса публикации без перезагрузки
+// Функция для переключения статуса публикации без перезагрузки
+function togglePublishStatus(form) {
+    const button = form.querySelector('button');
+    const isCurrentlyPublished = button.classList.contains('published');
+    const gameRow = form.closest('tr'); // Находим строку игры
+    const statusBadge = gameRow.querySelector('.status-badge'); // Находим бейдж статуса
+
+    // Меняем статус сразу визуально
+    if (isCurrentlyPublished) {
+        // Переключаем на "скрыто"
+        button.classList.remove('published');
+        button.classList.add('not-published');
+        button.innerHTML = '🙈';
+        
+        // Обновляем строку
+        gameRow.classList.add('unpublished-row');
+        
+        // Обновляем статус бейдж
+        statusBadge.classList.remove('status-published');
+        statusBadge.classList.add('status-unpublished');
+        statusBadge.innerHTML = '❌ Скрыто';
+        
+        // Обновляем кнопку редактирования
+        const editButton = gameRow.querySelector('.view-game');
+        if (editButton) {
+            editButton.replaceWith(createDisabledEditButton());
+        }
+        
+    } else {
+        // Переключаем на "опубликовано"
+        button.classList.remove('not-published');
+        button.classList.add('published');
+        button.innerHTML = '👁️';
+        
+        // Обновляем строку
+        gameRow.classList.remove('unpublished-row');
+        
+        // Обновляем статус бейдж
+        statusBadge.classList.remove('status-unpublished');
+        statusBadge.classList.add('status-published');
+        statusBadge.innerHTML = '✅ Активно';
+        
+        // Восстанавливаем кнопку редактирования
+        const disabledButton = gameRow.querySelector('.btn.disabled');
+        if (disabledButton) {
+            disabledButton.replaceWith(createEditButton(button.getAttribute('data-game-id')));
+        }
+    }
+
+    // Отправляем AJAX запрос
+    fetch(form.action, {
+        method: 'POST',
+        body: new FormData(form),
+        headers: {
+            'X-CSRFToken': form.querySelector('[name=csrfmiddlewaretoken]').value,
+        }
+    })
+    .then(response => {
+        if (!response.ok) {
+            throw new Error('Network error');
+        }
+        return response.json();
+    })
+    .then(data => {
+        if (data.success) {
+            console.log('Статус публикации обновлен');
+            
+            // Дополнительное обновление если нужно
+            updateGameCardVisuals(gameRow, !isCurrentlyPublished);
+        } else {
+            throw new Error('Server error');
+        }
+    })
+    .catch(error => {
+        console.error('Error:', error);
+        // Возвращаем предыдущее состояние при ошибке
+        revertPublishStatus(button, gameRow, statusBadge, isCurrentlyPublished);
+        alert('Ошибка обновления статуса');
+    });
+}
+
+// Функция для создания отключенной кнопки редактирования
+function createDisabledEditButton() {
+    const span = document.createElement('span');
+    span.className = 'btn btn-sm btn-secondary disabled';
+    span.title = 'Редактирование недоступно для скрытых игр';
+    span.textContent = '✏️';
+    return span;
+}
+
+// Функция для создания активной кнопки редактирования
+function createEditButton(gameId) {
+    const button = document.createElement('button');
+    button.className = 'btn btn-sm btn-primary view-game';
+    button.setAttribute('data-game-id', gameId);
+    button.title = 'Просмотр';
+    button.textContent = '✏️';
+    
+    // Добавляем обработчик события
+    button.addEventListener('click', function() {
+        const gameId = this.getAttribute('data-game-id');
+        loadGameDetails(gameId);
+    });
+    
+    return button;
+}
+
+// Функция для отката изменений при ошибке
+function revertPublishStatus(button, gameRow, statusBadge, wasPublished) {
+    if (wasPublished) {
+        button.classList.remove('not-published');
+        button.classList.add('published');
+        button.innerHTML = '👁️';
+        gameRow.classList.remove('unpublished-row');
+        statusBadge.classList.remove('status-unpublished');
+        statusBadge.classList.add('status-published');
+        statusBadge.innerHTML = '✅ Активно';
+    } else {
+        button.classList.remove('published');
+        button.classList.add('not-published');
+        button.innerHTML = '🙈';
+        gameRow.classList.add('unpublished-row');
+        statusBadge.classList.remove('status-published');
+        statusBadge.classList.add('status-unpublished');
+        statusBadge.innerHTML = '❌ Скрыто';
+    }
+}
+
+// Дополнительная функция для обновления визуальных элементов
+function updateGameCardVisuals(gameRow, isNowPublished) {
+    // Обновляем иконку игры
+    const gameIcon = gameRow.querySelector('img');
+    if (gameIcon) {
+        if (isNowPublished) {
+            gameIcon.style.filter = 'none';
+        } else {
+            gameIcon.style.filter = 'grayscale(100%) opacity(0.7)';
+        }
+    }
+    
+    // Обновляем заголовок игры
+    const gameTitle = gameRow.querySelector('strong');
+    if (gameTitle) {
+        if (isNowPublished) {
+            gameTitle.style.color = '';
+        } else {
+            gameTitle.style.color = '#6b7280';
+        }
+    }
+    
+    // Обновляем теги платформ и площадок
+    const tags = gameRow.querySelectorAll('.platform-tag, .marketplace-tag, .language-tag');
+    tags.forEach(tag => {
+        if (isNowPublished) {
+            tag.classList.remove('unpublished');
+        } else {
+            tag.classList.add('unpublished');
+        }
+    });
+}
+
+// Функция для получения CSRF токена
+function getCookie(name) {
+    let cookieValue = null;
+    if (document.cookie && document.cookie !== '') {
+        const cookies = document.cookie.split(';');
+        for (let i = 0; i < cookies.length; i++) {
+            const cookie = cookies[i].trim();
+            if (cookie.substring(0, name.length + 1) === (name + '=')) {
+                cookieValue = decodeURIComponent(cookie.substring(name.length + 1));
+                break;
+            }
+        }
+    }
+    return cookieValue;
+}
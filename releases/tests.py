@@ -1,3 +1,714 @@
-from django.test import TestCase
+import base64
+import io
+import json
+import logging
+import os
+import tempfile
+from datetime import date, timedelta
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.management import CommandError, call_command
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from PIL import Image
+
+from core.storage import ContentAddressedStorage, collect_garbage
+
+from . import http_cache
+from .analytics import compute_release_stats
+from .dekudeals import dekudeals_url, lookup_languages
+from .ign_http import IGNHttpReleaseParser
+from .ign_parser import IGNReleaseParser, IGNSource, month_workers
+from .images import ICON_BACKGROUND, render_icon_variants
+from .ingestion import IngestionPipeline
+from .ign_pages import parse_tiles, parse_upcoming_page
+from .models import (
+    GameRelease, GameReleaseAttribute, GameReleaseTombstone, HttpCacheEntry, IngestionRun, filter_by_attribute,
+    normalize_title,
+)
+from .publications import PublicationConflict, update_publications
+from .pagination import KEYSET_ORDERINGS, decode_keyset_cursor, encode_cursor
+from .runs import RunRecorder
+
+
+API_KEY = 'vvgahbjcgt4uhcJWfwehirjfbkygh23457JKWER'
+RELEASES_API_URL = '/releases/api/game-releases/'
+CHANGES_API_URL = '/releases/api/game-releases/changes/'
+
+# Сохранённые страницы IGN для разбора без сети
+TEST_PAGES = Path(__file__).resolve().parent / 'test_pages'
+
+# Шаблоны в тестах рендерятся без collectstatic - манифест статики не нужен
+TEST_STORAGES = {
+    **settings.STORAGES,
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+
+def _page(name):
+    return (TEST_PAGES / name).read_text(encoding='utf-8')
+
+
+def _raw_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip('=')
+
+
+@override_settings(STORAGES=TEST_STORAGES)
+class KeysetCursorTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user('viewer', 'viewer@example.com', 'password')
+        for day in range(1, 6):
+            GameRelease.objects.create(title=f'Game {day}', release_date=date(2026, 11, day), platforms=['PS5'])
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_cursor_values_are_converted_to_field_types(self):
+        ordering = KEYSET_ORDERINGS['release_date']
+        cursor = encode_cursor([date(2026, 11, 2), 'Game 2', 7])
+        self.assertEqual(decode_keyset_cursor(cursor, ordering, GameRelease), [date(2026, 11, 2), 'Game 2', 7])
+
+    def test_tampered_cursor_is_rejected(self):
+        ordering = KEYSET_ORDERINGS['release_date']
+        for values in (['x', 'y', 'z'], [None, [1], {}], ['2026-11-02', 'Game 2']):
+            self.assertIsNone(decode_keyset_cursor(_raw_cursor(values), ordering, GameRelease))
+
+    def test_tampered_cursor_falls_back_to_offset_paging(self):
+        for param in ('after', 'before'):
+            response = self.client.get('/releases/', {param: _raw_cursor(['x', 'y', 'z']), 'page': 1})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual([game.title for game in response.context['games']][:1], ['Game 1'])
+
+    def test_after_cursor_continues_from_key(self):
+        game = GameRelease.objects.get(title='Game 2')
+        cursor = encode_cursor([game.release_date, game.title, game.pk])
+        response = self.client.get('/releases/', {'after': cursor, 'page': 1})
+        self.assertEqual([game.title for game in response.context['games']], ['Game 3', 'Game 4', 'Game 5'])
+
+
+class ReleaseStatsTests(TestCase):
+
+    def test_marketplace_status_counts(self):
+        GameRelease.objects.create(
+            title='Full', release_date=date(2026, 11, 1), platforms=['PS5', 'SWITCH'],
+            marketplace_platforms={'AVITO': ['PS5', 'SWITCH'], 'GGSEL': ['PS5']},
+        )
+        GameRelease.objects.create(
+            title='Partial', release_date=date(2026, 11, 2), platforms=['PS5', 'SWITCH'],
+            marketplace_platforms={'AVITO': ['SWITCH']},
+        )
+        GameRelease.objects.create(title='None', release_date=date(2026, 11, 3), platforms=['PS5'])
+
+        status = compute_release_stats()['marketplace_status']
+        self.assertEqual(
+            (status['AVITO']['fully_published'], status['AVITO']['partially_published'], status['AVITO']['not_published']),
+            (1, 1, 1),
+        )
+        self.assertEqual(
+            (status['GGSEL']['fully_published'], status['GGSEL']['partially_published'], status['GGSEL']['not_published']),
+            (0, 1, 2),
+        )
+        self.assertEqual(status['FUNPAY']['fully_published'] + status['FUNPAY']['partially_published'], 0)
+
+    def test_empty_publication_list_counts_as_not_published(self):
+        GameRelease.objects.create(
+            title='Empty', release_date=date(2026, 11, 1), platforms=['PS5'], marketplace_platforms={'AVITO': []},
+        )
+        GameRelease.objects.create(
+            title='Full', release_date=date(2026, 11, 2), platforms=['PS5'], marketplace_platforms={'AVITO': ['PS5']},
+        )
+        stats = compute_release_stats()
+        for code, status in stats['marketplace_status'].items():
+            with self.subTest(code):
+                self.assertEqual(
+                    status['fully_published'] + status['partially_published'] + status['not_published'],
+                    stats['total_games'],
+                )
+        self.assertEqual(stats['marketplace_status']['AVITO']['not_published'], 1)
+
+    def test_marketplace_statuses_in_one_query(self):
+        GameRelease.objects.create(
+            title='Full', release_date=date(2026, 11, 2), platforms=['PS5'], marketplace_platforms={'AVITO': ['PS5']},
+        )
+        with self.assertNumQueries(4):
+            compute_release_stats()
+
+
+class IGNPageParsingTests(TestCase):
+
+    def test_next_data_page(self):
+        games = parse_upcoming_page(_page('ign_upcoming_next_data.html'))
+        self.assertEqual([game['title'] for game in games], ['Alpha Quest', 'Bravo Racing', 'Delta Saga'])
+        alpha = games[0]
+        # Первое вхождение повторённой игры - с картинкой и всеми платформами
+        self.assertEqual(alpha['release_date'], date(2026, 11, 3))
+        self.assertEqual(alpha['platforms'], ['PS5', 'SWITCH2'])
+        self.assertEqual(alpha['url'], 'https://www.ign.com/games/alpha-quest')
+        self.assertEqual(alpha['image_url'], 'https://assets-prd.ignimgs.com/alpha-quest.jpg')
+        self.assertEqual(games[2]['release_date'], date(2027, 3, 1))
+        self.assertEqual(games[2]['platforms'], ['XBOX_SERIES'])
+
+    def test_tiles_page(self):
+        games = parse_tiles(_page('ign_upcoming_tiles.html'))
+        self.assertEqual([game['title'] for game in games], ['Echo Tactics', 'Foxtrot Run', 'Golf Game Review'])
+        echo, foxtrot, _ = games
+        self.assertEqual(echo['release_date'], date(2026, 11, 5))
+        self.assertEqual(echo['platforms'], ['PS4', 'SWITCH'])
+        self.assertEqual(echo['image_url'], 'https://assets-prd.ignimgs.com/echo-tactics.jpg')
+        # Плитка без подписи и блока даты: название - первая строка, дата - из текста
+        self.assertEqual(foxtrot['release_date'], date(2026, 11, 7))
+        self.assertNotIn('image_url', foxtrot)
+
+    def test_page_without_next_data_falls_back_to_tiles(self):
+        self.assertEqual(parse_upcoming_page(_page('ign_upcoming_tiles.html')), parse_tiles(_page('ign_upcoming_tiles.html')))
+
+    def test_empty_page(self):
+        self.assertEqual(parse_upcoming_page(''), [])
+
+    def _parser(self):
+        parser = IGNHttpReleaseParser()
+        self.addCleanup(parser.http.close)
+        parser.today = date(2026, 11, 1)
+        parser.max_date = date(2026, 11, 19)
+        return parser
+
+    def test_parse_html_filters_dates_and_platforms(self):
+        parser = self._parser()
+        games = parser.parse_html(_page('ign_upcoming_next_data.html'))
+        self.assertEqual([game['title'] for game in games], ['Alpha Quest'])
+        self.assertEqual(parser.stats['game_links_found'], 3)
+        self.assertEqual(parser.stats['games_parsed'], 1)
+        self.assertEqual(parser.stats['invalid_platform_skipped'], 1)
+        self.assertEqual(parser.stats['too_far_skipped'], 1)
+
+    def test_parse_html_drops_non_game_titles(self):
+        parser = self._parser()
+        games = parser.parse_html(_page('ign_upcoming_tiles.html'))
+        # Foxtrot Run - без платформ, Golf Game Review - статья по словам в названии
+        self.assertEqual([game['title'] for game in games], ['Echo Tactics'])
+        self.assertEqual(parser.stats['invalid_platform_skipped'], 2)
+
+
+class ReleasesApiCacheTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.game = GameRelease.objects.create(
+            title='Cached Game', release_date=date(2026, 11, 5), platforms=['PS5'], is_published=True,
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def _get(self, **headers):
+        params = {'date_from': '2026-11-01', 'date_to': '2026-11-30', **headers.pop('params', {})}
+        return self.client.get(RELEASES_API_URL, params, headers={'X-API-Key': API_KEY, **headers})
+
+    def test_etag_and_if_none_match(self):
+        response = self._get()
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['ETag'].startswith('"'))
+        self.assertIn('Last-Modified', response)
+
+        not_modified = self._get(**{'If-None-Match': response['ETag']})
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified['ETag'], response['ETag'])
+        # Слабый ETag после GZip-мидлвари тоже совпадает
+        self.assertEqual(self._get(**{'If-None-Match': f"W/{response['ETag']}"}).status_code, 304)
+        self.assertEqual(self._get(**{'If-None-Match': '"other"'}).status_code, 200)
+
+    def test_if_modified_since(self):
+        response = self._get()
+        self.assertEqual(self._get(**{'If-Modified-Since': response['Last-Modified']}).status_code, 304)
+
+    def test_body_is_served_from_cache(self):
+        first = self._get()
+        with mock.patch('releases.views.filter_releases') as filter_releases:
+            second = self._get()
+        filter_releases.assert_not_called()
+        self.assertEqual(first.content, second.content)
+
+    def test_write_invalidates_cache(self):
+        first = self._get()
+        self.game.title = 'Renamed Game'
+        self.game.save()
+
+        second = self._get(**{'If-None-Match': first['ETag']})
+        self.assertEqual(second.status_code, 200)
+        self.assertNotEqual(second['ETag'], first['ETag'])
+        self.assertEqual([row['title'] for row in second.json()['data']], ['Renamed Game'])
+
+    def test_fields_projection(self):
+        response = self._get(params={'fields': 'id,title,release_date'})
+        self.assertEqual(response.json()['data'], [{'id': self.game.pk, 'title': 'Cached Game', 'release_date': '2026-11-05'}])
+        # Разный набор полей - разные записи кеша и ETag
+        self.assertNotEqual(response['ETag'], self._get()['ETag'])
+
+    def test_unknown_field_is_rejected(self):
+        response = self._get(params={'fields': 'id,password'})
+        self.assertEqual(response.status_code, 400)
+
+
+# Изменения отдаются сразу, без паузы на незакоммиченные записи
+@mock.patch('releases.api.CHANGES_SETTLE_SECONDS', 0)
+class ChangeFeedTests(TestCase):
+
+    def setUp(self):
+        self.games = [
+            GameRelease.objects.create(title=f'Feed {i}', release_date=date(2026, 11, i + 1), platforms=['PS5'])
+            for i in range(5)
+        ]
+
+    def _changes(self, **params):
+        response = self.client.get(CHANGES_API_URL, params, headers={'X-API-Key': API_KEY})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def _sync(self, cursor='', limit=2):
+        """Проходит ленту страницами до конца: (изменения, последний курсор)"""
+        changes = []
+        while True:
+            page = self._changes(cursor=cursor, limit=limit)
+            changes += page['changes']
+            cursor = page['next_cursor']
+            if not page['has_more']:
+                return changes, cursor
+
+    def test_pages_cover_every_change_once(self):
+        changes, _ = self._sync()
+        self.assertEqual([change['id'] for change in changes], [game.pk for game in self.games])
+        self.assertTrue(all(change['op'] == 'upsert' for change in changes))
+
+    def test_only_changes_after_cursor(self):
+        _, cursor = self._sync()
+        self.games[1].title = 'Feed 1 renamed'
+        self.games[1].save()
+
+        page = self._changes(cursor=cursor)
+        self.assertEqual([(change['op'], change['id']) for change in page['changes']], [('upsert', self.games[1].pk)])
+        self.assertEqual(page['changes'][0]['data']['title'], 'Feed 1 renamed')
+        # Пустая страница не теряет позицию
+        empty = self._changes(cursor=page['next_cursor'])
+        self.assertEqual(empty['changes'], [])
+        self.assertEqual(empty['next_cursor'], page['next_cursor'])
+
+    def test_delete_leaves_tombstone(self):
+        _, cursor = self._sync()
+        deleted_pk = self.games[2].pk
+        self.games[2].delete()
+
+        self.assertTrue(GameReleaseTombstone.objects.filter(release_id=deleted_pk).exists())
+        page = self._changes(cursor=cursor)
+        self.assertEqual([(change['op'], change['id']) for change in page['changes']], [('delete', deleted_pk)])
+
+    def test_fields_projection(self):
+        page = self._changes(limit=1, fields='id,title')
+        self.assertEqual(page['changes'][0]['data'], {'id': self.games[0].pk, 'title': 'Feed 0'})
+
+    def test_invalid_cursor(self):
+        response = self.client.get(CHANGES_API_URL, {'cursor': _raw_cursor(['x', 'y', 'z'])}, headers={'X-API-Key': API_KEY})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['code'], 'INVALID_CURSOR')
+
+
+class PublicationBatchTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user('operator', 'operator@example.com', 'password')
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        self.game = GameRelease.objects.create(title='Batch Game', release_date=date(2026, 11, 5), platforms=['PS5', 'SWITCH'])
+
+    def _post(self, url, payload):
+        return self.client.post(url, json.dumps(payload), content_type='application/json')
+
+    def _publish(self, version, changes):
+        return self._post(f'/releases/game/{self.game.pk}/publications/', {'version': version, 'changes': changes})
+
+    def _published(self, marketplace):
+        row = next(row for row in self.game.publication_matrix.as_json() if row['code'] == marketplace)
+        return [platform['code'] for platform in row['platforms'] if platform['is_published']]
+
+    def test_batch_applies_changes_and_bumps_version(self):
+        version = self.game.row_version
+        response = self._publish(version, [
+            {'marketplace': 'AVITO', 'platform': 'PS5', 'published': True},
+            {'marketplace': 'AVITO', 'platform': 'SWITCH', 'published': True},
+            {'marketplace': 'GGSEL', 'selected': True},
+        ])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['version'], version + 1)
+        avito = next(row for row in response.json()['matrix'] if row['code'] == 'AVITO')
+        self.assertEqual(avito['status'], 'fully_published')
+
+        self.game.refresh_from_db()
+        self.assertEqual(self.game.row_version, version + 1)
+        self.assertEqual(sorted(self.game.get_marketplace_platforms_dict()['AVITO']), ['PS5', 'SWITCH'])
+        self.assertIn('GGSEL', self.game.get_marketplaces_list())
+        # Индекс атрибутов обновлён, хотя save() не вызывался
+        published = filter_by_attribute(GameRelease.objects.all(), GameReleaseAttribute.PUBLICATION, 'AVITO:PS5')
+        self.assertEqual(list(published), [self.game])
+
+    def test_stale_version_is_conflict(self):
+        version = self.game.row_version
+        self.assertEqual(self._publish(version, [{'marketplace': 'AVITO', 'platform': 'PS5', 'published': True}]).status_code, 200)
+
+        # Второй оператор прочитал запись до первого изменения
+        response = self._publish(version, [{'marketplace': 'AVITO', 'platform': 'PS5', 'published': False}])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['version'], version + 1)
+        self.game.refresh_from_db()
+        self.assertEqual(self._published('AVITO'), ['PS5'])
+
+    def test_toggles_without_version_do_not_lose_updates(self):
+        update_publications(self.game.pk, [('AVITO', 'PS5', None)])
+        update_publications(self.game.pk, [('DIFMARK', 'SWITCH', None)])
+        self.game.refresh_from_db()
+        self.assertEqual(self._published('AVITO'), ['PS5'])
+        self.assertEqual(self._published('DIFMARK'), ['SWITCH'])
+
+        with self.assertRaises(PublicationConflict):
+            update_publications(self.game.pk, [('AVITO', 'PS5', False)], expected_version=self.game.row_version - 1)
+
+    def test_invalid_batch(self):
+        for changes in ([], [{'marketplace': 'NOPE', 'selected': True}], [{'marketplace': 'AVITO', 'platform': 'PS5'}]):
+            self.assertEqual(self._publish(self.game.row_version, changes).status_code, 400)
+
+    def test_publish_everywhere(self):
+        other = GameRelease.objects.create(title='Other Game', release_date=date(2026, 11, 6), platforms=['PS4'])
+        response = self._post('/releases/publish-everywhere/', {'ids': [self.game.pk, other.pk]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.json()['updated']), {str(self.game.pk), str(other.pk)})
+
+        for game in (self.game, other):
+            game.refresh_from_db()
+            self.assertTrue(all(row['status'] == 'fully_published' for row in game.publication_matrix.as_json()))
+
+
+LANGUAGES_PAGE = b'<div><div><ul><li>Languages: English, Russian</li></ul></div></div>'
+
+
+def _response(status, content=b'', headers=None):
+    return mock.Mock(status_code=status, content=content, headers=headers or {})
+
+
+class HttpCacheTests(TestCase):
+
+    def test_ttl_depends_on_release_age(self):
+        today = date(2026, 11, 1)
+        self.assertEqual(http_cache.ttl_for_release(today + timedelta(days=10), today), timedelta(days=1))
+        self.assertEqual(http_cache.ttl_for_release(today - timedelta(days=100), today), timedelta(days=7))
+        self.assertEqual(http_cache.ttl_for_release(today - timedelta(days=800), today), http_cache.TTL_DEFAULT)
+        self.assertEqual(http_cache.ttl_for_release(None, today), http_cache.TTL_DEFAULT)
+
+    def test_freshness(self):
+        now = timezone.now()
+        entry = HttpCacheEntry(url='https://example.com/a', checked_at=now - timedelta(hours=2))
+        self.assertTrue(http_cache.is_fresh(entry, timedelta(days=1), now))
+        self.assertFalse(http_cache.is_fresh(entry, timedelta(hours=1), now))
+        self.assertFalse(http_cache.is_fresh(None, timedelta(days=1), now))
+
+    def test_first_response_is_parsed_and_cached(self):
+        parse = mock.Mock(return_value=['ENGLISH'])
+        result, outcome, entry = http_cache.revalidate(
+            'https://example.com/a', None, _response(200, b'body', {'ETag': '"v1"', 'Last-Modified': 'Sun, 01 Nov 2026 00:00:00 GMT'}), parse,
+        )
+        self.assertEqual((result, outcome), (['ENGLISH'], http_cache.PARSED))
+        parse.assert_called_once_with(b'body')
+        self.assertEqual(http_cache.conditional_headers(entry), {
+            'If-None-Match': '"v1"', 'If-Modified-Since': 'Sun, 01 Nov 2026 00:00:00 GMT',
+        })
+
+    def test_not_modified_and_unchanged_skip_parsing(self):
+        _, _, entry = http_cache.revalidate('https://example.com/a', None, _response(200, b'body'), lambda content: ['RUSSIAN'])
+        parse = mock.Mock()
+
+        result, outcome, _ = http_cache.revalidate(entry.url, entry, _response(304), parse)
+        self.assertEqual((result, outcome), (['RUSSIAN'], http_cache.NOT_MODIFIED))
+        result, outcome, _ = http_cache.revalidate(entry.url, entry, _response(200, b'body'), parse)
+        self.assertEqual((result, outcome), (['RUSSIAN'], http_cache.UNCHANGED))
+        parse.assert_not_called()
+
+        parse.return_value = ['ENGLISH']
+        result, outcome, _ = http_cache.revalidate(entry.url, entry, _response(200, b'new body'), parse)
+        self.assertEqual((result, outcome), (['ENGLISH'], http_cache.PARSED))
+
+    def test_error_statuses(self):
+        result, outcome, entry = http_cache.revalidate('https://example.com/a', None, _response(503), mock.Mock())
+        self.assertEqual((result, outcome, entry), ([], http_cache.UNCACHED, None))
+
+        _, outcome, entry = http_cache.revalidate('https://example.com/a', None, _response(404), mock.Mock())
+        self.assertEqual((outcome, entry.status), (http_cache.PARSED, 404))
+        # Для «страницы нет» условных заголовков не шлём
+        self.assertEqual(http_cache.conditional_headers(entry), {})
+        _, outcome, _ = http_cache.revalidate(entry.url, entry, _response(404), mock.Mock())
+        self.assertEqual(outcome, http_cache.UNCHANGED)
+
+    def test_save_and_load_upsert(self):
+        _, _, entry = http_cache.revalidate('https://example.com/a', None, _response(200, b'one'), lambda content: ['ENGLISH'])
+        http_cache.save_entries([entry])
+        _, _, entry = http_cache.revalidate(entry.url, None, _response(200, b'two'), lambda content: ['RUSSIAN'])
+        http_cache.save_entries([entry])
+
+        entries = http_cache.load_entries(['https://example.com/a', 'https://example.com/missing'])
+        self.assertEqual(list(entries), ['https://example.com/a'])
+        self.assertEqual(entries['https://example.com/a'].result, ['RUSSIAN'])
+        self.assertEqual(HttpCacheEntry.objects.count(), 1)
+
+    def test_lookup_sends_conditional_request(self):
+        url = dekudeals_url('Some Game')
+        entry = HttpCacheEntry(
+            url=url, status=200, etag='"v1"', body_hash=http_cache.body_hash(LANGUAGES_PAGE),
+            result=['RUSSIAN'], checked_at=timezone.now() - timedelta(days=30),
+        )
+        http = mock.Mock()
+        http.get.return_value = _response(304)
+        limiter = mock.Mock()
+
+        languages, outcome, saved = lookup_languages(http, limiter, 'Some Game', entry)
+        self.assertEqual((languages, outcome), (['RUSSIAN'], http_cache.NOT_MODIFIED))
+        self.assertIs(saved, entry)
+        limiter.wait.assert_called_once_with(url)
+        self.assertEqual(http.get.call_args.kwargs['headers']['If-None-Match'], '"v1"')
+
+        http.get.return_value = _response(200, LANGUAGES_PAGE)
+        languages, outcome, _ = lookup_languages(http, limiter, 'Some Game', None)
+        self.assertEqual((sorted(languages), outcome), (['ENGLISH', 'RUSSIAN'], http_cache.PARSED))
+
+
+class NormalizedTitleTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'password')
+
+    def setUp(self):
+        self.original = GameRelease.objects.create(title='Duplicate Game', release_date=date(2026, 11, 1), platforms=['PS5'])
+        # Старый дубль, которому backfill_normalized_titles оставил NULL
+        self.duplicate = GameRelease.objects.create(title='Duplicate Game (copy)', release_date=date(2026, 11, 2), platforms=['PS5'])
+        GameRelease.objects.filter(pk=self.duplicate.pk).update(title='duplicate game', normalized_title=None)
+
+    def test_saving_legacy_duplicate_keeps_null_key(self):
+        game = GameRelease.objects.get(pk=self.duplicate.pk)
+        game.is_published = True
+        game.save()
+        game.refresh_from_db()
+        self.assertIsNone(game.normalized_title)
+        self.assertTrue(game.is_published)
+
+    def test_toggle_publish_on_legacy_duplicate(self):
+        self.client.force_login(self.admin)
+        response = self.client.post(f'/releases/game/{self.duplicate.pk}/toggle-publish/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()['is_published'])
+
+    def test_renaming_recomputes_key(self):
+        game = GameRelease.objects.get(pk=self.duplicate.pk)
+        game.title = 'Unique Game'
+        game.save()
+        self.assertEqual(GameRelease.objects.get(pk=game.pk).normalized_title, normalize_title('Unique Game'))
+
+    def test_renaming_to_taken_title_keeps_null_key(self):
+        game = GameRelease.objects.create(title='Another Game', release_date=date(2026, 11, 3), platforms=['PS5'])
+        game.title = 'duplicate  GAME'
+        game.save(update_fields=['title'])
+        game.refresh_from_db()
+        self.assertEqual(game.title, 'duplicate  GAME')
+        self.assertIsNone(game.normalized_title)
+        self.assertEqual(GameRelease.objects.get(pk=self.original.pk).normalized_title, normalize_title('Duplicate Game'))
+
+
+class RunRecorderTests(TestCase):
+
+    def test_logged_error_keeps_fields_and_traceback(self):
+        with RunRecorder('test_run') as run:
+            try:
+                raise ValueError('bad tile')
+            except ValueError:
+                logging.getLogger('releases.ingestion').exception('Tile failed', extra={'source': 'IGN', 'url': '/x'})
+        saved = IngestionRun.objects.get(pk=run.run.pk)
+        self.assertEqual(saved.status, IngestionRun.STATUS_SUCCESS)
+        error = saved.errors[0]
+        self.assertEqual(error['message'], 'Tile failed')
+        self.assertEqual(error['source'], 'IGN')
+        self.assertEqual(error['url'], '/x')
+        self.assertEqual(error['level'], 'ERROR')
+        self.assertIn('ValueError: bad tile', error['exc'])
+
+    def test_exception_marks_run_failed(self):
+        with self.assertRaises(RuntimeError):
+            with RunRecorder('test_run') as run:
+                raise RuntimeError('boom')
+        saved = IngestionRun.objects.get(pk=run.run.pk)
+        self.assertEqual(saved.status, IngestionRun.STATUS_FAILED)
+        self.assertIn('RuntimeError: boom', saved.errors[-1]['exc'])
+
+    def test_keyboard_interrupt_marks_run_interrupted(self):
+        with self.assertRaises(KeyboardInterrupt):
+            with RunRecorder('test_run') as run:
+                raise KeyboardInterrupt
+        self.assertEqual(IngestionRun.objects.get(pk=run.run.pk).status, IngestionRun.STATUS_INTERRUPTED)
+
+    def test_explicit_interrupt_survives_clean_exit(self):
+        with RunRecorder('test_run') as run:
+            run.interrupt()
+        self.assertEqual(IngestionRun.objects.get(pk=run.run.pk).status, IngestionRun.STATUS_INTERRUPTED)
+
+    def test_command_reports_failed_run_without_traceback(self):
+        with mock.patch.object(IGNHttpReleaseParser, 'fetch_page', side_effect=RuntimeError('site down')):
+            with self.assertRaisesMessage(CommandError, 'RuntimeError: site down'):
+                call_command('parse_ign_releases', fetcher='http', stdout=io.StringIO())
+        run = IngestionRun.objects.get(command='parse_ign_releases')
+        self.assertEqual(run.status, IngestionRun.STATUS_FAILED)
+        self.assertIn('RuntimeError: site down', run.errors[-1]['exc'])
+
+    def test_parser_error_fails_run(self):
+        parser = IGNHttpReleaseParser()
+        with mock.patch.object(parser, 'fetch_page', side_effect=RuntimeError('down')):
+            with self.assertRaises(RuntimeError):
+                with RunRecorder('test_run') as run:
+                    parser.recorder = run
+                    parser.parse_releases()
+        self.assertEqual(IngestionRun.objects.get(pk=run.run.pk).status, IngestionRun.STATUS_FAILED)
+
+
+class MediaAccessTests(TestCase):
+    """Иконки из ответа API открываются без сессии, аватары - нет"""
+
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        for name in ('game_icons/1_Game.jpg', 'avatars/user.png'):
+            path = Path(media_root.name) / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(b'image')
+        override = override_settings(MEDIA_ROOT=media_root.name, MEDIA_SERVE_BACKEND='django')
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_game_icon_is_public(self):
+        response = self.client.get('/media/game_icons/1_Game.jpg')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'image')
+        self.assertTrue(response['Cache-Control'].startswith('public'))
+
+    def test_avatar_requires_login(self):
+        self.assertEqual(self.client.get('/media/avatars/user.png').status_code, 403)
+
+    def test_traversal_out_of_public_prefix_requires_login(self):
+        self.assertEqual(self.client.get('/media/game_icons/../avatars/user.png').status_code, 403)
+
+
+class ContentAddressedStorageTests(TestCase):
+
+    def setUp(self):
+        location = tempfile.TemporaryDirectory()
+        self.addCleanup(location.cleanup)
+        self.storage = ContentAddressedStorage(location=location.name)
+
+    def test_same_content_gets_same_name(self):
+        first = self.storage.save('game_icons/1_A.jpg', ContentFile(b'icon'))
+        second = self.storage.save('game_icons/2_B.jpg', ContentFile(b'icon'))
+        self.assertEqual(first, second)
+        self.assertEqual(len(os.listdir(os.path.dirname(self.storage.path(first)))), 1)
+
+    def test_reused_blob_survives_gc_grace_period(self):
+        name = self.storage.save('game_icons/1_A.jpg', ContentFile(b'icon'))
+        old = os.stat(self.storage.path(name)).st_mtime - 7200
+        os.utime(self.storage.path(name), (old, old))
+
+        # Повторная загрузка того же файла, строка с ссылкой ещё не закоммичена
+        self.storage.save('game_icons/2_B.jpg', ContentFile(b'icon'))
+        self.assertEqual(collect_garbage(self.storage), (0, 0))
+        self.assertTrue(self.storage.exists(name))
+
+
+class IconVariantTests(TestCase):
+
+    def _render(self, image):
+        buffer = io.BytesIO()
+        image.save(buffer, format='PNG')
+        return render_icon_variants(buffer.getvalue())
+
+    def test_transparent_icon_keeps_alpha_in_webp_and_background_in_jpeg(self):
+        variants = self._render(Image.new('RGBA', (64, 64), (255, 0, 0, 0)))
+        with Image.open(io.BytesIO(variants[('list', 'webp')])) as webp:
+            self.assertEqual(webp.mode, 'RGBA')
+            self.assertEqual(webp.getpixel((0, 0))[3], 0)
+        with Image.open(io.BytesIO(variants[('list', 'jpg')])) as jpeg:
+            self.assertTrue(all(abs(a - b) < 8 for a, b in zip(jpeg.getpixel((0, 0)), ICON_BACKGROUND)))
+
+    def test_palette_icon_with_transparency_is_not_black(self):
+        image = Image.new('P', (64, 64), 0)
+        image.putpalette([0, 0, 0] * 256)
+        image.info['transparency'] = 0
+        variants = self._render(image)
+        with Image.open(io.BytesIO(variants[('modal', 'jpg')])) as jpeg:
+            self.assertGreater(min(jpeg.getpixel((0, 0))), 240)
+
+
+class IGNSourceTests(TestCase):
+
+    @mock.patch('releases.ign_parser.acquire_driver')
+    def test_pipeline_source_shares_session_and_writer_and_defers_browser(self, acquire_driver):
+        pipeline = IngestionPipeline(sources=[])
+        source = IGNSource(pipeline.http, writer=pipeline.writer, fetcher='browser')
+        self.addCleanup(pipeline.http.close)
+
+        acquire_driver.assert_not_called()
+        self.assertIs(source.parser.http, pipeline.http)
+        self.assertIs(source.parser.writer, pipeline.writer)
+
+        driver = acquire_driver.return_value
+        driver.page_source = _page('ign_upcoming_tiles.html')
+        with mock.patch('releases.ign_parser.WebDriverWait'), mock.patch('releases.ign_parser.release_driver') as release:
+            self.assertEqual(source.fetch(('upcoming', None)), driver.page_source)
+            source.close()
+        acquire_driver.assert_called_once_with()
+        release.assert_called_once_with(driver, failed=False)
+
+    @mock.patch('releases.ign_parser.acquire_driver')
+    def test_loaded_sources_get_pipeline_writer(self, acquire_driver):
+        pipeline = IngestionPipeline(fetcher='browser')
+        self.addCleanup(pipeline.http.close)
+        for source in pipeline.sources:
+            self.assertIs(source.writer, pipeline.writer)
+            self.assertIs(source.http, pipeline.http)
+        acquire_driver.assert_not_called()
+
+
+class BrowserPoolSizingTests(TestCase):
+
+    @override_settings(BROWSER_POOL_URL='', IGN_MONTH_WORKERS=3)
+    def test_without_pool_uses_month_workers(self):
+        self.assertEqual(month_workers(5), 3)
+        self.assertEqual(month_workers(1), 1)
+
+    @override_settings(BROWSER_POOL_URL='http://127.0.0.1:8765', BROWSER_POOL_SIZE=2, IGN_MONTH_WORKERS=3)
+    def test_month_workers_fit_pool_next_to_main_browser(self):
+        self.assertEqual(month_workers(5), 1)
+
+    def test_default_pool_fits_month_crawl(self):
+        self.assertGreaterEqual(settings.BROWSER_POOL_SIZE, 1 + settings.IGN_MONTH_WORKERS)
+
+    @override_settings(IGN_MONTH_HORIZON=2)
+    @mock.patch('releases.ign_parser.record_page')
+    @mock.patch('releases.ign_parser.WebDriverWait')
+    @mock.patch('releases.ign_parser.acquire_driver')
+    def test_month_failure_does_not_fail_main_browser(self, acquire_driver, wait, record_page):
+        parser = IGNReleaseParser()
+        acquire_driver.return_value.page_source = '<html></html>'
+        with mock.patch.object(parser, '_fetch_month', side_effect=[RuntimeError('calendar'), '<html></html>']), \
+                mock.patch('releases.ign_parser.release_driver') as release:
+            parser.parse_releases()
+        self.assertEqual(parser.stats['errors'], 1)
+        release.assert_called_once_with(acquire_driver.return_value, failed=False)
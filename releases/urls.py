@@ -5,6 +5,8 @@ app_name = 'releases'
 
 urlpatterns = [
     path('', views.release_list, name='release_list'),
+    path('stats/', views.release_stats, name='release_stats'),
+    path('runs/', views.ingestion_runs, name='ingestion_runs'),
     path('game/<int:pk>/', views.release_detail, name='release_detail'),
     path('game/create/', views.release_create, name='release_create'),
     path('game/<int:pk>/edit/', views.release_update, name='release_update'),
@@ -12,7 +14,10 @@ urlpatterns = [
     path('game/<int:pk>/modal/', views.release_modal, name='release_modal'),
     path('game/<int:pk>/toggle-platform/', views.toggle_platform_publication, name='toggle_platform_publication'),
     path('game/<int:pk>/toggle-marketplace/', views.toggle_marketplace, name='toggle_marketplace'),  # НОВЫЙ URL
+    path('game/<int:pk>/publications/', views.update_release_publications, name='update_release_publications'),
+    path('publish-everywhere/', views.publish_releases_everywhere, name='publish_releases_everywhere'),
 
 
     path('api/game-releases/', views.get_game_releases, name='get_game_releases'),
+    path('api/game-releases/changes/', views.get_game_release_changes, name='get_game_release_changes'),
 ]
\ No newline at end of file
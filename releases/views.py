@@ -1,20 +1,26 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
-from django.db.models import Q
+from django.conf import settings
+from django.db.models import Count, Q
+from django.http import JsonResponse, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
 from django.utils import timezone
-from .models import GameRelease
-from .forms import *
-from django.shortcuts import render, get_object_or_404
-from django.http import JsonResponse
-from django.http import JsonResponse
-from django.core.paginator import Paginator
-
-
-from django.http import JsonResponse
+from django.utils.http import http_date, parse_http_date_safe
 from django.views.decorators.http import require_http_methods
-from django.utils import timezone
-from django.db.models import Q
-from datetime import datetime, date
+from .models import CatalogVersion, GameRelease, GameReleaseAttribute, IngestionRun, filter_by_attribute
+from .api import (
+    ApiError, filter_releases, parse_filters, parse_changes_params, get_changes,
+    response_cache_key, get_cached_body, set_cached_body, render_json_body, stream_body,
+)
+from .forms import *
+from .images import schedule_icon_variants
+from .analytics import get_release_stats
+from .runs import run_trends
+from .publications import (
+    PublicationConflict, PublicationError, parse_publication_changes,
+    publish_everywhere, update_publications,
+)
+from .pagination import KEYSET_ORDERINGS, get_keyset_page
+import json
 
 
 def require_api_key(view_func):
@@ -51,21 +57,11 @@ def require_api_key(view_func):
     
     return wrapper
 
-def parse_release_date(date_str):
-    """
-    Парсит строку даты в объект date.
-    Поддерживаем форматы:
-    - "2026-03-31"
-    - "2026-03-31 00:00" (время игнорируется, т.к. поле DateField)
-    - "2026-03-31T00:00"
-    """
-    for fmt in ("%Y-%m-%d", "%Y-%m-%d %H:%M", "%Y-%m-%dT%H:%M"):
-        try:
-            dt = datetime.strptime(date_str, fmt)
-            return dt.date()  # возвращаем только дату
-        except ValueError:
-            continue
-    raise ValueError(f"Invalid date format: {date_str}. Use: YYYY-MM-DD")
+def _not_modified(etag, last_modified):
+    response = HttpResponseNotModified()
+    response['ETag'] = etag
+    response['Last-Modified'] = last_modified
+    return response
 
 
 @require_http_methods(["GET"])
@@ -81,90 +77,80 @@ def get_game_releases(request):
         - marketplace: "Avito" (опционально, фильтр по площадке)
         - language: "Русский" (опционально, фильтр по языку)
         - search: "God of War" (опционально, поиск по названию)
+        - fields: "id,title,release_date,platforms" (опционально, только эти поля)
+        - format: "json" (по умолчанию), "json-stream" или "ndjson" - потоковая
+          выдача без сборки всего ответа в памяти, для больших диапазонов
+
+    Ответ кешируется до изменения каталога; поддерживаются ETag/If-None-Match
+    и Last-Modified/If-Modified-Since (304 Not Modified).
     """
-    
-    date_from = request.GET.get('date_from')
-    date_to = request.GET.get('date_to')
-    
-    # Валидация обязательных параметров
-    if not date_from or not date_to:
+    try:
+        filters = parse_filters(request.GET)
+    except ApiError as e:
         return JsonResponse({
             'success': False,
-            'error': 'Missing required parameters: date_from and date_to',
-            'code': 'MISSING_PARAMETERS'
+            'error': e.message,
+            'code': e.code
         }, status=400)
-    
-    # Парсинг дат
+
+    catalog = CatalogVersion.current()
+    cache_key, etag = response_cache_key(catalog.version, filters, request)
+    last_modified = http_date(catalog.updated_at.timestamp())
+
+    # Условный запрос: If-None-Match главнее If-Modified-Since
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match:
+        # GZip-мидлварь делает ETag слабым (W/"...") - сравниваем без префикса
+        tags = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+        if etag in tags or if_none_match.strip() == '*':
+            return _not_modified(etag, last_modified)
+    else:
+        if_modified_since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+        if if_modified_since is not None and int(catalog.updated_at.timestamp()) <= if_modified_since:
+            return _not_modified(etag, last_modified)
+
+    if filters['format'] == 'json':
+        body = get_cached_body(cache_key)
+        if body is None:
+            body = render_json_body(filter_releases(filters), request, filters)
+            set_cached_body(cache_key, body)
+        response = HttpResponse(body, content_type='application/json')
+    else:
+        content_type = 'application/x-ndjson' if filters['format'] == 'ndjson' else 'application/json'
+        response = StreamingHttpResponse(
+            stream_body(filter_releases(filters), request, filters), content_type=content_type
+        )
+
+    response['ETag'] = etag
+    response['Last-Modified'] = last_modified
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+@require_http_methods(["GET"])
+@require_api_key
+def get_game_release_changes(request):
+    """
+    Лента изменений релизов для инкрементальной синхронизации ботов.
+
+    Параметры:
+        - cursor: значение next_cursor из прошлого ответа (без него - с начала)
+        - limit: сколько изменений вернуть (по умолчанию 500, максимум 2000)
+        - fields: как в get_game_releases
+
+    Изменения идут в порядке времени: {"op": "upsert", "id", "is_published", "data"}
+    или {"op": "delete", "id"}. Пока has_more - запрашиваем снова с next_cursor.
+    """
     try:
-        dt_from = parse_release_date(date_from)
-        dt_to = parse_release_date(date_to)
-    except ValueError as e:
+        params = parse_changes_params(request.GET)
+    except ApiError as e:
         return JsonResponse({
             'success': False,
-            'error': str(e),
-            'code': 'INVALID_DATE_FORMAT'
+            'error': e.message,
+            'code': e.code
         }, status=400)
-    
-    # Базовый фильтр: опубликованные + диапазон дат
-    queryset = GameRelease.objects.filter(
-        is_published=True,
-        release_date__gte=dt_from,
-        release_date__lte=dt_to
-    )
-    
-    # 🔍 Опциональные фильтры
-    
-    # Платформа (ищем в JSONField platforms)
-    platform = request.GET.get('platform')
-    if platform:
-        queryset = queryset.filter(platforms__contains=[platform])
-    
-    # Площадка (ищем в JSONField marketplaces)
-    marketplace = request.GET.get('marketplace')
-    if marketplace:
-        queryset = queryset.filter(marketplaces__contains=[marketplace])
-    
-    # Язык (ищем в JSONField languages)
-    language = request.GET.get('language')
-    if language:
-        queryset = queryset.filter(languages__contains=[language])
-    
-    # Поиск по названию (регистронезависимый)
-    search = request.GET.get('search')
-    if search:
-        queryset = queryset.filter(title__icontains=search)
-    
-    # Формируем ответ
-    releases = []
-    for release in queryset.order_by('release_date'):
-        releases.append({
-            'id': release.id,
-            'title': release.title,
-            'icon': request.build_absolute_uri(release.icon.url) if release.icon else None,
-            'release_date': release.release_date.strftime("%Y-%m-%d"),
-            'platforms': release.platforms,
-            'marketplaces': release.marketplaces,
-            'languages': release.languages,
-            'marketplace_platforms': release.marketplace_platforms,
-            'description': release.description,
-            'price': str(release.price),  # Decimal → str для JSON
-            'created_at': release.created_at.strftime("%Y-%m-%d %H:%M:%S"),
-            'updated_at': release.updated_at.strftime("%Y-%m-%d %H:%M:%S"),
-        })
-    
-    return JsonResponse({
-        'success': True,
-        'count': len(releases),
-        'filters': {
-            'date_from': dt_from.strftime("%Y-%m-%d"),
-            'date_to': dt_to.strftime("%Y-%m-%d"),
-            'platform': platform,
-            'marketplace': marketplace,
-            'language': language,
-            'search': search,
-        },
-        'data': releases
-    }, status=200, json_dumps_params={'ensure_ascii': False})
+
+    return JsonResponse(get_changes(params, request), json_dumps_params={'ensure_ascii': False})
+
 
 @login_required
 def toggle_marketplace(request, pk):
@@ -174,30 +160,17 @@ def toggle_marketplace(request, pk):
         marketplace = request.POST.get('marketplace')
         
         if marketplace:
-            # Получаем текущий список площадок
-            current_marketplaces = game.get_marketplaces_list()
-            
-            # Переключаем площадку
-            if marketplace in current_marketplaces:
-                # Убираем площадку
-                current_marketplaces.remove(marketplace)
-                # Также убираем все публикации для этой площадки
-                marketplace_platforms = game.get_marketplace_platforms_dict()
-                if marketplace in marketplace_platforms:
-                    del marketplace_platforms[marketplace]
-                game.marketplace_platforms = marketplace_platforms
-            else:
-                # Добавляем площадку
-                current_marketplaces.append(marketplace)
-            
-            # Сохраняем обновленный список
-            game.marketplaces = current_marketplaces
-            game.save()
+            # Снятие площадки убирает и её публикации; запись меняется условным UPDATE
+            try:
+                game = update_publications(game.pk, [(marketplace, None, None)])
+            except PublicationConflict:
+                return JsonResponse({'success': False, 'error': 'Conflict'}, status=409)
             
             return JsonResponse({
                 'success': True,
                 'is_selected': marketplace in game.get_marketplaces_list(),
-                'marketplace': marketplace
+                'marketplace': marketplace,
+                'version': game.row_version,
             })
     
     return JsonResponse({'success': False, 'error': 'Invalid request'})
@@ -211,27 +184,114 @@ def toggle_platform_publication(request, pk):
         platform = request.POST.get('platform')
         
         if marketplace and platform:
-            # Используем реальный метод модели
-            is_published = game.toggle_platform_publication(marketplace, platform)
-            status = game.get_marketplace_status(marketplace)
+            try:
+                game = update_publications(game.pk, [(marketplace, platform, None)])
+            except PublicationConflict:
+                return JsonResponse({'success': False, 'error': 'Conflict'}, status=409)
+            matrix = game.publication_matrix
             
             return JsonResponse({
                 'success': True,
-                'is_published': is_published,
-                'marketplace_status': status,
-                'marketplace_status_display': game.get_marketplace_status_display(status)
+                'is_published': matrix.is_published(marketplace, platform),
+                'marketplace_status': matrix.status(marketplace),
+                'marketplace_status_display': matrix.status_display(marketplace),
+                'version': game.row_version,
             })
     
     return JsonResponse({'success': False, 'error': 'Invalid request'})
+
+def _json_body(request):
+    try:
+        return json.loads(request.body or b'{}')
+    except (ValueError, UnicodeDecodeError):
+        raise PublicationError('Invalid JSON body')
+
+@login_required
+@require_http_methods(["POST"])
+def update_release_publications(request, pk):
+    """
+    Пакет изменений публикаций одним запросом:
+    {"version": 7, "changes": [{"marketplace": "AVITO", "platform": "PS5", "published": true}, ...]}
+    Отвечает обновлённой матрицей; 409 с актуальной матрицей, если version устарела.
+    """
+    game = get_object_or_404(GameRelease, pk=pk)
+    try:
+        data = _json_body(request)
+        changes = parse_publication_changes(data.get('changes'))
+        version = data.get('version')
+        if version is not None and not isinstance(version, int):
+            raise PublicationError('version must be an integer')
+        game = update_publications(game.pk, changes, expected_version=version)
+    except PublicationError as e:
+        return JsonResponse({'success': False, 'error': e.message}, status=400)
+    except PublicationConflict as e:
+        return JsonResponse({
+            'success': False,
+            'error': 'Conflict',
+            'version': e.release.row_version,
+            'matrix': e.release.publication_matrix.as_json(),
+        }, status=409)
+
+    return JsonResponse({
+        'success': True,
+        'version': game.row_version,
+        'matrix': game.publication_matrix.as_json(),
+    })
+
+@login_required
+@require_http_methods(["POST"])
+def publish_releases_everywhere(request):
+    """Публикует выбранные релизы на всех площадках по всем платформам одной транзакцией: {"ids": [1, 2]}"""
+    try:
+        ids = _json_body(request).get('ids')
+        if not isinstance(ids, list) or not ids or not all(isinstance(pk, int) for pk in ids):
+            raise PublicationError('ids must be a non-empty list of integers')
+        changed = publish_everywhere(ids)
+    except PublicationError as e:
+        return JsonResponse({'success': False, 'error': e.message}, status=400)
+    except PublicationConflict:
+        return JsonResponse({'success': False, 'error': 'Conflict'}, status=409)
+
+    return JsonResponse({
+        'success': True,
+        'updated': {str(game.pk): game.row_version for game in changed},
+    })
+
 @login_required
 def release_modal(request, pk):
     """Детальная информация для модального окна"""
     game = get_object_or_404(GameRelease, pk=pk)
     return render(request, 'releases/release_modal.html', {'game': game})
+RELEASES_PER_PAGE = 20
+
+
+def _landing_page_number(games, sort_by, stats, today):
+    """Номер страницы с первым релизом на сегодня или позже - без обхода списка"""
+    if sort_by == 'release_date':
+        before = stats['before_today']
+    elif sort_by in ('title', '-title'):
+        # Первый (в порядке сортировки) релиз не из прошлого и сколько строк перед ним
+        ordering = KEYSET_ORDERINGS[sort_by]
+        first = games.filter(release_date__gte=today).order_by(*ordering).first()
+        if first is None:
+            return 1
+        field = 'title__lt' if sort_by == 'title' else 'title__gt'
+        before = games.filter(
+            Q(**{field: first.title}) |
+            Q(title=first.title, release_date__lt=first.release_date) |
+            Q(title=first.title, release_date=first.release_date, id__lt=first.id)
+        ).count()
+    else:
+        # По убыванию даты будущие релизы идут первыми
+        return 1
+    return before // RELEASES_PER_PAGE + 1
+
+
 @login_required
 def release_list(request):
     """Список релизов с фильтрами"""
     games = GameRelease.objects.all()
+    sort_by = 'release_date'
     
     # Применяем фильтры
     form = GameReleaseFilterForm(request.GET or None)
@@ -245,60 +305,98 @@ def release_list(request):
         # Фильтр по платформе
     
         if platform:
-            games = games.filter(platforms__icontains=platform)
+            games = filter_by_attribute(games, GameReleaseAttribute.PLATFORM, platform)
             
             # Фильтр по площадке
         if marketplace:
-            games = games.filter(
-                    Q(marketplace_platforms__icontains=marketplace) |
-                    Q(marketplace_platforms__has_key=marketplace)
-                )
+            games = filter_by_attribute(games, GameReleaseAttribute.PUBLISHED_ON, marketplace)
             
             # Фильтр по языку
         if language:
-            games = games.filter(languages__icontains=language)
+            games = filter_by_attribute(games, GameReleaseAttribute.LANGUAGE, language)
             
             # Фильтр по статусу публикации
         if is_published == 'published':
             games = games.filter(is_published=True)
         elif is_published == 'not_published':
             games = games.filter(is_published=False)
-            
-            # Сортировка
-        games = games.order_by(sort_by)
     
-    # Статистика
-    total_games = games.count()
-    published_games = games.filter(is_published=True).count()
-    upcoming_games = games.filter(release_date__gt=timezone.now().date()).count()
-    # 🔥 ПАГИНАЦИЯ - ДОБАВЛЯЕМ ПОСЛЕ СОРТИРОВКИ
-    paginator = Paginator(games, 20)  # 20 игр на страницу
-    page_number = request.GET.get('page')
+    # Статистика одним запросом
+    today = timezone.now().date()
+    stats = games.aggregate(
+        total=Count('id'),
+        published=Count('id', filter=Q(is_published=True)),
+        upcoming=Count('id', filter=Q(release_date__gt=today)),
+        before_today=Count('id', filter=Q(release_date__lt=today)),
+    )
 
-    # Если страница не указана, находим страницу с сегодняшними релизами
+    # Если страница не указана, открываем страницу с сегодняшними релизами
+    page_number = request.GET.get('page')
     if not page_number:
-        today = timezone.now().date()
-        # Находим индекс первого релиза на сегодня или позже
-        for index, game in enumerate(games):
-            if game.release_date >= today:
-                page_number = (index // 20) + 1  # 20 - размер страницы
-                break
-
-    page_obj = paginator.get_page(page_number)
+        page_number = _landing_page_number(games, sort_by, stats, today)
 
-    # Заменяем games на page_obj в контексте
-    games = page_obj
+    # 🔥 ПАГИНАЦИЯ - "Вперёд"/"Назад" по курсору, номера страниц по OFFSET
+    page_obj = get_keyset_page(
+        games, sort_by, page_number, RELEASES_PER_PAGE, stats['total'],
+        after=request.GET.get('after'), before=request.GET.get('before'),
+    )
     
     context = {
-        'games': games,
+        'games': page_obj,
         'form': form,
-        'total_games': total_games,
-        'published_games': published_games,
-        'upcoming_games': upcoming_games,
+        'total_games': stats['total'],
+        'published_games': stats['published'],
+        'upcoming_games': stats['upcoming'],
     }
     
     return render(request, 'releases/release_list.html', context)
 
+@login_required
+def release_stats(request):
+    """Статистика каталога для сотрудников: HTML или JSON (?format=json)"""
+    if not request.user.is_staff:
+        if request.GET.get('format') == 'json':
+            return JsonResponse({'success': False, 'error': 'Access denied'}, status=403)
+        return redirect('releases:release_list')
+
+    stats = get_release_stats()
+    if request.GET.get('format') == 'json':
+        return JsonResponse({'success': True, 'data': stats}, json_dumps_params={'ensure_ascii': False})
+
+    platform_names = dict(GameRelease.PLATFORM_CHOICES)
+    marketplace_names = dict(GameRelease.MARKETPLACE_CHOICES)
+    language_names = dict(GameRelease.LANGUAGE_CHOICES)
+    context = {
+        'stats': stats,
+        'platform_rows': [(platform_names.get(code, code), count) for code, count in stats['platform_stats'].items()],
+        'marketplace_rows': [(marketplace_names.get(code, code), count) for code, count in stats['marketplace_stats'].items()],
+        'language_rows': [(language_names.get(code, code), count) for code, count in stats['language_stats'].items()],
+    }
+    return render(request, 'releases/release_stats.html', context)
+
+@login_required
+def ingestion_runs(request):
+    """История прогонов импорта для сотрудников: тренды длительности и выхода, HTML или JSON (?format=json)"""
+    if not request.user.is_staff:
+        if request.GET.get('format') == 'json':
+            return JsonResponse({'success': False, 'error': 'Access denied'}, status=403)
+        return redirect('releases:release_list')
+
+    command = request.GET.get('command') or None
+    runs = run_trends(limit=getattr(settings, 'INGESTION_RUNS_PAGE_SIZE', 100), command=command)
+    if request.GET.get('format') == 'json':
+        return JsonResponse({'success': True, 'data': runs}, json_dumps_params={'ensure_ascii': False})
+
+    commands = IngestionRun.objects.order_by('command').values_list('command', flat=True).distinct()
+    context = {
+        'runs': runs,
+        # Таблица - свежие сверху, графики - слева направо по времени
+        'latest_runs': runs[::-1],
+        'commands': list(commands),
+        'command': command,
+    }
+    return render(request, 'releases/ingestion_runs.html', context)
+
 @login_required
 def release_detail(request, pk):
     """Детальная страница релиза"""
@@ -312,6 +410,7 @@ def release_create(request):
         form = GameReleaseForm(request.POST, request.FILES)
         if form.is_valid():
             game = form.save()
+            schedule_icon_variants(game)
             return redirect('releases:release_list')
     else:
         form = GameReleaseForm()
@@ -327,6 +426,8 @@ def release_update(request, pk):
         form = GameReleaseForm(request.POST, request.FILES, instance=game)
         if form.is_valid():
             form.save()
+            if 'icon' in form.changed_data:
+                schedule_icon_variants(game)
             return redirect('releases:release_list')
     else:
         form = GameReleaseForm(instance=game)
@@ -0,0 +1,99 @@
+"""
+Аватары пользователей без внешних запросов и без random.
+
+- Нет загруженной аватарки: SVG с инициалами на градиенте, цвет выбирается
+  стабильным хешем от id пользователя. Отдаётся data: URI и кешируется.
+- Загруженная аватарка: в фоне обрезается до квадрата AVATAR_SIZE и
+  пересохраняется в JPEG, чтобы на доске не грузить фото с телефона.
+"""
+import io
+import os
+import zlib
+from functools import lru_cache
+from urllib.parse import quote
+
+from core.background import submit_after_commit
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+AVATAR_SIZE = 256
+
+# (начало, конец) градиента
+AVATAR_GRADIENTS = [
+    ('#667eea', '#764ba2'),
+    ('#f093fb', '#f5576c'),
+    ('#4facfe', '#00f2fe'),
+    ('#43e97b', '#38f9d7'),
+    ('#fa709a', '#fee140'),
+    ('#a8edea', '#fed6e3'),
+    ('#ffecd2', '#fcb69f'),
+]
+
+
+def avatar_gradient(user_id):
+    """Стабильный (между процессами и перезапусками) выбор градиента"""
+    index = zlib.crc32(str(user_id or 0).encode()) % len(AVATAR_GRADIENTS)
+    return AVATAR_GRADIENTS[index]
+
+
+def get_initials(name):
+    parts = [part for part in (name or '').split() if part]
+    if not parts:
+        return '?'
+    if len(parts) == 1:
+        return parts[0][:2].upper()
+    return (parts[0][0] + parts[1][0]).upper()
+
+
+@lru_cache(maxsize=1024)
+def initials_avatar_url(user_id, display_name):
+    start, end = avatar_gradient(user_id)
+    initials = get_initials(display_name)
+    svg = (
+        '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 64 64">'
+        '<defs><linearGradient id="g" x1="0" y1="0" x2="1" y2="1">'
+        f'<stop offset="0" stop-color="{start}"/><stop offset="1" stop-color="{end}"/>'
+        '</linearGradient></defs>'
+        '<rect width="64" height="64" fill="url(#g)"/>'
+        '<text x="50%" y="50%" dy=".35em" text-anchor="middle" fill="#fff" '
+        'font-family="-apple-system,Segoe UI,Roboto,sans-serif" font-size="26" font-weight="600">'
+        f'{_escape(initials)}</text></svg>'
+    )
+    return 'data:image/svg+xml,' + quote(svg)
+
+
+def _escape(text):
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+
+def render_avatar(source_bytes):
+    """Квадрат AVATAR_SIZE x AVATAR_SIZE в JPEG"""
+    with Image.open(io.BytesIO(source_bytes)) as image:
+        image = ImageOps.exif_transpose(image).convert('RGB')
+        image = ImageOps.fit(image, (AVATAR_SIZE, AVATAR_SIZE), Image.LANCZOS)
+        buffer = io.BytesIO()
+        image.save(buffer, format='JPEG', quality=85, optimize=True, progressive=True)
+        return buffer.getvalue()
+
+
+def resize_avatar(user_id):
+    from .models import CustomUser
+
+    user = CustomUser.objects.filter(pk=user_id).first()
+    if not user or not user.avatar:
+        return
+
+    old_name = user.avatar.name
+    with user.avatar.open('rb') as f:
+        data = render_avatar(f.read())
+
+    stem = os.path.splitext(os.path.basename(old_name))[0]
+    user.avatar.save(f"{stem}_{AVATAR_SIZE}.jpg", ContentFile(data), save=False)
+    CustomUser.objects.filter(pk=user_id).update(avatar=user.avatar.name)
+    if old_name != user.avatar.name:
+        user.avatar.storage.delete(old_name)
+
+
+def schedule_avatar_resize(user):
+    if user.avatar:
+        submit_after_commit(resize_avatar, user.pk)
@@ -0,0 +1,68 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:09
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0004_navigationbutton_alter_task_payment_amount'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='navigationbutton',
+            options={'ordering': ['order', 'title'], 'verbose_name': 'Кнопка навигации', 'verbose_name_plural': 'Кнопки навигации'},
+        ),
+        migrations.RemoveField(
+            model_name='invitation',
+            name='email',
+        ),
+        migrations.AddField(
+            model_name='customuser',
+            name='role',
+            field=models.CharField(blank=True, choices=[('boss', 'Босс'), ('manager', 'Руковод'), ('false_manager', 'Менеджер'), ('technician', 'Техник')], default='technician', max_length=20, null=True, verbose_name='Роль'),
+        ),
+        migrations.AddField(
+            model_name='invitation',
+            name='tags',
+            field=models.CharField(blank=True, max_length=500, verbose_name='Ярлыки (через запятую)'),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='controlled_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='controlled_tasks', to=settings.AUTH_USER_MODEL, verbose_name='На контроле у'),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='started_date',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Дата начала работы'),
+        ),
+        migrations.AlterField(
+            model_name='navigationbutton',
+            name='color',
+            field=models.CharField(default='#2563eb', max_length=7, verbose_name='Цвет кнопки'),
+        ),
+        migrations.AlterField(
+            model_name='navigationbutton',
+            name='order',
+            field=models.IntegerField(default=0, verbose_name='Порядок отображения'),
+        ),
+        migrations.AlterField(
+            model_name='navigationbutton',
+            name='title',
+            field=models.CharField(max_length=100, verbose_name='Название кнопки'),
+        ),
+        migrations.AlterField(
+            model_name='navigationbutton',
+            name='url',
+            field=models.CharField(max_length=500, verbose_name='URL ссылка'),
+        ),
+        migrations.AlterField(
+            model_name='task',
+            name='status',
+            field=models.CharField(choices=[('proposed', '🟡 Предложена'), ('created', '🟢 Создана'), ('in_progress', '🔵 В работе'), ('submitted', '🟡 В приёмке'), ('completed', '✅ Завершена')], default='created', max_length=20, verbose_name='Статус'),
+        ),
+    ]
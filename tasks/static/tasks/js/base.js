@@ -0,0 +1,37 @@
+function toggleMobileMenu() {
+    const navMain = document.getElementById('navMain');
+    navMain.classList.toggle('mobile-open');
+}
+
+// Закрытие меню при клике вне его области
+document.addEventListener('click', function(event) {
+    const navMain = document.getElementById('navMain');
+    const mobileToggle = document.querySelector('.mobile-menu-toggle');
+
+    if (!navMain.contains(event.target) && !mobileToggle.contains(event.target)) {
+        navMain.classList.remove('mobile-open');
+    }
+});
+
+// Обработка выпадающих меню на мобильных устройствах
+document.addEventListener('DOMContentLoaded', function() {
+    const dropdownToggles = document.querySelectorAll('.nav-dropdown-toggle');
+
+    dropdownToggles.forEach(toggle => {
+        toggle.addEventListener('click', function(e) {
+            if (window.innerWidth <= 768) {
+                e.preventDefault();
+                const dropdown = this.closest('.nav-dropdown');
+                dropdown.classList.toggle('active');
+            }
+        });
+    });
+});
+
+// Закрытие мобильного меню при изменении размера окна
+window.addEventListener('resize', function() {
+    const navMain = document.getElementById('navMain');
+    if (window.innerWidth > 768) {
+        navMain.classList.remove('mobile-open');
+    }
+});
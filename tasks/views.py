@@ -13,6 +13,7 @@ import secrets
 from datetime import timedelta
 from django.contrib.auth import login  # ← Добавляем этот импорт
 from .utils import get_kanban_data, get_team_kanban_data
+from .avatars import schedule_avatar_resize
 
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
@@ -405,7 +406,9 @@ def profile(request):
     if request.method == 'POST':
         form = UserProfileForm(request.POST, request.FILES, instance=request.user)
         if form.is_valid():
-            form.save()
+            user = form.save()
+            if 'avatar' in form.changed_data:
+                schedule_avatar_resize(user)
             messages.success(request, 'Профиль успешно обновлен!')
             return redirect('profile')
     else: